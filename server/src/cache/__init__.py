@@ -1,3 +1,4 @@
 from .cache import Cache
+from .coalesce import RequestCoalescer, coalescer, coalesced
 
-__all__ = ["Cache"]
+__all__ = ["Cache", "RequestCoalescer", "coalescer", "coalesced"]
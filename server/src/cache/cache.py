@@ -18,6 +18,15 @@ class Cache:
             logger.error(f"Cache miss for key: {key}")
         return result
 
+    @classmethod
+    def get_many(cls, keys: list[str]) -> dict[str, int]:
+        """
+        Get the values of all cached keys, skipping the misses.
+        """
+        hits = {key: cls._cache[key] for key in keys if key in cls._cache}
+        logger.debug(f"Cache hits: {len(hits)}/{len(keys)}")
+        return hits
+
     @classmethod
     def set(cls, key: str, value: int):
         """
@@ -28,6 +37,6 @@ class Cache:
     @classmethod
     def delete(cls, key: str):
         """
-        Delete a value from the cache.
+        Delete a value from the cache, if it is still there.
         """
-        del cls._cache[key]
+        cls._cache.pop(key, None)
@@ -0,0 +1,119 @@
+import os
+import json
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable, Hashable
+
+from cachetools import TTLCache
+from loguru import logger
+from pydantic import BaseModel
+
+
+COALESCE_CACHE_TTL = float(os.getenv("COALESCE_CACHE_TTL", "1"))
+COALESCE_CACHE_SIZE = int(os.getenv("COALESCE_CACHE_SIZE", "1024"))
+
+
+def _key_part(value: Any) -> Hashable:
+    """
+    Turns a call argument into a hashable key part. Pydantic models with list
+    fields are not hashable even when frozen, so they are keyed by their JSON dump.
+    """
+    if isinstance(value, BaseModel):
+        return type(value).__name__, value.model_dump_json()
+    if isinstance(value, (list, dict, set)):
+        return json.dumps(value, sort_keys=True, default=str)
+    return value
+
+
+class RequestCoalescer:
+    """
+    Shares one execution between identical concurrent calls.
+
+    The first call for a key starts the work in its own task; calls arriving while
+    it runs await the same result, including its exception. A successful result is
+    also kept for `ttl` seconds, so bursts slightly apart are served from memory.
+    The work is shielded from the callers, so one cancelled request does not fail
+    the others.
+
+    Attributes:
+        calls (int): Calls made through the coalescer.
+        executions (int): Calls that actually ran the work.
+        cache_hits (int): Calls served from the TTL cache.
+    """
+
+    def __init__(self, ttl: float = COALESCE_CACHE_TTL, maxsize: int = COALESCE_CACHE_SIZE):
+        self.ttl = ttl
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+        self._results = TTLCache[Hashable, Any](maxsize=maxsize, ttl=ttl) if ttl > 0 else None
+        self.calls = 0
+        self.executions = 0
+        self.cache_hits = 0
+
+    async def run(self, key: Hashable, work: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Returns the result of `work()`, sharing it with identical calls in flight.
+
+        Args:
+            key (Hashable): Identifies calls that would return the same result.
+            work (Callable[[], Awaitable[Any]]): Produces the result; only called
+                when no identical call is in flight or cached.
+        """
+        self.calls += 1
+        if self._results is not None and key in self._results:
+            self.cache_hits += 1
+            return self._results[key]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.executions += 1
+            task = self._in_flight[key] = asyncio.create_task(work())
+            task.add_done_callback(functools.partial(self._finished, key))
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        if self._results is not None and not task.cancelled() and task.exception() is None:
+            self._results[key] = task.result()
+
+    def invalidate(self):
+        """
+        Drops cached results, e.g. after the underlying data changed.
+        """
+        if self._results is not None:
+            self._results.clear()
+
+    @property
+    def ratio(self) -> float:
+        """
+        Calls per actual execution; 1.0 means nothing was shared.
+        """
+        return self.calls / self.executions if self.executions else 1.0
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "cache_hits": self.cache_hits,
+            "in_flight": len(self._in_flight),
+            "coalescing_ratio": round(self.ratio, 3),
+        }
+
+
+coalescer = RequestCoalescer()
+
+
+def coalesced(function: Callable[..., Awaitable[Any]]):
+    """
+    Decorator routing calls of an async method through the shared `coalescer`,
+    keyed by the method name and its arguments (`self` excluded).
+    """
+    @functools.wraps(function)
+    async def wrapper(self, *args, **kwargs):
+        key = (function.__qualname__,
+               tuple(_key_part(arg) for arg in args),
+               tuple(sorted((name, _key_part(value)) for name, value in kwargs.items())))
+        result = await coalescer.run(key, lambda: function(self, *args, **kwargs))
+        if coalescer.calls % 1000 == 0:
+            logger.info(f"Request coalescing: {coalescer.stats()}")
+        return result
+    return wrapper
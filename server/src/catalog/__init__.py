@@ -0,0 +1,12 @@
+from .snapshot import CatalogProblem, CatalogSnapshot, CatalogStore, CatalogTag
+from .builder import build_catalog_snapshot
+from .export import CatalogExporter, EncodedExport, negotiate_encoding
+
+__all__ = ["CatalogExporter",
+           "CatalogProblem",
+           "CatalogSnapshot",
+           "CatalogStore",
+           "CatalogTag",
+           "EncodedExport",
+           "build_catalog_snapshot",
+           "negotiate_encoding"]
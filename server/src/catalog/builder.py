@@ -0,0 +1,41 @@
+import asyncio
+from pathlib import Path
+from sqlalchemy import select
+
+from db import db_session
+from .snapshot import CATALOG_DIR, encode_snapshot, write_snapshot
+
+
+async def build_catalog_snapshot(directory: Path = CATALOG_DIR) -> Path:
+    """
+    Reads the list-level catalog from the database and publishes a new snapshot.
+
+    Only the columns needed for list views are selected, so descriptions never
+    leave the database.
+
+    Args:
+        directory (Path): The catalog directory to publish into.
+
+    Returns:
+        Path: The path of the published snapshot file.
+    """
+    # Imported here because the problems routes import catalog; only ingest builds snapshots
+    from problems.models import Problem, Tag, ProblemTags
+
+    async with db_session() as session:
+        problems = (await session.execute(
+            select(Problem.id, Problem.public_id, Problem.name, Problem.difficulty,
+                   Problem.link, Problem.acceptance_rate, Problem.updated_at,
+                   Problem.slug, Problem.number)
+        )).mappings().all()
+        tags = (await session.execute(
+            select(Tag.id, Tag.public_id, Tag.name)
+        )).mappings().all()
+        problem_tags = (await session.execute(
+            select(ProblemTags.problem_id, ProblemTags.tag_id)
+        )).tuples().all()
+
+    data = encode_snapshot([dict(p) for p in problems],
+                           [dict(t) for t in tags],
+                           list(problem_tags))
+    return await asyncio.to_thread(write_snapshot, data, directory)
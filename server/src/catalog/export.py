@@ -0,0 +1,147 @@
+import gzip
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+import zstandard as zstd
+from cachetools import LRUCache
+
+from .snapshot import CatalogProblem, CatalogSnapshot, CatalogStore
+
+
+EXPORT_FORMAT = 1
+COLUMNS = ("public_id", "name", "difficulty", "acceptance_rate", "link", "tags")
+
+# Preferred first; zstd is smaller and faster to decode where clients accept it.
+ENCODINGS = ("zstd", "gzip")
+
+
+@dataclass(frozen=True)
+class EncodedExport:
+    """
+    A serialized catalog export, ready to send.
+
+    Attributes:
+        version (int): The catalog version the export brings the client to.
+        body (bytes): The compressed JSON document.
+        encoding (str | None): The Content-Encoding of the body, None when uncompressed.
+    """
+    version: int
+    body: bytes
+    encoding: Optional[str]
+
+
+def _row(problem: CatalogProblem, tag_index: dict[str, int]) -> tuple:
+    return (problem.public_id, problem.name, problem.difficulty, problem.acceptance_rate,
+            problem.link, [tag_index[tag] for tag in problem.tags])
+
+
+def _fingerprint(problem: CatalogProblem) -> tuple:
+    return (problem.name, problem.difficulty, problem.acceptance_rate, problem.link, problem.tags)
+
+
+def _columnar(problems: list[CatalogProblem], tag_names: list[str]) -> dict:
+    """
+    Lays problems out column by column; tags are indices into `tag_names`, so
+    every repeated string is sent once.
+    """
+    tag_index = {name: i for i, name in enumerate(tag_names)}
+    rows = [_row(problem, tag_index) for problem in problems]
+    return {column: [row[i] for row in rows] for i, column in enumerate(COLUMNS)}
+
+
+def build_export(snapshot: CatalogSnapshot, since: Optional[CatalogSnapshot] = None) -> dict:
+    """
+    Builds the list-level catalog document, descriptions excluded.
+
+    Args:
+        snapshot (CatalogSnapshot): The catalog to export.
+        since (Optional[CatalogSnapshot]): The catalog the client already has; when given,
+            only problems added or changed since then are included, plus the public IDs
+            of removed ones. A full document is built instead if the tag list changed,
+            since the rows the client keeps refer to tags by their index in it.
+
+    Returns:
+        dict: The export document.
+    """
+    tag_names = [tag.name for tag in snapshot.tags()]
+    if since is not None and [tag.name for tag in since.tags()] != tag_names:
+        since = None
+    document = {
+        "format": EXPORT_FORMAT,
+        "version": snapshot.version,
+        "mode": "full" if since is None else "delta",
+        "tags": tag_names,
+        "columns": list(COLUMNS),
+    }
+
+    if since is None:
+        document["problems"] = _columnar(list(snapshot.problems()), tag_names)
+        return document
+
+    previous = {problem.public_id: _fingerprint(problem) for problem in since.problems()}
+    changed = []
+    for problem in snapshot.problems():
+        if previous.pop(problem.public_id, None) != _fingerprint(problem):
+            changed.append(problem)
+
+    document["since"] = since.version
+    document["problems"] = _columnar(changed, tag_names)
+    document["removed"] = sorted(previous)
+    return document
+
+
+def _compress(data: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == "zstd":
+        return zstd.ZstdCompressor(level=10).compress(data)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return data
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Picks the best supported Content-Encoding from an Accept-Encoding header.
+    """
+    accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+    return next((encoding for encoding in ENCODINGS if encoding in accepted), None)
+
+
+class CatalogExporter:
+    """
+    Serves compressed catalog exports.
+
+    Snapshots are immutable, so a full export is built once per version and
+    encoding, and a delta once per (since, version) pair; both are cached.
+    """
+    _cache = LRUCache[tuple, EncodedExport](maxsize=32)
+
+    @classmethod
+    def export(cls, since: Optional[int] = None,
+               encoding: Optional[str] = None) -> Optional[EncodedExport]:
+        """
+        Returns the export of the current catalog.
+
+        Args:
+            since (Optional[int]): The catalog version the client has. If that version
+                is no longer kept on disk or had other tags, a full export is returned instead.
+            encoding (Optional[str]): "zstd", "gzip" or None for an uncompressed body.
+
+        Returns:
+            EncodedExport | None: The export, or None if no catalog has been published yet.
+        """
+        snapshot = CatalogStore.current()
+        if snapshot is None:
+            return None
+
+        base = CatalogStore.open_version(since) if since is not None else None
+        base_version = base.version if base is not None else None
+        key = (snapshot.version, base_version, encoding)
+        cached = cls._cache.get(key)
+        if cached is not None:
+            return cached
+
+        document = build_export(snapshot, base)
+        data = json.dumps(document, separators=(",", ":")).encode("utf-8")
+        encoded = cls._cache[key] = EncodedExport(snapshot.version, _compress(data, encoding), encoding)
+        return encoded
@@ -0,0 +1,611 @@
+import os
+import mmap
+import struct
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from loguru import logger
+
+
+# The last byte is the format version; files of older formats are rebuilt at startup.
+MAGIC = b"SLCAT\x00\x00\x02"
+
+# Header: magic, catalog version, problem/tag/problem-tag/string counts,
+# followed by the byte offset of every section in the file.
+_SECTIONS = (
+    "problems",
+    "tags",
+    "problem_tags",
+    "tag_problems",
+    "by_acceptance",
+    "by_name",
+    "by_public_id",
+    "string_offsets",
+    "string_data",
+)
+_HEADER = struct.Struct("<8sQIIII" + "Q" * len(_SECTIONS))
+
+# id, public_id, name, difficulty, link, acceptance_rate, updated_at, tag_start, tag_count,
+# slug, number (0 when unknown)
+_PROBLEM = struct.Struct("<IIIIIddIIII")
+
+# id, public_id, name, problem_start, problem_count
+_TAG = struct.Struct("<IIIII")
+
+_U32 = 4
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogProblem:
+    """
+    List-level view of a problem as stored in the catalog snapshot.
+
+    Attributes:
+        row (int): The row of the problem inside the snapshot.
+        id (int): The internal database ID of the problem.
+        public_id (str): The public ID of the problem.
+        name (str): The name of the problem.
+        difficulty (str): The difficulty level of the problem.
+        link (str): The LeetCode link of the problem.
+        acceptance_rate (float): The acceptance rate of the problem.
+        updated_at (float): Last update time as a POSIX timestamp.
+        tags (tuple[str, ...]): The names of the tags of the problem.
+        slug (str): The LeetCode slug of the problem, empty when unknown.
+        number (int | None): The LeetCode number of the problem.
+    """
+    row: int
+    id: int
+    public_id: str
+    name: str
+    difficulty: str
+    link: str
+    acceptance_rate: float
+    updated_at: float
+    tags: tuple[str, ...]
+    slug: str = ""
+    number: Optional[int] = None
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogTag:
+    """
+    A tag as stored in the catalog snapshot.
+
+    Attributes:
+        row (int): The row of the tag inside the snapshot.
+        id (int): The internal database ID of the tag.
+        public_id (str): The public ID of the tag.
+        name (str): The name of the tag.
+        problem_count (int): The number of problems carrying the tag.
+    """
+    row: int
+    id: int
+    public_id: str
+    name: str
+    problem_count: int
+
+
+class _StringPool:
+    """Deduplicating string pool used while writing a snapshot."""
+
+    def __init__(self):
+        self._index: dict[str, int] = {}
+        self._offsets: list[int] = [0]
+        self._data = bytearray()
+
+    def add(self, value: str) -> int:
+        ref = self._index.get(value)
+        if ref is None:
+            ref = len(self._index)
+            self._index[value] = ref
+            self._data += value.encode("utf-8")
+            self._offsets.append(len(self._data))
+        return ref
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def offsets(self) -> bytes:
+        return struct.pack(f"<{len(self._offsets)}I", *self._offsets)
+
+    def data(self) -> bytes:
+        return bytes(self._data)
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    if value is None:
+        return 0.0
+    if value.tzinfo is None:
+        # SQLite hands back naive datetimes for CURRENT_TIMESTAMP, which is UTC.
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _pack_u32(values: list[int]) -> bytes:
+    return struct.pack(f"<{len(values)}I", *values)
+
+
+def encode_snapshot(problems: list[dict], tags: list[dict], problem_tags: list[tuple[int, int]],
+                    version: Optional[int] = None) -> bytes:
+    """
+    Encodes catalog rows into the binary snapshot format.
+
+    Args:
+        problems (list[dict]): Problem rows with id, public_id, name, difficulty, link,
+            acceptance_rate and updated_at keys, and optionally slug and number.
+        tags (list[dict]): Tag rows with id, public_id and name keys.
+        problem_tags (list[tuple[int, int]]): (problem_id, tag_id) association pairs.
+        version (Optional[int]): The catalog version. Defaults to the current time in nanoseconds.
+
+    Returns:
+        bytes: The encoded snapshot.
+    """
+    version = version if version is not None else time.time_ns()
+    problems = sorted(problems, key=lambda p: p["id"])
+    tags = sorted(tags, key=lambda t: t["name"])
+
+    problem_rows = {p["id"]: row for row, p in enumerate(problems)}
+    tag_rows = {t["id"]: row for row, t in enumerate(tags)}
+
+    tags_of_problem: list[list[int]] = [[] for _ in problems]
+    problems_of_tag: list[list[int]] = [[] for _ in tags]
+    for problem_id, tag_id in problem_tags:
+        p_row, t_row = problem_rows.get(problem_id), tag_rows.get(tag_id)
+        if p_row is None or t_row is None:
+            continue
+        tags_of_problem[p_row].append(t_row)
+        problems_of_tag[t_row].append(p_row)
+
+    pool = _StringPool()
+    problem_section = bytearray()
+    problem_tag_section: list[int] = []
+    for row, problem in enumerate(problems):
+        tag_start = len(problem_tag_section)
+        problem_tag_section.extend(sorted(tags_of_problem[row]))
+        problem_section += _PROBLEM.pack(
+            problem["id"],
+            pool.add(problem["public_id"]),
+            pool.add(problem["name"]),
+            pool.add(problem["difficulty"]),
+            pool.add(problem["link"]),
+            float(problem["acceptance_rate"]),
+            _timestamp(problem.get("updated_at")),
+            tag_start,
+            len(tags_of_problem[row]),
+            pool.add(problem.get("slug") or ""),
+            problem.get("number") or 0,
+        )
+
+    tag_section = bytearray()
+    tag_problem_section: list[int] = []
+    for row, tag in enumerate(tags):
+        problem_start = len(tag_problem_section)
+        tag_problem_section.extend(sorted(problems_of_tag[row]))
+        tag_section += _TAG.pack(
+            tag["id"],
+            pool.add(tag["public_id"]),
+            pool.add(tag["name"]),
+            problem_start,
+            len(problems_of_tag[row]),
+        )
+
+    rows = range(len(problems))
+    by_acceptance = sorted(rows, key=lambda r: (problems[r]["acceptance_rate"], problems[r]["id"]))
+    by_name = sorted(rows, key=lambda r: problems[r]["name"])
+    by_public_id = sorted(rows, key=lambda r: problems[r]["public_id"])
+
+    sections = {
+        "problems": bytes(problem_section),
+        "tags": bytes(tag_section),
+        "problem_tags": _pack_u32(problem_tag_section),
+        "tag_problems": _pack_u32(tag_problem_section),
+        "by_acceptance": _pack_u32(by_acceptance),
+        "by_name": _pack_u32(by_name),
+        "by_public_id": _pack_u32(by_public_id),
+        "string_offsets": pool.offsets(),
+        "string_data": pool.data(),
+    }
+
+    offsets = []
+    position = _HEADER.size
+    for name in _SECTIONS:
+        offsets.append(position)
+        position += len(sections[name])
+
+    header = _HEADER.pack(MAGIC, version, len(problems), len(tags),
+                          len(problem_tag_section), len(pool), *offsets)
+    return header + b"".join(sections[name] for name in _SECTIONS)
+
+
+class SnapshotFormatError(ValueError):
+    """
+    Raised when mapping a snapshot written in an older format.
+    """
+
+
+class CatalogSnapshot:
+    """
+    Read-only, memory-mapped view over a catalog snapshot file.
+
+    The file is mapped once and every lookup reads straight out of the mapping,
+    so all worker processes mapping the same file share one copy in the page cache.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = memoryview(self._mmap)
+        magic, self.version, self.problem_count, self.tag_count, \
+            problem_tag_count, string_count, *offsets = _HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            if magic[:-1] == MAGIC[:-1]:
+                raise SnapshotFormatError(f"Catalog snapshot of an older format: {self.path}")
+            raise ValueError(f"Not a catalog snapshot: {self.path}")
+
+        sections = dict(zip(_SECTIONS, offsets))
+        self._buffer = buffer
+        self._problems_at = sections["problems"]
+        self._tags_at = sections["tags"]
+        self._strings_at = sections["string_data"]
+
+        def u32_array(section: str, count: int) -> memoryview:
+            start = sections[section]
+            return buffer[start:start + count * _U32].cast("I")
+
+        self._problem_tags = u32_array("problem_tags", problem_tag_count)
+        self._tag_problems = u32_array("tag_problems", problem_tag_count)
+        self._by_acceptance = u32_array("by_acceptance", self.problem_count)
+        self._by_name = u32_array("by_name", self.problem_count)
+        self._by_public_id = u32_array("by_public_id", self.problem_count)
+        self._string_offsets = u32_array("string_offsets", string_count + 1)
+        self._tag_rows_by_name: Optional[dict[str, int]] = None
+        self._rows_by_slug: Optional[dict[str, int]] = None
+        self._rows_by_number: Optional[dict[int, int]] = None
+
+    def string(self, ref: int) -> str:
+        """
+        Decodes a string from the string pool.
+        """
+        start = self._strings_at + self._string_offsets[ref]
+        end = self._strings_at + self._string_offsets[ref + 1]
+        return str(self._buffer[start:end], "utf-8")
+
+    def problem(self, row: int) -> CatalogProblem:
+        """
+        Returns the problem stored at the given row.
+        """
+        (problem_id, public_id, name, difficulty, link, acceptance_rate,
+         updated_at, tag_start, tag_count, slug, number) = _PROBLEM.unpack_from(
+            self._buffer, self._problems_at + row * _PROBLEM.size)
+        tags = tuple(
+            self.string(self._tag_field(t_row, 2))
+            for t_row in self._problem_tags[tag_start:tag_start + tag_count]
+        )
+        return CatalogProblem(
+            row=row,
+            id=problem_id,
+            public_id=self.string(public_id),
+            name=self.string(name),
+            difficulty=self.string(difficulty),
+            link=self.string(link),
+            acceptance_rate=acceptance_rate,
+            updated_at=updated_at,
+            tags=tags,
+            slug=self.string(slug),
+            number=number or None,
+        )
+
+    def tag(self, row: int) -> CatalogTag:
+        """
+        Returns the tag stored at the given row.
+        """
+        tag_id, public_id, name, _, problem_count = _TAG.unpack_from(
+            self._buffer, self._tags_at + row * _TAG.size)
+        return CatalogTag(row=row, id=tag_id, public_id=self.string(public_id),
+                          name=self.string(name), problem_count=problem_count)
+
+    def _tag_field(self, row: int, field: int) -> int:
+        return _TAG.unpack_from(self._buffer, self._tags_at + row * _TAG.size)[field]
+
+    def _problem_field(self, row: int, field: int):
+        return _PROBLEM.unpack_from(self._buffer, self._problems_at + row * _PROBLEM.size)[field]
+
+    def problems(self) -> Iterator[CatalogProblem]:
+        """
+        Iterates over all problems ordered by internal ID.
+        """
+        for row in range(self.problem_count):
+            yield self.problem(row)
+
+    def tags(self) -> list[CatalogTag]:
+        """
+        Returns all tags ordered by name.
+        """
+        return [self.tag(row) for row in range(self.tag_count)]
+
+    def tag_row(self, name: str) -> Optional[int]:
+        """
+        Returns the row of the tag with the given name, if present.
+        """
+        if self._tag_rows_by_name is None:
+            self._tag_rows_by_name = {
+                self.string(self._tag_field(row, 2)): row for row in range(self.tag_count)
+            }
+        return self._tag_rows_by_name.get(name)
+
+    def problem_rows_for_tag(self, name: str) -> memoryview:
+        """
+        Returns the rows of all problems carrying the given tag, in ascending order.
+        """
+        row = self.tag_row(name)
+        if row is None:
+            return self._tag_problems[0:0]
+        _, _, _, start, count = _TAG.unpack_from(self._buffer, self._tags_at + row * _TAG.size)
+        return self._tag_problems[start:start + count]
+
+    def rows_by_acceptance(self, descending: bool = False) -> memoryview:
+        """
+        Returns problem rows sorted by acceptance rate.
+        """
+        return self._by_acceptance[::-1] if descending else self._by_acceptance
+
+    def rows_by_name(self) -> memoryview:
+        """
+        Returns problem rows sorted by name.
+        """
+        return self._by_name
+
+    def find_by_public_id(self, public_id: str) -> Optional[CatalogProblem]:
+        """
+        Finds a problem by its public ID using the sorted public ID index.
+
+        Args:
+            public_id (str): The public ID of the problem.
+
+        Returns:
+            CatalogProblem | None: The problem if present in the snapshot, otherwise None.
+        """
+        keys = _PublicIDKeys(self)
+        position = bisect_left(keys, public_id)
+        if position < self.problem_count and keys[position] == public_id:
+            return self.problem(self._by_public_id[position])
+        return None
+
+    def _build_deep_link_maps(self):
+        rows_by_slug, rows_by_number = {}, {}
+        for row in range(self.problem_count):
+            slug, number = _PROBLEM.unpack_from(self._buffer, self._problems_at + row * _PROBLEM.size)[9:]
+            if self._string_offsets[slug] != self._string_offsets[slug + 1]:
+                rows_by_slug[self.string(slug)] = row
+            if number:
+                rows_by_number[number] = row
+        self._rows_by_slug, self._rows_by_number = rows_by_slug, rows_by_number
+
+    def find_by_slug(self, slug: str) -> Optional[CatalogProblem]:
+        """
+        Finds a problem by its normalized LeetCode slug.
+
+        The slug and number maps are built on the first deep-link lookup and live as
+        long as the snapshot, so a new ingest brings new maps with its snapshot.
+        """
+        if self._rows_by_slug is None:
+            self._build_deep_link_maps()
+        row = self._rows_by_slug.get(slug)
+        return self.problem(row) if row is not None else None
+
+    def find_by_number(self, number: int) -> Optional[CatalogProblem]:
+        """
+        Finds a problem by its LeetCode number.
+        """
+        if self._rows_by_number is None:
+            self._build_deep_link_maps()
+        row = self._rows_by_number.get(number)
+        return self.problem(row) if row is not None else None
+
+    def close(self):
+        """
+        Releases the views, unmaps the file and closes its descriptor.
+
+        If a caller still holds a view into the mapping, closing is left to the
+        garbage collector, which unmaps the file once the last view is gone.
+        """
+        try:
+            for view in (self._problem_tags, self._tag_problems, self._by_acceptance,
+                         self._by_name, self._by_public_id, self._string_offsets, self._buffer):
+                view.release()
+            self._mmap.close()
+        except BufferError:
+            logger.debug(f"Catalog snapshot {self.path.name} is still referenced; unmapping it later")
+
+
+class _PublicIDKeys:
+    """Sequence adapter exposing the public ID index to `bisect`."""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self._snapshot = snapshot
+
+    def __len__(self) -> int:
+        return self._snapshot.problem_count
+
+    def __getitem__(self, position: int) -> str:
+        row = self._snapshot._by_public_id[position]
+        return self._snapshot.string(self._snapshot._problem_field(row, 1))
+
+
+CATALOG_DIR = Path(os.getenv("CATALOG_DIR", "./catalog_data"))
+CURRENT_FILE = "CURRENT"
+KEEP_SNAPSHOTS = 3
+
+
+def write_snapshot(data: bytes, directory: Path = CATALOG_DIR) -> Path:
+    """
+    Writes an encoded snapshot and atomically publishes it as the current one.
+
+    Each snapshot gets its own immutable file, and the small CURRENT pointer file is
+    swapped with `os.replace`, so readers either see the old or the new version and a
+    file that is still mapped by a worker is never overwritten in place.
+
+    Args:
+        data (bytes): The encoded snapshot.
+        directory (Path): The catalog directory.
+
+    Returns:
+        Path: The path of the published snapshot file.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    version = _HEADER.unpack_from(data)[1]
+    path = directory / f"catalog-{version}.bin"
+
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    pointer_tmp = directory / f"{CURRENT_FILE}.tmp"
+    pointer_tmp.write_text(path.name)
+    os.replace(pointer_tmp, directory / CURRENT_FILE)
+
+    _prune_snapshots(directory, keep=path.name)
+    logger.info(f"Published catalog snapshot {path.name} ({len(data)} bytes)")
+    return path
+
+
+def _prune_snapshots(directory: Path, keep: str):
+    snapshots = sorted(directory.glob("catalog-*.bin"),
+                       key=lambda p: p.stat().st_mtime_ns, reverse=True)
+    for old in snapshots[KEEP_SNAPSHOTS:]:
+        if old.name == keep:
+            continue
+        try:
+            old.unlink()
+        except OSError:
+            # Still mapped by a worker on platforms that forbid it; retry next time.
+            pass
+
+
+class CatalogStore:
+    """
+    Process-wide holder of the current catalog snapshot.
+
+    Workers call `current()` on every lookup; the CURRENT pointer is re-checked at most
+    once per `check_interval` seconds and a new snapshot is swapped in with a single
+    attribute assignment, so in-flight readers keep using the version they started with.
+    Structures derived from the snapshot subscribe to be rebuilt as soon as a new one
+    is mapped, rather than by the first lookup that notices the new version.
+    """
+    directory: Path = CATALOG_DIR
+    check_interval: float = float(os.getenv("CATALOG_CHECK_INTERVAL", "2.0"))
+
+    _snapshot: Optional[CatalogSnapshot] = None
+    _pointer: Optional[str] = None
+    _checked_at: float = 0.0
+    _previous: dict[int, CatalogSnapshot] = {}
+    _subscribers: list[Callable[[CatalogSnapshot], None]] = []
+    outdated: bool = False
+
+    @classmethod
+    def subscribe(cls, callback: Callable[[CatalogSnapshot], None]):
+        """
+        Calls `callback` with every snapshot mapped from now on, and with the current
+        one right away if there is one.
+        """
+        cls._subscribers.append(callback)
+        if cls._snapshot is not None:
+            cls._notify(callback, cls._snapshot)
+
+    @classmethod
+    def unsubscribe(cls, callback: Callable[[CatalogSnapshot], None]):
+        """
+        Stops calling a callback passed to `subscribe`.
+        """
+        if callback in cls._subscribers:
+            cls._subscribers.remove(callback)
+
+    @classmethod
+    def _notify(cls, callback: Callable[[CatalogSnapshot], None], snapshot: CatalogSnapshot):
+        try:
+            callback(snapshot)
+        except Exception as e:
+            # A derived structure failing to build must not keep the new catalog from being served
+            logger.error(f"Catalog subscriber {callback} failed for version {snapshot.version}: {e}")
+
+    @classmethod
+    def current(cls) -> Optional[CatalogSnapshot]:
+        """
+        Returns the current snapshot, or None if no snapshot has been published yet.
+        """
+        now = time.monotonic()
+        if now - cls._checked_at >= cls.check_interval:
+            cls._checked_at = now
+            cls.refresh()
+        return cls._snapshot
+
+    @classmethod
+    def refresh(cls) -> Optional[CatalogSnapshot]:
+        """
+        Maps the snapshot named by the CURRENT pointer if it changed since the last check.
+        """
+        try:
+            pointer = (cls.directory / CURRENT_FILE).read_text().strip()
+        except FileNotFoundError:
+            return cls._snapshot
+
+        if pointer == cls._pointer:
+            return cls._snapshot
+
+        try:
+            snapshot = CatalogSnapshot(cls.directory / pointer)
+        except SnapshotFormatError as e:
+            logger.warning(f"{e}; it needs to be rebuilt")
+            cls.outdated = True
+            return cls._snapshot
+        except (OSError, ValueError, struct.error) as e:
+            logger.error(f"Could not map catalog snapshot {pointer}: {e}")
+            return cls._snapshot
+
+        replaced = cls._snapshot
+        cls._snapshot, cls._pointer, cls.outdated = snapshot, pointer, False
+        logger.info(f"Mapped catalog snapshot {pointer} (version {snapshot.version})")
+        for callback in cls._subscribers:
+            cls._notify(callback, snapshot)
+        if replaced is not None:
+            # Otherwise every ingest leaks a mapping and a descriptor, which keeps
+            # the disk space of pruned snapshot files in use
+            replaced.close()
+        return snapshot
+
+    @classmethod
+    def open_version(cls, version: int) -> Optional[CatalogSnapshot]:
+        """
+        Returns the snapshot of an earlier catalog version while its file is still kept.
+
+        Args:
+            version (int): The catalog version.
+
+        Returns:
+            CatalogSnapshot | None: The snapshot, or None if it was pruned or never existed.
+        """
+        # Not current(): a refresh here would close the snapshot the caller is exporting
+        current = cls._snapshot
+        if current is not None and current.version == version:
+            return current
+        if version in cls._previous:
+            return cls._previous[version]
+
+        path = cls.directory / f"catalog-{version}.bin"
+        try:
+            snapshot = CatalogSnapshot(path)
+        except (OSError, ValueError, struct.error):
+            return None
+        if len(cls._previous) >= KEEP_SNAPSHOTS:
+            cls._previous.pop(next(iter(cls._previous))).close()
+        cls._previous[version] = snapshot
+        return snapshot
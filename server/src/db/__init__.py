@@ -1,10 +1,11 @@
 from .context import with_session
-from .mixins import PaginatedResponse, PublicIDMixin, TimestampMixin
+from .mixins import CountStrategy, PaginatedResponse, PublicIDMixin, TimestampMixin
 from .config import Base, db_session, init_db
 
 __all__ = ["with_session",
            "Base",
            "db_session",
+           "CountStrategy",
            "PaginatedResponse",
            "PublicIDMixin",
            "TimestampMixin",
@@ -1,17 +1,22 @@
+import os
 import logging
 
+from sqlalchemy import inspect
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 
 from contextlib import asynccontextmanager
 
+from .instrumentation import instrument
+
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./sqlite.db"
+ASYNC_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./sqlite.db")
 async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+instrument(async_engine.sync_engine)
 
 AsyncSessionLocal = sessionmaker(
     autocommit=False,
@@ -22,6 +27,18 @@ AsyncSessionLocal = sessionmaker(
 Base = declarative_base()
 
 
+async def refresh_expired(session: AsyncSession):
+    """
+    Refresh the objects whose attributes were expired by a flush or commit, so they
+    stay usable once detached. Objects that were only read are already fully loaded
+    and are skipped; refreshing them would re-select every row and drop deferred
+    columns that were explicitly loaded.
+    """
+    for obj in list(session.identity_map.values()):
+        if inspect(obj).expired_attributes:
+            await session.refresh(obj)
+
+
 @asynccontextmanager
 async def db_session():
     """
@@ -35,8 +52,7 @@ async def db_session():
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            for obj in session.identity_map.values():
-                await session.refresh(obj)
+            await refresh_expired(session)
             session.expunge_all()
             await session.commit()
         except Exception as error:
@@ -49,7 +65,7 @@ async def db_session():
 
 async def init_db():
     """
-    Asynchronously initialize the database by creating all tables defined in Base.
+    Asynchronously initialize the database by applying all pending schema migrations.
     """
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    from .migrations import migrate
+    await migrate(async_engine)
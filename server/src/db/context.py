@@ -1,7 +1,7 @@
 import functools
 from typing import Callable, TypeVar
 from loguru import logger
-from .config import AsyncSessionLocal
+from .config import AsyncSessionLocal, refresh_expired
 
 T = TypeVar('T')
 
@@ -26,8 +26,7 @@ def with_session():
                         result = await function(cls, session, *other_args, **kwargs)
                     else:
                         result = await function(session, *args, **kwargs)
-                    for obj in session.identity_map.values():
-                        await session.refresh(obj)
+                    await refresh_expired(session)
 
                     session.expunge_all()
                     await session.commit()
@@ -0,0 +1,146 @@
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+
+@dataclass
+class QueryStats:
+    """
+    Statements executed on behalf of one request.
+
+    Attributes:
+        count (int): Number of statements.
+        total_ms (float): Time spent executing them.
+        slow (int): Statements slower than SLOW_QUERY_MS.
+        shapes (Counter[str]): Executions per statement text; parameters are bound
+            separately, so repeated text means the same query was issued in a loop.
+    """
+    count: int = 0
+    total_ms: float = 0.0
+    slow: int = 0
+    shapes: Counter[str] = field(default_factory=Counter)
+
+    def n_plus_one(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> dict[str, int]:
+        """
+        Returns the statements issued at least `threshold` times.
+        """
+        return {statement: n for statement, n in self.shapes.items() if n >= threshold}
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def start_tracking() -> QueryStats:
+    """
+    Starts collecting statements for the current context and returns the collector.
+    Tasks created afterwards (e.g. by `call_next` in middleware) share it.
+    """
+    stats = QueryStats()
+    _current.set(stats)
+    return stats
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+class SQLMetrics:
+    """
+    Process-wide totals of the per-request statistics.
+    """
+    requests = 0
+    statements = 0
+    total_ms = 0.0
+    slow_statements = 0
+    n_plus_one_requests = 0
+    max_statements = 0
+
+    @classmethod
+    def record(cls, stats: QueryStats):
+        cls.requests += 1
+        cls.statements += stats.count
+        cls.total_ms += stats.total_ms
+        cls.slow_statements += stats.slow
+        cls.max_statements = max(cls.max_statements, stats.count)
+        if stats.n_plus_one():
+            cls.n_plus_one_requests += 1
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        return {
+            "requests": cls.requests,
+            "statements": cls.statements,
+            "statements_per_request": round(cls.statements / cls.requests, 2) if cls.requests else 0.0,
+            "max_statements_per_request": cls.max_statements,
+            "sql_ms": round(cls.total_ms, 2),
+            "slow_statements": cls.slow_statements,
+            "n_plus_one_requests": cls.n_plus_one_requests,
+        }
+
+
+def _explain(dbapi_connection, statement: str, parameters) -> str:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return "\n".join(f"  {row[-1]}" for row in cursor.fetchall())
+    except Exception as e:
+        return f"  (could not explain: {e})"
+    finally:
+        cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append((cursor, time.perf_counter()))
+
+
+def _handle_error(context):
+    """
+    Drops the start time of a statement that raised, since its after_cursor_execute
+    never runs. Errors raised while fetching come after that and find nothing to drop.
+    """
+    execution = context.execution_context
+    if context.connection is None or execution is None:
+        return
+    starts = context.connection.info.get("query_start")
+    if starts and starts[-1][0] is execution.cursor:
+        starts.pop()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _, started = conn.info["query_start"].pop()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    stats = _current.get()
+    if stats is not None:
+        stats.count += 1
+        stats.total_ms += elapsed_ms
+        stats.shapes[statement] += 1
+
+    if elapsed_ms < SLOW_QUERY_MS:
+        return
+    if stats is not None:
+        stats.slow += 1
+    plan = ""
+    if statement.lstrip().upper().startswith("SELECT") and not executemany:
+        plan = "\n" + _explain(conn.connection, statement, parameters)
+    logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {statement}{plan}")
+
+
+def instrument(engine: Engine):
+    """
+    Attaches the timing listeners to an engine; for an async engine pass `sync_engine`.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,3 @@
+from .runner import Migration, applied_revisions, discover, migrate
+
+__all__ = ["Migration", "applied_revisions", "discover", "migrate"]
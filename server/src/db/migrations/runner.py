@@ -0,0 +1,84 @@
+import importlib
+import pkgutil
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from . import versions
+
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    One schema revision, loaded from a module in `db/migrations/versions`.
+
+    Attributes:
+        revision (str): The module name, e.g. "0002_compressed_descriptions";
+            revisions are applied in name order.
+        description (str): The first line of the module docstring.
+        upgrade (Callable[[AsyncConnection], Awaitable[None]]): Applies the revision.
+    """
+    revision: str
+    description: str
+    upgrade: Callable[[AsyncConnection], Awaitable[None]]
+
+
+def discover() -> list[Migration]:
+    """
+    Loads every revision module, ordered by name.
+    """
+    migrations = []
+    for info in sorted(pkgutil.iter_modules(versions.__path__), key=lambda m: m.name):
+        module = importlib.import_module(f"{versions.__name__}.{info.name}")
+        description = (module.__doc__ or "").strip().split("\n")[0]
+        migrations.append(Migration(info.name, description, module.upgrade))
+    return migrations
+
+
+async def applied_revisions(conn: AsyncConnection) -> set[str]:
+    await conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+        "revision VARCHAR PRIMARY KEY, "
+        "description VARCHAR NOT NULL, "
+        "applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP)"))
+    result = await conn.execute(text(f"SELECT revision FROM {MIGRATIONS_TABLE}"))
+    return set(result.scalars().all())
+
+
+async def migrate(engine: AsyncEngine, target: Optional[str] = None) -> list[str]:
+    """
+    Applies every pending revision, each in its own transaction.
+
+    Revisions are written to be idempotent, so two processes starting at the
+    same time may both run one without harm; only the first one records it.
+
+    Args:
+        engine (AsyncEngine): The engine of the database to migrate.
+        target (Optional[str]): Stop after this revision instead of the latest one.
+
+    Returns:
+        list[str]: The revisions applied by this call.
+    """
+    async with engine.begin() as conn:
+        applied = await applied_revisions(conn)
+
+    newly_applied = []
+    for migration in discover():
+        if migration.revision not in applied:
+            logger.info(f"Applying migration {migration.revision}: {migration.description}")
+            async with engine.begin() as conn:
+                await migration.upgrade(conn)
+                await conn.execute(
+                    text(f"INSERT OR IGNORE INTO {MIGRATIONS_TABLE} (revision, description) "
+                         "VALUES (:revision, :description)"),
+                    {"revision": migration.revision, "description": migration.description})
+            newly_applied.append(migration.revision)
+        if migration.revision == target:
+            break
+    return newly_applied
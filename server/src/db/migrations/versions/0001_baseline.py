@@ -0,0 +1,22 @@
+"""
+Baseline schema.
+
+Creates the tables that do not exist yet from the model metadata, which is what
+`init_db` used to do on every start. Databases created before migrations existed
+keep their tables; the revisions below bring them up to date. The model modules
+are imported here so the baseline does not depend on what the caller imported.
+"""
+import importlib
+
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from db.config import Base
+
+
+MODEL_MODULES = ("problems.models", "jobs.models")
+
+
+async def upgrade(conn: AsyncConnection):
+    for module in MODEL_MODULES:
+        importlib.import_module(module)
+    await conn.run_sync(Base.metadata.create_all)
@@ -0,0 +1,19 @@
+"""
+Add the compressed description columns to problems.
+
+Tables created by the baseline already have them; `create_all` does not add
+columns to existing tables, so older databases get them here. The data itself
+is compressed by `utils.migrate_descriptions`.
+"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+async def upgrade(conn: AsyncConnection):
+    columns = {row[1] for row in await conn.execute(text("PRAGMA table_info(problems)"))}
+    if "description_zstd" not in columns:
+        await conn.execute(text("ALTER TABLE problems ADD COLUMN description_zstd BLOB"))
+    if "description_dict_version" not in columns:
+        await conn.execute(text(
+            "ALTER TABLE problems ADD COLUMN description_dict_version INTEGER "
+            "REFERENCES description_dictionaries(id)"))
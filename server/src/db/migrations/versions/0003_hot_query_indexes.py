@@ -0,0 +1,57 @@
+"""
+Index the hot problem list queries.
+
+- problem_tags (tag_id, problem_id): tag-first filtering; the primary key
+  only serves problem-first lookups.
+- unique tags (name): tag filters resolve names to IDs. Duplicate tag rows
+  are merged into the oldest one first.
+- problems (difficulty, acceptance_rate, id): difficulty filters sorted by
+  acceptance rate, with the id tie-breaker used for paging.
+- The (created_at, id) / (updated_at, id) keyset pagination indexes, which
+  `create_all` never added to tables that already existed; they replace the
+  old single-column updated_at indexes.
+"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+KEYSET_TABLES = ("problems", "tags", "problem_code_generated", "description_dictionaries", "jobs")
+
+
+async def _merge_duplicate_tags(conn: AsyncConnection):
+    await conn.execute(text("""
+        CREATE TEMP TABLE tag_merges AS
+        SELECT t.id AS old_id, keep.id AS new_id
+        FROM tags t
+        JOIN (SELECT name, MIN(id) AS id FROM tags GROUP BY name) keep ON keep.name = t.name
+        WHERE t.id != keep.id
+    """))
+    await conn.execute(text("""
+        INSERT OR IGNORE INTO problem_tags (problem_id, tag_id, created_at, updated_at)
+        SELECT pt.problem_id, m.new_id, pt.created_at, pt.updated_at
+        FROM problem_tags pt JOIN tag_merges m ON m.old_id = pt.tag_id
+    """))
+    await conn.execute(text("DELETE FROM problem_tags WHERE tag_id IN (SELECT old_id FROM tag_merges)"))
+    await conn.execute(text("DELETE FROM tags WHERE id IN (SELECT old_id FROM tag_merges)"))
+    await conn.execute(text("DROP TABLE tag_merges"))
+
+
+async def upgrade(conn: AsyncConnection):
+    await _merge_duplicate_tags(conn)
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_problem_tags_tag_id_problem_id "
+        "ON problem_tags (tag_id, problem_id)"))
+    await conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_tags_name ON tags (name)"))
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_problems_difficulty_acceptance_rate_id "
+        "ON problems (difficulty, acceptance_rate, id)"))
+
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_problem_tags_updated_at ON problem_tags (updated_at)"))
+    for table in KEYSET_TABLES:
+        # Superseded by the composite (updated_at, id) index
+        await conn.execute(text(f"DROP INDEX IF EXISTS ix_{table}_updated_at"))
+        for column in ("created_at", "updated_at"):
+            await conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_id ON {table} ({column}, id)"))
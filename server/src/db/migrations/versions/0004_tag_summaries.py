@@ -0,0 +1,11 @@
+"""
+Add the materialized tag summaries and fill them from the existing problems.
+"""
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from problems.models import TagSummary
+
+
+async def upgrade(conn: AsyncConnection):
+    await conn.run_sync(lambda sync_conn: TagSummary.__table__.create(sync_conn, checkfirst=True))
+    await conn.execute(TagSummary.refresh_statement())
@@ -0,0 +1,15 @@
+"""
+Store complexities with generated solutions and index solution cache lookups.
+"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+async def upgrade(conn: AsyncConnection):
+    columns = {row[1] for row in await conn.execute(text("PRAGMA table_info(problem_code_generated)"))}
+    for column in ("time_complexity", "space_complexity"):
+        if column not in columns:
+            await conn.execute(text(f"ALTER TABLE problem_code_generated ADD COLUMN {column} VARCHAR"))
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_problem_code_generated_problem_id_language_model "
+        "ON problem_code_generated (problem_id, language, model)"))
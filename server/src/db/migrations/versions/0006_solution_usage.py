@@ -0,0 +1,20 @@
+"""
+Record where a stored solution came from and what generating it cost.
+"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+COLUMNS = {
+    "source_language": "VARCHAR",
+    "prompt_tokens": "INTEGER",
+    "completion_tokens": "INTEGER",
+    "latency_ms": "INTEGER",
+}
+
+
+async def upgrade(conn: AsyncConnection):
+    columns = {row[1] for row in await conn.execute(text("PRAGMA table_info(problem_code_generated)"))}
+    for column, column_type in COLUMNS.items():
+        if column not in columns:
+            await conn.execute(text(f"ALTER TABLE problem_code_generated ADD COLUMN {column} {column_type}"))
@@ -0,0 +1,10 @@
+"""
+Add the LLM usage ledger.
+"""
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from usage.models import LLMUsage
+
+
+async def upgrade(conn: AsyncConnection):
+    await conn.run_sync(lambda sync_conn: LLMUsage.__table__.create(sync_conn, checkfirst=True))
@@ -0,0 +1,44 @@
+"""
+Store the LeetCode slug and number of every problem, each behind a unique index.
+
+Slugs of existing rows are backfilled from their links. Numbers cannot be derived
+from what is stored, so they stay NULL until the next ingest fills them in.
+"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from problems.slugs import normalize_slug
+
+
+COLUMNS = {
+    "slug": "VARCHAR",
+    "number": "INTEGER",
+}
+
+
+async def _backfill_slugs(conn: AsyncConnection):
+    rows = (await conn.execute(text(
+        "SELECT id, link FROM problems WHERE slug IS NULL ORDER BY id"))).all()
+    taken = {row[0] for row in await conn.execute(text(
+        "SELECT slug FROM problems WHERE slug IS NOT NULL"))}
+    updates = []
+    for problem_id, link in rows:
+        slug = normalize_slug(link or "")
+        # The oldest row keeps a duplicated slug; the unique index rejects the rest
+        if slug and slug not in taken:
+            taken.add(slug)
+            updates.append({"id": problem_id, "slug": slug})
+    if updates:
+        await conn.execute(text("UPDATE problems SET slug = :slug WHERE id = :id"), updates)
+
+
+async def upgrade(conn: AsyncConnection):
+    columns = {row[1] for row in await conn.execute(text("PRAGMA table_info(problems)"))}
+    for column, column_type in COLUMNS.items():
+        if column not in columns:
+            await conn.execute(text(f"ALTER TABLE problems ADD COLUMN {column} {column_type}"))
+
+    await _backfill_slugs(conn)
+    for column in COLUMNS:
+        await conn.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS ix_problems_{column} ON problems ({column})"))
@@ -0,0 +1,13 @@
+"""
+Store descriptions sanitized and split into statement, examples and constraints at ingest.
+
+Existing rows stay NULL until the next ingest renders them.
+"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+async def upgrade(conn: AsyncConnection):
+    columns = {row[1] for row in await conn.execute(text("PRAGMA table_info(problems)"))}
+    if "rendered_zstd" not in columns:
+        await conn.execute(text("ALTER TABLE problems ADD COLUMN rendered_zstd BLOB"))
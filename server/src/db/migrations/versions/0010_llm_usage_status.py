@@ -0,0 +1,11 @@
+"""
+Record how every LLM call ended, so cancelled and failed calls show up in the ledger.
+"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+async def upgrade(conn: AsyncConnection):
+    columns = {row[1] for row in await conn.execute(text("PRAGMA table_info(llm_usage)"))}
+    if "status" not in columns:
+        await conn.execute(text("ALTER TABLE llm_usage ADD COLUMN status VARCHAR NOT NULL DEFAULT 'ok'"))
@@ -0,0 +1,14 @@
+"""
+Index problem lists sorted by acceptance rate without a difficulty filter.
+
+- problems (acceptance_rate, id): the whole catalog, tag filters and filters on
+  several difficulties sorted by acceptance rate are read in order from it and
+  stop at the page limit, instead of being sorted in a temporary b-tree.
+"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_problems_acceptance_rate_id ON problems (acceptance_rate, id)"))
@@ -1,19 +1,27 @@
+import os
+import json
 import uuid
+import base64
+from enum import Enum
 from datetime import datetime
 from dataclasses import dataclass
 from typing import TypeVar, Generic, Literal, Optional
 from loguru import logger
+from cachetools import TTLCache
 
 from sqlalchemy.orm import Session, Mapped, mapped_column
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import DateTime, func, Integer, String, select, asc, desc
+from sqlalchemy import (DateTime, func, Integer, String, Index, select, asc, desc,
+                        event, literal, literal_column, or_, tuple_, type_coerce)
 
 from .context import with_session
 from cache import Cache
 
 T = TypeVar('T')
 
+MAX_BATCH_SIZE = 300
+
 
 @dataclass
 class PaginatedResponse(Generic[T]):
@@ -24,6 +32,24 @@ class PaginatedResponse(Generic[T]):
     items: list[T]
     has_next: bool
     total_count: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class CountStrategy(str, Enum):
+    """
+    How a paginated query computes its total count.
+
+    EXACT runs COUNT(*) on every call, CACHED reuses an exact count for
+    COUNT_CACHE_TTL seconds, ESTIMATED reads max(rowid) and NONE skips counting.
+    """
+    EXACT = "exact"
+    CACHED = "cached"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
+COUNT_CACHE_TTL = float(os.getenv("COUNT_CACHE_TTL", "30"))
+_count_cache = TTLCache[str, int](maxsize=256, ttl=COUNT_CACHE_TTL)
 
 
 class TimestampMixin(object):
@@ -43,7 +69,6 @@ class TimestampMixin(object):
             DateTime(timezone=True),
             server_default=func.now(),
             onupdate=func.now(),
-            index=True,  # create index for updated_at
             nullable=False
         )
 
@@ -60,47 +85,125 @@ class TimestampMixin(object):
     async def get_pagination(cls, session: AsyncSession,
                              order_type: Literal['created_asc',
                                                  'updated_desc'] = 'updated_desc',
-                             cursor: Optional[datetime] = None,
-                             limit: int = 10) -> PaginatedResponse[T]:
+                             cursor: Optional[str] = None,
+                             limit: int = 10,
+                             count_strategy: CountStrategy = CountStrategy.CACHED) -> PaginatedResponse[T]:
         """
-        Get a paginated response for the model.
+        Get a keyset-paginated response for the model.
+
+        Rows are ordered by (timestamp, id) and the cursor encodes both values of the
+        last row of the previous page, so rows sharing a timestamp are neither skipped
+        nor repeated and every page is a range scan over the composite index.
 
         Args:
             session: The database session.
             order_type: The type of order to use for the pagination.
-            cursor: The cursor to use for the pagination.
+            cursor: The opaque cursor returned as `next_cursor` by the previous page.
             limit: The limit of items to return.
+            count_strategy: How the total count should be computed.
 
         Returns:
             A paginated response for the model.
+
+        Raises:
+            ValueError: If the limit is not positive or the cursor is malformed.
         """
-        if cursor is None or cursor == datetime.min:
-            cursor = datetime.now() if order_type == 'updated_desc' else datetime.min
+        if limit < 1:
+            raise ValueError("Limit must be a positive integer")
 
         if order_type == 'created_asc':
             order_column = cls.created_at
             order_func = asc
-            operator = '>'
         elif order_type == 'updated_desc':
             order_column = cls.updated_at
             order_func = desc
-            operator = '<'
+        else:
+            raise ValueError(f"Unsupported order type: {order_type}")
+
+        # Compare on the stored representation, so the cursor round-trips exactly
+        # no matter how the driver parses timestamps or time zones.
+        stored_ts = type_coerce(order_column, String)
+        query = select(cls, stored_ts.label('cursor_ts'))
+
+        if cursor is not None:
+            cursor_ts, cursor_id = _decode_cursor(cursor)
+            key = tuple_(stored_ts, cls.id)
+            bound = tuple_(literal(cursor_ts, String), literal(cursor_id, Integer))
+            query = query.where(key > bound if order_func is asc else key < bound)
 
         logger.info(f"Ordering by {order_type} with cursor {cursor}")
 
-        query = select(cls).where(
-            order_column.op(operator)(cursor)
-        ).order_by(order_func(order_column)).limit(limit)
+        query = query.order_by(order_func(order_column), order_func(cls.id)).limit(limit + 1)
+        rows = (await session.execute(query)).all()
 
-        result = await session.execute(query)
-        items = result.scalars().unique().all()
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        items = [row[0] for row in rows]
+        next_cursor = _encode_cursor(rows[-1].cursor_ts, rows[-1][0].id) if has_next else None
 
-        total_count = await session.scalar(
-            select(func.count()).select_from(cls)
-        )
+        total_count = await cls._count_rows(session, count_strategy)
         return PaginatedResponse(items=items,
-                                 has_next=len(items) == limit,
-                                 total_count=total_count)
+                                 has_next=has_next,
+                                 total_count=total_count,
+                                 next_cursor=next_cursor)
+
+    @classmethod
+    async def _count_rows(cls, session: AsyncSession, strategy: CountStrategy) -> Optional[int]:
+        """
+        Count the rows of the model using the given strategy.
+        """
+        if strategy == CountStrategy.NONE:
+            return None
+
+        if strategy == CountStrategy.ESTIMATED:
+            # max(rowid) is a single b-tree descent; it over-counts only after deletes.
+            return await session.scalar(
+                select(func.coalesce(func.max(literal_column('rowid')), 0)).select_from(cls)
+            )
+
+        if strategy == CountStrategy.CACHED:
+            cached = _count_cache.get(cls.__name__)
+            if cached is not None:
+                return cached
+
+        total_count = await session.scalar(select(func.count()).select_from(cls))
+        _count_cache[cls.__name__] = total_count
+        return total_count
+
+
+def _encode_cursor(timestamp: str, row_id: int) -> str:
+    """
+    Encode the (timestamp, id) pair of a row into an opaque cursor.
+    """
+    payload = json.dumps([timestamp, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: str) -> tuple[str, int]:
+    """
+    Decode an opaque cursor back into its (timestamp, id) pair.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(timestamp, str) or not isinstance(row_id, int):
+            raise TypeError
+        return timestamp, row_id
+    except (ValueError, TypeError) as error:
+        raise ValueError(f"Invalid pagination cursor: {cursor}") from error
+
+
+@event.listens_for(TimestampMixin, 'after_mapper_constructed', propagate=True)
+def _add_keyset_indexes(mapper, cls):
+    """
+    Back keyset pagination with composite (timestamp, id) indexes.
+    """
+    table = mapper.local_table
+    if 'id' not in table.c:
+        Index(f'ix_{table.name}_updated_at', table.c.updated_at)
+        return
+    for column in ('created_at', 'updated_at'):
+        Index(f'ix_{table.name}_{column}_id', table.c[column], table.c.id)
 
 
 class PublicIDMixin:
@@ -134,6 +237,18 @@ class PublicIDMixin:
         unique_id = str(uuid.uuid4())
         return f"{prefix}_{unique_id}"
 
+    @classmethod
+    def _cache_key(cls, public_id: str) -> str:
+        return f"{cls.__name__}:{public_id}"
+
+    @classmethod
+    def _batch_load_options(cls) -> list:
+        """
+        Loader options applied when fetching many instances at once.
+        Models override this to eager-load the relationships they serve.
+        """
+        return []
+
     @classmethod
     @with_session()
     async def get_by_public_id(cls, session: AsyncSession, public_id: str):
@@ -141,19 +256,79 @@ class PublicIDMixin:
         Get a model instance by its public ID.
         Uses the session decorator for cleaner transaction management.
         """
-        def cache_key():
-            return f"{cls.__name__}:{public_id}"
-
-        internal_id = Cache.get(cache_key())
+        internal_id = Cache.get(cls._cache_key(public_id))
         if internal_id:
-            return await cls.get_by_internal_id(internal_id)
+            result = await session.get(cls, internal_id)
+            if result is not None and result.public_id == public_id:
+                return result
 
         result = await session.scalar(
             select(cls).where(cls.public_id == public_id)
         )
-        Cache.set(cache_key(), result.id)
+        if result is not None:
+            Cache.set(cls._cache_key(public_id), result.id)
         return result
 
+    @classmethod
+    @with_session()
+    async def get_by_public_ids(cls, session: AsyncSession, public_ids: list[str]) -> list[Optional[T]]:
+        """
+        Get many model instances by their public IDs in a single query.
+
+        IDs whose internal ID is cached are looked up by primary key, the rest by
+        public ID, and both are resolved together in one statement. A cached ID
+        that no longer maps to its public ID is evicted and looked up again by
+        public ID.
+
+        Args:
+            session: The database session.
+            public_ids: The public IDs to look up, at most MAX_BATCH_SIZE of them.
+
+        Returns:
+            The instances in request order, with None for every ID that was not found.
+
+        Raises:
+            ValueError: If more than MAX_BATCH_SIZE IDs are requested.
+        """
+        if len(public_ids) > MAX_BATCH_SIZE:
+            raise ValueError(f"At most {MAX_BATCH_SIZE} IDs can be fetched at once")
+
+        unique_ids = list(dict.fromkeys(public_ids))
+        if not unique_ids:
+            return []
+
+        cached = Cache.get_many([cls._cache_key(pid) for pid in unique_ids])
+        cached_ids = [cached[cls._cache_key(pid)] for pid in unique_ids
+                      if cls._cache_key(pid) in cached]
+        missed = [pid for pid in unique_ids if cls._cache_key(pid) not in cached]
+
+        conditions = []
+        if cached_ids:
+            conditions.append(cls.id.in_(cached_ids))
+        if missed:
+            conditions.append(cls.public_id.in_(missed))
+
+        result = await session.scalars(
+            select(cls).where(or_(*conditions)).options(*cls._batch_load_options())
+        )
+        found = {obj.public_id: obj for obj in result.all()}
+
+        stale = [pid for pid in unique_ids if pid not in found and pid not in missed]
+        if stale:
+            for pid in stale:
+                Cache.delete(cls._cache_key(pid))
+            result = await session.scalars(
+                select(cls).where(cls.public_id.in_(stale)).options(*cls._batch_load_options())
+            )
+            found.update((obj.public_id, obj) for obj in result.all())
+            missed.extend(stale)
+
+        for pid in missed:
+            if pid in found:
+                Cache.set(cls._cache_key(pid), found[pid].id)
+
+        return [found.get(pid) for pid in public_ids]
+
     @classmethod
     @with_session()
     async def get_by_internal_id(cls, session: AsyncSession, internal_id: int):
@@ -0,0 +1,13 @@
+from .models import Job, JobStatus
+from .queue import JobQueue, JobInfo, JobNotFoundError, job_queue
+from .handler import router as jobs_router
+
+__all__ = [
+    "Job",
+    "JobStatus",
+    "JobQueue",
+    "JobInfo",
+    "JobNotFoundError",
+    "job_queue",
+    "jobs_router"
+]
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, HTTPException, Request, status
+from serve.stream import stream_response
+from .queue import job_queue, JobNotFoundError
+
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    try:
+        return await job_queue.status(job_id)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str):
+    try:
+        info = await job_queue.status(job_id)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return {"status": info.status, "result": info.result, "error": info.error}
+
+
+@router.delete("/{job_id}")
+async def cancel_job(job_id: str):
+    try:
+        cancelled = await job_queue.cancel(job_id)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return {"cancelled": cancelled}
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    try:
+        await job_queue.status(job_id)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return stream_response(lambda: job_queue.events(job_id), request)
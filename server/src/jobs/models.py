@@ -0,0 +1,54 @@
+from enum import Enum
+from typing import Optional
+from sqlalchemy import Float, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+from db import Base, PublicIDMixin, TimestampMixin
+
+
+class JobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+TERMINAL_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class Job(Base, PublicIDMixin, TimestampMixin):
+    """
+    A unit of background work persisted in the database.
+
+    Times used for scheduling are stored as POSIX timestamps so that claims
+    and lease checks compare plain numbers.
+
+    Attributes:
+        kind (str): The registered handler that runs the job.
+        status (str): The current JobStatus of the job.
+        payload (str): JSON-encoded handler arguments.
+        result (str | None): JSON-encoded handler result once succeeded.
+        error (str | None): The last error message.
+        progress (str | None): JSON-encoded last progress report.
+        attempts (int): How many times the job has been claimed.
+        max_attempts (int): How many claims are allowed before the job fails.
+        run_after (float): Earliest time the job may be claimed.
+        lease_owner (str | None): The worker currently holding the job.
+        lease_expires_at (float | None): When the current lease runs out.
+    """
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        Index('ix_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    status: Mapped[str] = mapped_column(String, nullable=False, default=JobStatus.PENDING.value)
+    payload: Mapped[str] = mapped_column(String, nullable=False)
+    result: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    progress: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=3)
+    run_after: Mapped[float] = mapped_column(Float, nullable=False)
+    lease_owner: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    lease_expires_at: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
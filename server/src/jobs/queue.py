@@ -0,0 +1,359 @@
+import os
+import json
+import time
+import uuid
+import random
+import asyncio
+from typing import Any, AsyncGenerator, Awaitable, Callable, Optional
+
+from loguru import logger
+from pydantic import BaseModel
+from sqlalchemy import and_, insert, or_, select, update
+
+from db import db_session
+from .models import Job, JobStatus, TERMINAL_STATUSES
+
+
+ProgressReporter = Callable[[dict], Awaitable[None]]
+JobHandler = Callable[[dict, ProgressReporter], Awaitable[Any]]
+
+
+class JobNotFoundError(Exception):
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        super().__init__(f"Job with id {job_id} not found")
+
+
+class JobInfo(BaseModel):
+    """
+    Public view of a job.
+    """
+    id: str
+    kind: str
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    progress: Optional[Any] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+
+_INFO_COLUMNS = (Job.public_id, Job.kind, Job.status, Job.attempts, Job.max_attempts,
+                 Job.progress, Job.result, Job.error)
+
+
+def _to_info(row) -> JobInfo:
+    return JobInfo(
+        id=row.public_id,
+        kind=row.kind,
+        status=row.status,
+        attempts=row.attempts,
+        max_attempts=row.max_attempts,
+        progress=json.loads(row.progress) if row.progress else None,
+        result=json.loads(row.result) if row.result else None,
+        error=row.error,
+    )
+
+
+class JobQueue:
+    """
+    In-process async job queue backed by the `jobs` table.
+
+    Any number of processes may run workers against the same database. A worker
+    claims a job with a single UPDATE that takes a time-limited lease, and renews
+    the lease while the handler runs. When a process dies its leases expire and
+    the jobs are claimed again, up to `max_attempts` claims in total. Failed
+    attempts are retried with exponential backoff and jitter.
+
+    Args:
+        workers (int): Number of concurrent worker tasks in this process.
+        lease_seconds (float): How long a claim is valid without renewal.
+        poll_interval (float): How often idle workers look for new jobs.
+        backoff_base (float): Delay before the first retry; doubled for every further one.
+        backoff_max (float): Upper bound on the retry delay.
+    """
+
+    def __init__(self,
+                 workers: int = int(os.getenv("JOB_WORKERS", "2")),
+                 lease_seconds: float = float(os.getenv("JOB_LEASE_SECONDS", "30")),
+                 poll_interval: float = float(os.getenv("JOB_POLL_INTERVAL", "0.5")),
+                 backoff_base: float = 2.0,
+                 backoff_max: float = 60.0):
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._handlers: dict[str, JobHandler] = {}
+        self._worker_tasks: list[asyncio.Task] = []
+        self._running: dict[str, asyncio.Task] = {}
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._changed = asyncio.Event()
+
+    def handler(self, kind: str) -> Callable[[JobHandler], JobHandler]:
+        """
+        Decorator registering the coroutine that runs jobs of the given kind.
+
+        The handler receives the job payload and a coroutine to report progress
+        with, and returns a JSON-serializable result.
+        """
+        def decorator(function: JobHandler) -> JobHandler:
+            self._handlers[kind] = function
+            return function
+        return decorator
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def submit(self, kind: str, payload: dict, max_attempts: int = 3) -> str:
+        """
+        Persists a new job and wakes up an idle worker.
+
+        Args:
+            kind (str): The registered handler to run.
+            payload (dict): JSON-serializable handler arguments.
+            max_attempts (int): How many times the job may be tried.
+
+        Returns:
+            str: The public ID of the job.
+
+        Raises:
+            ValueError: If no handler is registered for the kind.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind: {kind}")
+
+        public_id = Job.generate_public_id()
+        async with db_session() as session:
+            await session.execute(insert(Job).values(
+                public_id=public_id,
+                kind=kind,
+                status=JobStatus.PENDING.value,
+                payload=json.dumps(payload),
+                attempts=0,
+                max_attempts=max_attempts,
+                run_after=time.time(),
+            ))
+        self._wakeup.set()
+        return public_id
+
+    async def status(self, job_id: str) -> JobInfo:
+        """
+        Returns the current state of a job.
+
+        Raises:
+            JobNotFoundError: If the job does not exist.
+        """
+        async with db_session() as session:
+            row = (await session.execute(
+                select(*_INFO_COLUMNS).where(Job.public_id == job_id)
+            )).first()
+        if row is None:
+            raise JobNotFoundError(job_id)
+        return _to_info(row)
+
+    async def result(self, job_id: str) -> Any:
+        """
+        Returns the result of a succeeded job, or None if it has not succeeded.
+        """
+        return (await self.status(job_id)).result
+
+    async def cancel(self, job_id: str) -> bool:
+        """
+        Cancels a pending or running job.
+
+        A running job is interrupted right away if it runs in this process, and at
+        the next lease renewal otherwise.
+
+        Returns:
+            bool: True if the job was cancelled, False if it had already finished.
+        """
+        async with db_session() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.public_id == job_id,
+                       Job.status.in_([JobStatus.PENDING.value, JobStatus.RUNNING.value]))
+                .values(status=JobStatus.CANCELLED.value, lease_owner=None, lease_expires_at=None)
+            )
+        cancelled = result.rowcount > 0
+        if not cancelled:
+            await self.status(job_id)
+        task = self._running.get(job_id)
+        if cancelled and task is not None:
+            task.cancel()
+        self._notify()
+        return cancelled
+
+    async def events(self, job_id: str) -> AsyncGenerator[dict, None]:
+        """
+        Yields the job state every time it changes until the job finishes.
+        Changes made in this process are delivered immediately, others on the next poll.
+        """
+        last = None
+        while True:
+            changed = self._changed
+            info = await self.status(job_id)
+            state = info.model_dump(mode="json")
+            if state != last:
+                last = state
+                yield state
+            if info.status in TERMINAL_STATUSES:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self):
+        """
+        Starts the worker tasks of this process.
+        """
+        if self._worker_tasks:
+            return
+        self._stopping = False
+        self._worker_tasks = [asyncio.create_task(self._work(i)) for i in range(self.workers)]
+        logger.info(f"Started {self.workers} job workers ({self._owner})")
+
+    async def stop(self):
+        """
+        Stops the workers. Interrupted jobs keep their lease and are picked up
+        again once it expires.
+        """
+        self._stopping = True
+        self._wakeup.set()
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def _claim(self):
+        now = time.time()
+        claimable = (
+            select(Job.id)
+            .where(or_(
+                and_(Job.status == JobStatus.PENDING.value, Job.run_after <= now),
+                and_(Job.status == JobStatus.RUNNING.value, Job.lease_expires_at < now),
+            ))
+            .order_by(Job.run_after)
+            .limit(1)
+            .scalar_subquery()
+        )
+        async with db_session() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.id == claimable)
+                .values(status=JobStatus.RUNNING.value,
+                        lease_owner=self._owner,
+                        lease_expires_at=now + self.lease_seconds,
+                        attempts=Job.attempts + 1)
+                .returning(Job.public_id, Job.kind, Job.payload, Job.attempts, Job.max_attempts)
+            )
+            return result.first()
+
+    async def _owned_update(self, job_id: str, **values) -> bool:
+        """
+        Updates a job only while this worker still holds its lease.
+        """
+        async with db_session() as session:
+            result = await session.execute(
+                update(Job)
+                .where(Job.public_id == job_id,
+                       Job.lease_owner == self._owner,
+                       Job.status == JobStatus.RUNNING.value)
+                .values(**values)
+            )
+        self._notify()
+        return result.rowcount > 0
+
+    async def _work(self, index: int):
+        while not self._stopping:
+            try:
+                job = await self._claim()
+            except Exception as e:
+                logger.error(f"Job worker {index} failed to claim a job: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self._run(job)
+            except Exception as e:
+                # The job keeps its lease and is picked up again once it expires
+                logger.error(f"Job worker {index} failed while running job {job.public_id}: {e}")
+
+    async def _run(self, job):
+        job_id = job.public_id
+        if job.attempts > job.max_attempts:
+            await self._owned_update(job_id, status=JobStatus.FAILED.value, lease_owner=None,
+                                     error="Lease expired after the last attempt")
+            return
+
+        handler = self._handlers.get(job.kind)
+        if handler is None:
+            await self._owned_update(job_id, status=JobStatus.FAILED.value, lease_owner=None,
+                                     error=f"No handler registered for job kind: {job.kind}")
+            return
+
+        async def report(progress: dict):
+            await self._owned_update(job_id, progress=json.dumps(progress))
+
+        logger.info(f"Running job {job_id} ({job.kind}), attempt {job.attempts}/{job.max_attempts}")
+        task = asyncio.create_task(handler(json.loads(job.payload), report))
+        self._running[job_id] = task
+        renewal = asyncio.create_task(self._renew_lease(job_id, task))
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                raise
+            logger.info(f"Job {job_id} was cancelled or lost its lease")
+            return
+        except Exception as e:
+            await self._fail(job, e)
+            return
+        finally:
+            renewal.cancel()
+            self._running.pop(job_id, None)
+
+        await self._owned_update(job_id, status=JobStatus.SUCCEEDED.value,
+                                 result=json.dumps(result, default=str),
+                                 lease_owner=None, lease_expires_at=None, error=None)
+
+    async def _fail(self, job, error: Exception):
+        logger.error(f"Job {job.public_id} attempt {job.attempts} failed: {error}")
+        if job.attempts >= job.max_attempts:
+            await self._owned_update(job.public_id, status=JobStatus.FAILED.value,
+                                     error=str(error), lease_owner=None, lease_expires_at=None)
+            return
+
+        delay = min(self.backoff_base * 2 ** (job.attempts - 1), self.backoff_max)
+        delay *= random.uniform(0.5, 1.0)
+        await self._owned_update(job.public_id, status=JobStatus.PENDING.value,
+                                 error=str(error), run_after=time.time() + delay,
+                                 lease_owner=None, lease_expires_at=None)
+
+    async def _renew_lease(self, job_id: str, task: asyncio.Task):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                renewed = await self._owned_update(
+                    job_id, lease_expires_at=time.time() + self.lease_seconds)
+            except Exception as e:
+                logger.warning(f"Could not renew lease of job {job_id}: {e}")
+                continue
+            if not renewed:
+                task.cancel()
+                return
+
+
+job_queue = JobQueue()
@@ -0,0 +1,183 @@
+import os
+import time
+import asyncio
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+from loguru import logger
+
+
+DEFAULT_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "45"))
+HEDGE_AFTER_SECONDS = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "8"))
+HEDGE_MODEL = os.getenv("LLM_HEDGE_MODEL", "gpt-4o-mini")
+
+T = TypeVar('T')
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when no valid answer arrived within the latency budget."""
+
+
+class Deadline:
+    """
+    An absolute point in time a request must be answered by.
+
+    Set it once where the request enters and read it wherever work is started, so
+    every layer below spends only what is left of the budget.
+    """
+    __slots__ = ("expires_at",)
+
+    def __init__(self, budget_seconds: float):
+        self.expires_at = time.monotonic() + budget_seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar("deadline", default=None)
+
+
+def set_deadline(budget_seconds: float) -> Deadline:
+    """
+    Starts a deadline for the current context, unless a tighter one is already set.
+    """
+    current = _current_deadline.get()
+    deadline = Deadline(budget_seconds)
+    if current is not None and current.expires_at <= deadline.expires_at:
+        return current
+    _current_deadline.set(deadline)
+    return deadline
+
+
+def current_deadline() -> Deadline:
+    """
+    Returns the deadline of the current context, starting the default one if none was set.
+    """
+    return _current_deadline.get() or set_deadline(DEFAULT_DEADLINE_SECONDS)
+
+
+@dataclass(frozen=True)
+class HedgeResult(Generic[T]):
+    """
+    The answer of a hedged call and how it was obtained.
+
+    Attributes:
+        value (T): The first valid answer.
+        model (str): The model that produced it.
+        path (str): "primary", "hedge" (started after the hedge delay) or
+            "fallback" (started because the primary failed).
+        latency (float): Seconds from the start of the call to the answer.
+    """
+    value: T
+    model: str
+    path: str
+    latency: float
+
+
+class HedgeStats:
+    """
+    Which path won recent hedged calls, and how fast, to tune the hedge delay.
+    """
+    wins: dict[str, int] = {"primary": 0, "hedge": 0, "fallback": 0}
+    deadline_exceeded: int = 0
+    _latencies: deque[float] = deque(maxlen=1000)
+
+    @classmethod
+    def record(cls, result: HedgeResult):
+        cls.wins[result.path] += 1
+        cls._latencies.append(result.latency)
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        latencies = sorted(cls._latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3)
+
+        return {
+            "wins": dict(cls.wins),
+            "deadline_exceeded": cls.deadline_exceeded,
+            "latency_p50": percentile(0.50),
+            "latency_p95": percentile(0.95),
+            "latency_p99": percentile(0.99),
+        }
+
+
+async def hedged_call(attempt: Callable[[str, float], Awaitable[T]],
+                      primary: str,
+                      hedge: str = HEDGE_MODEL,
+                      hedge_after: float = HEDGE_AFTER_SECONDS,
+                      deadline: Optional[Deadline] = None) -> HedgeResult[T]:
+    """
+    Runs `attempt` on the primary model and, if it has not produced a valid answer
+    after `hedge_after` seconds, on the hedge model too. The first valid answer wins
+    and the other call is cancelled. If the primary fails outright, the hedge model
+    is started right away as a fallback.
+
+    Args:
+        attempt (Callable[[str, float], Awaitable[T]]): Calls a model by name with a
+            timeout in seconds and returns a validated answer; raising means invalid.
+        primary (str): The model asked first.
+        hedge (str): The model asked second.
+        hedge_after (float): Seconds to wait for the primary before hedging.
+        deadline (Optional[Deadline]): The latency budget; defaults to the current one.
+
+    Returns:
+        HedgeResult[T]: The winning answer.
+
+    Raises:
+        DeadlineExceeded: If no valid answer arrived before the deadline.
+        Exception: The last error if both calls failed.
+    """
+    deadline = deadline or current_deadline()
+    started = time.monotonic()
+
+    def start(model: str, path: str) -> asyncio.Task:
+        task = asyncio.create_task(attempt(model, deadline.remaining()))
+        attempts[task] = (model, path)
+        return task
+
+    attempts: dict[asyncio.Task, tuple[str, str]] = {}
+    pending = {start(primary, "primary")}
+    error: Optional[BaseException] = None
+
+    try:
+        while pending:
+            hedged = len(attempts) > 1
+            timeout = deadline.remaining()
+            if not hedged:
+                timeout = min(timeout, max(0.0, hedge_after - (time.monotonic() - started)))
+            done, pending = await asyncio.wait(pending, timeout=timeout,
+                                               return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                model, path = attempts[task]
+                if task.exception() is None:
+                    result = HedgeResult(task.result(), model, path, time.monotonic() - started)
+                    HedgeStats.record(result)
+                    logger.info(f"LLM call answered by {model} ({path}) in {result.latency:.2f}s")
+                    return result
+                error = task.exception()
+                logger.warning(f"LLM call to {model} ({path}) failed: {error}")
+
+            if deadline.expired:
+                break
+            if not hedged and (done or time.monotonic() - started >= hedge_after):
+                pending.add(start(hedge, "fallback" if done else "hedge"))
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if deadline.expired:
+        HedgeStats.deadline_exceeded += 1
+        models = ", ".join(model for model, _ in attempts.values())
+        raise DeadlineExceeded(f"No valid answer from {models} within the deadline")
+    raise error
@@ -0,0 +1,165 @@
+import os
+import time
+import asyncio
+from collections import deque
+from importlib.util import find_spec
+from typing import Optional
+
+import httpx
+from loguru import logger
+
+
+LLM_BASE_URL = os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1"
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "64"))
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "32"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "90"))
+LLM_POOL_TIMEOUT = float(os.getenv("LLM_POOL_TIMEOUT", "10"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_WARMUP_CONNECTIONS = int(os.getenv("LLM_WARMUP_CONNECTIONS", "2"))
+
+# HTTP/2 needs the optional `h2` package; without it the pool speaks HTTP/1.1.
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "true").lower() == "true" and find_spec("h2") is not None
+
+
+class HTTPPoolStats:
+    """
+    How the shared LLM connection pool is used: requests in flight, how many new
+    connections (and TLS handshakes) were needed, and how long requests waited for a
+    connection before their headers could be sent.
+    """
+    requests: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    connections_opened: int = 0
+    tls_handshakes: int = 0
+    pool_timeouts: int = 0
+    _waits: deque[float] = deque(maxlen=1000)
+
+    @classmethod
+    def record_wait(cls, seconds: float):
+        cls._waits.append(seconds)
+
+    @classmethod
+    def snapshot(cls, pool=None) -> dict:
+        waits = sorted(cls._waits)
+
+        def percentile(p: float) -> Optional[float]:
+            if not waits:
+                return None
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 3)
+
+        connections = list(getattr(pool, "connections", []))
+        return {
+            "requests": cls.requests,
+            "in_flight": cls.in_flight,
+            "peak_in_flight": cls.peak_in_flight,
+            "connections_opened": cls.connections_opened,
+            "tls_handshakes": cls.tls_handshakes,
+            "pool_timeouts": cls.pool_timeouts,
+            "connections_open": len(connections),
+            "connections_idle": sum(1 for connection in connections if connection.is_idle()),
+            "max_connections": LLM_POOL_MAX_CONNECTIONS,
+            "http2": LLM_HTTP2,
+            "pool_wait_ms_p50": percentile(0.50),
+            "pool_wait_ms_p95": percentile(0.95),
+            "pool_wait_ms_p99": percentile(0.99),
+        }
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps the pooled transport and feeds HTTPPoolStats through httpcore's trace hook.
+
+    The time a request spends waiting for a pooled connection is the time until its
+    headers are sent, minus any time spent opening a connection for it.
+    """
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport):
+        self.transport = transport
+
+    @property
+    def pool(self):
+        return getattr(self.transport, "_pool", None)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        connecting = 0.0
+        marks: dict[str, float] = {}
+
+        async def trace(name: str, info: dict):
+            nonlocal connecting
+            now = time.perf_counter()
+            if name.endswith(".started"):
+                marks[name[:-len(".started")]] = now
+            elif name == "connection.connect_tcp.complete":
+                HTTPPoolStats.connections_opened += 1
+                connecting += now - marks.get("connection.connect_tcp", now)
+            elif name == "connection.start_tls.complete":
+                HTTPPoolStats.tls_handshakes += 1
+                connecting += now - marks.get("connection.start_tls", now)
+            if name.endswith("send_request_headers.started"):
+                HTTPPoolStats.record_wait(max(0.0, now - started - connecting))
+
+        request.extensions = {**request.extensions, "trace": trace}
+        cls = HTTPPoolStats
+        cls.requests += 1
+        cls.in_flight += 1
+        cls.peak_in_flight = max(cls.peak_in_flight, cls.in_flight)
+        try:
+            return await self.transport.handle_async_request(request)
+        except httpx.PoolTimeout:
+            cls.pool_timeouts += 1
+            raise
+        finally:
+            cls.in_flight -= 1
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+def create_llm_transport() -> InstrumentedTransport:
+    """
+    Builds the pooled transport shared by every LLM provider client.
+    """
+    return InstrumentedTransport(httpx.AsyncHTTPTransport(
+        http2=LLM_HTTP2,
+        limits=httpx.Limits(max_connections=LLM_POOL_MAX_CONNECTIONS,
+                            max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+                            keepalive_expiry=LLM_KEEPALIVE_EXPIRY),
+    ))
+
+
+llm_transport = create_llm_transport()
+
+# Provider clients pass their own timeout with each request; this one applies to
+# direct calls such as the warm-up.
+llm_http_client = httpx.AsyncClient(
+    transport=llm_transport,
+    timeout=httpx.Timeout(LLM_POOL_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+)
+
+
+async def warm_up(connections: int = LLM_WARMUP_CONNECTIONS, base_url: str = LLM_BASE_URL):
+    """
+    Opens `connections` pooled connections to the LLM API ahead of the first
+    generation, so it does not pay for DNS, TCP and TLS. Any response, even an
+    error status, leaves a warm connection behind; failures are only logged.
+    """
+    if connections <= 0:
+        return
+    url = base_url.rstrip("/") + "/models"
+    results = await asyncio.gather(*(llm_http_client.head(url) for _ in range(connections)),
+                                   return_exceptions=True)
+    failed = [result for result in results if isinstance(result, Exception)]
+    if failed:
+        logger.warning(f"LLM connection warm-up to {url} failed: {failed[0]!r}")
+    else:
+        logger.info(f"Warmed up {connections} LLM connections to {url}")
+
+
+def pool_stats() -> dict:
+    return HTTPPoolStats.snapshot(llm_transport.pool)
+
+
+async def close_llm_http_client():
+    await llm_http_client.aclose()
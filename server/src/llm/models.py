@@ -1,28 +1,35 @@
-from langchain_openai import ChatOpenAI
-from dotenv import load_dotenv
 import os
+import asyncio
+import functools
 from enum import Enum
+from .http import LLM_BASE_URL, llm_http_client
 
-load_dotenv()
 
-gpt_4o_mini = ChatOpenAI(
-    api_key=os.getenv("OPENAI_API_KEY"),
-    model_name="gpt-4o-mini",
-    temperature=0.0,
-    max_tokens=None,
-    max_retries=3,
-    request_timeout=30.0,
-)
+# Hedging in `llm.hedging` replaces retries as the answer to slow calls, and every
+# call is additionally bounded by the remaining request deadline.
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "30"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
 
+# Bounds the LLM calls in flight across the process, whichever route or job started them.
+llm_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
 
-gpt_4o = ChatOpenAI(
-    api_key=os.getenv("OPENAI_API_KEY"),
-    model_name="gpt-4o",
-    temperature=0.0,
-    max_tokens=None,
-    max_retries=3,
-    request_timeout=30.0,
-)
+
+@functools.cache
+def _build_model(model_name: str):
+    # langchain_openai is the slowest import of the app; only pay for it once a model is used
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        model_name=model_name,
+        temperature=0.0,
+        max_tokens=None,
+        max_retries=LLM_MAX_RETRIES,
+        request_timeout=LLM_REQUEST_TIMEOUT,
+        base_url=LLM_BASE_URL,
+        http_async_client=llm_http_client,
+    )
 
 
 class Model(Enum):
@@ -46,10 +53,8 @@ def get_model(model: str | None = None):
         ValueError: If the provided model name is invalid.
 
     Returns:
-        ChatOpenAI: The corresponding ChatOpenAI model instance.
+        ChatOpenAI: The corresponding ChatOpenAI model instance, built on first use.
     """
     if model == Model.GPT_4O_MINI.value:
-        return gpt_4o_mini
-    elif model == Model.GPT_4O.value:
-        return gpt_4o
-    return gpt_4o
+        return _build_model(Model.GPT_4O_MINI.value)
+    return _build_model(Model.GPT_4O.value)
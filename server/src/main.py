@@ -1,7 +1,15 @@
-from utils.leetcode_problems import add_problems_to_db
-import asyncio
-from serve import app
+from dotenv import load_dotenv
+
+# Settings are read from the environment at import time, so .env is loaded first
+load_dotenv()
+
+from serve import app, admin_router
 from problems import problems_router
+from solution import solution_router
+from jobs import jobs_router
 
 
 app.include_router(problems_router)
+app.include_router(solution_router)
+app.include_router(jobs_router)
+app.include_router(admin_router)
@@ -2,7 +2,9 @@ from .models import (
     Problem,
     Tag,
     ProblemTags,
-    ProblemCodeGenerated
+    ProblemCodeGenerated,
+    ProblemSimilarity,
+    TagSummary
 )
 from .service import ProblemService
 from .handler import router as problems_router
@@ -12,6 +14,8 @@ __all__ = [
     "Tag",
     "ProblemTags",
     "ProblemCodeGenerated",
+    "ProblemSimilarity",
+    "TagSummary",
     "ProblemService",
     "problems_router"
 ]
@@ -0,0 +1,97 @@
+from typing import Optional
+
+import zstandard as zstd
+from loguru import logger
+
+
+DICTIONARY_SIZE = 112 * 1024
+COMPRESSION_LEVEL = 19
+MIN_TRAINING_SAMPLES = 64
+
+
+class DescriptionCodec:
+    """
+    Compresses problem descriptions with versioned, corpus-trained zstd dictionaries.
+
+    Dictionaries are persisted in the `description_dictionaries` table and registered
+    here by version; a blob stored with version None was compressed without one.
+    Compression happens at ingest, so a high level costs nothing at serve time:
+    zstd decompression speed does not depend on it.
+    """
+    _dictionaries: dict[int, zstd.ZstdCompressionDict] = {}
+    _compressors: dict[Optional[int], zstd.ZstdCompressor] = {}
+    _decompressors: dict[Optional[int], zstd.ZstdDecompressor] = {}
+
+    @classmethod
+    def train(cls, samples: list[str]) -> Optional[bytes]:
+        """
+        Trains a dictionary on description samples.
+
+        Args:
+            samples (list[str]): Descriptions to train on.
+
+        Returns:
+            bytes | None: The raw dictionary, or None if the corpus is too small to train on.
+        """
+        encoded = [sample.encode("utf-8") for sample in samples if sample]
+        if len(encoded) < MIN_TRAINING_SAMPLES:
+            logger.warning(f"Only {len(encoded)} descriptions; compressing without a dictionary")
+            return None
+        try:
+            return zstd.train_dictionary(DICTIONARY_SIZE, encoded).as_bytes()
+        except zstd.ZstdError as e:
+            logger.warning(f"Could not train description dictionary: {e}")
+            return None
+
+    @classmethod
+    def register(cls, version: int, data: bytes):
+        """
+        Makes a persisted dictionary available for compression and decompression.
+        """
+        if version not in cls._dictionaries:
+            cls._dictionaries[version] = zstd.ZstdCompressionDict(data)
+
+    @classmethod
+    def is_registered(cls, version: Optional[int]) -> bool:
+        return version is None or version in cls._dictionaries
+
+    @classmethod
+    def _compressor(cls, version: Optional[int]) -> zstd.ZstdCompressor:
+        if version not in cls._compressors:
+            dictionary = cls._dictionaries[version] if version is not None else None
+            cls._compressors[version] = zstd.ZstdCompressor(
+                level=COMPRESSION_LEVEL, dict_data=dictionary, write_dict_id=False)
+        return cls._compressors[version]
+
+    @classmethod
+    def _decompressor(cls, version: Optional[int]) -> zstd.ZstdDecompressor:
+        if version not in cls._decompressors:
+            dictionary = cls._dictionaries[version] if version is not None else None
+            cls._decompressors[version] = zstd.ZstdDecompressor(dict_data=dictionary)
+        return cls._decompressors[version]
+
+    @classmethod
+    def compress(cls, text: str, version: Optional[int]) -> bytes:
+        """
+        Compresses a description with the dictionary of the given version.
+        """
+        return cls._compressor(version).compress(text.encode("utf-8"))
+
+    @classmethod
+    def decompress(cls, blob: bytes, version: Optional[int]) -> str:
+        """
+        Decompresses a description; the dictionary version must be registered.
+
+        Raises:
+            KeyError: If the dictionary version has not been registered.
+        """
+        return cls._decompressor(version).decompress(blob).decode("utf-8")
+
+    @classmethod
+    def decode(cls, plain: Optional[str], blob: Optional[bytes], version: Optional[int]) -> str:
+        """
+        Returns the description of a row, whether it is stored compressed or as plain text.
+        """
+        if blob is None:
+            return plain or ""
+        return cls.decompress(blob, version)
@@ -0,0 +1,280 @@
+import os
+import re
+import asyncio
+import multiprocessing
+from html import escape, unescape
+from html.parser import HTMLParser
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from loguru import logger
+
+from .schemas import DescriptionExample, RenderedDescription
+
+
+# 0 uses one worker per CPU.
+DESCRIPTION_WORKERS = int(os.getenv("DESCRIPTION_WORKERS", "0")) or os.cpu_count() or 1
+DESCRIPTION_CHUNK_SIZE = int(os.getenv("DESCRIPTION_CHUNK_SIZE", "64"))
+
+ALLOWED_TAGS = {
+    "p", "div", "span", "pre", "code", "strong", "b", "em", "i", "u", "sup", "sub",
+    "ul", "ol", "li", "br", "hr", "img", "a", "table", "thead", "tbody", "tr", "th", "td",
+    "blockquote", "font",
+}
+ALLOWED_ATTRIBUTES = {
+    "a": {"href", "title"},
+    "img": {"src", "alt", "width", "height"},
+}
+URL_ATTRIBUTES = {"href", "src"}
+SAFE_URL = re.compile(r"^(https?:|mailto:|/|#)", re.IGNORECASE)
+VOID_TAGS = {"br", "hr", "img"}
+# Dropped along with everything inside them.
+DROPPED_TAGS = {"script", "style", "iframe", "object", "embed", "template", "noscript", "svg", "math"}
+
+_EXAMPLE_HEADING = re.compile(r"^Example\s*\d*\s*:?$", re.IGNORECASE)
+_CONSTRAINTS_HEADING = re.compile(r"^Constraints\s*:?$", re.IGNORECASE)
+_FOLLOW_UP = re.compile(r"^Follow[\s-]*up\s*:?\s*", re.IGNORECASE)
+_EXAMPLE_FIELDS = re.compile(r"(Input|Output|Explanation)\s*:", re.IGNORECASE)
+
+
+class _Sanitizer(HTMLParser):
+    """
+    Re-emits a description keeping only allowlisted tags and attributes.
+
+    Unknown tags are unwrapped, dropped tags lose their content too, URLs must be
+    http(s), mailto or relative, and every element left open is closed.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out: list[str] = []
+        self._open: list[str] = []
+        self._dropping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_TAGS:
+            self._dropping += 1
+            return
+        if self._dropping or tag not in ALLOWED_TAGS:
+            return
+        allowed = ALLOWED_ATTRIBUTES.get(tag, ())
+        kept = "".join(
+            f' {name}="{escape(value, quote=True)}"'
+            for name, value in attrs
+            if name in allowed and value is not None
+            and (name not in URL_ATTRIBUTES or SAFE_URL.match(value.strip()))
+        )
+        self.out.append(f"<{tag}{kept}>")
+        if tag not in VOID_TAGS:
+            self._open.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in DROPPED_TAGS:
+            self._dropping -= 1
+        elif not self._dropping and tag in ALLOWED_TAGS and tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS:
+            self._dropping = max(0, self._dropping - 1)
+            return
+        if self._dropping or tag not in self._open:
+            return
+        while self._open:
+            opened = self._open.pop()
+            self.out.append(f"</{opened}>")
+            if opened == tag:
+                break
+
+    def handle_data(self, data):
+        if not self._dropping:
+            self.out.append(escape(data, quote=False))
+
+    def close(self):
+        super().close()
+        while self._open:
+            self.out.append(f"</{self._open.pop()}>")
+
+
+def sanitize_html(html: str) -> str:
+    """
+    Returns the description HTML with scripts, event handlers, unsafe URLs and
+    any tag or attribute outside the allowlist removed.
+    """
+    sanitizer = _Sanitizer()
+    sanitizer.feed(html)
+    sanitizer.close()
+    return "".join(sanitizer.out)
+
+
+class _Block:
+    __slots__ = ("html", "text", "items")
+
+    def __init__(self):
+        self.html: list[str] = []
+        self.text: list[str] = []
+        self.items: list[str] = []
+
+
+class _BlockSplitter(HTMLParser):
+    """
+    Splits sanitized HTML into its top-level blocks, keeping each block's HTML, its
+    plain text (superscripts written as "^") and the text of its list items.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.blocks: list[_Block] = []
+        self._depth = 0
+        self._item: Optional[list[str]] = None
+
+    def _block(self) -> _Block:
+        if self._depth == 0 or not self.blocks:
+            self.blocks.append(_Block())
+        return self.blocks[-1]
+
+    def _text(self, value: str):
+        self.blocks[-1].text.append(value)
+        if self._item is not None:
+            self._item.append(value)
+
+    def handle_starttag(self, tag, attrs):
+        block = self._block()
+        block.html.append(self.get_starttag_text())
+        if tag == "li":
+            self._item = []
+        elif tag == "sup":
+            self._text("^")
+        elif tag == "br":
+            self._text("\n")
+        if tag not in VOID_TAGS:
+            self._depth += 1
+
+    def handle_endtag(self, tag):
+        self._block().html.append(f"</{tag}>")
+        self._depth = max(0, self._depth - 1)
+        if tag == "li" and self._item is not None:
+            self.blocks[-1].items.append(_collapse("".join(self._item)))
+            self._item = None
+
+    def handle_data(self, data):
+        if self._depth == 0 and not data.strip():
+            return
+        self._block().html.append(data)
+        self._text(data)
+
+    def handle_entityref(self, name):
+        self.handle_data(f"&{name};")
+
+    def handle_charref(self, name):
+        self.handle_data(f"&#{name};")
+
+
+def _collapse(text: str) -> str:
+    # Descriptions pad headings and lists with &nbsp;
+    return re.sub(r"[ \t\xa0]+", " ", unescape(text)).strip()
+
+
+def _parse_example(text: str) -> Optional[DescriptionExample]:
+    parts = _EXAMPLE_FIELDS.split(text)
+    fields = {label.lower(): _collapse(value) for label, value in zip(parts[1::2], parts[2::2])}
+    if "input" not in fields or "output" not in fields:
+        return None
+    return DescriptionExample(input=fields["input"], output=fields["output"],
+                              explanation=fields.get("explanation") or None)
+
+
+def render_description(description: str) -> RenderedDescription:
+    """
+    Sanitizes a scraped description and splits it into statement, examples,
+    constraints and follow-up, using the "Example N:" and "Constraints:" headings
+    LeetCode descriptions are laid out with.
+
+    Args:
+        description (str): The description as scraped.
+
+    Returns:
+        RenderedDescription: The sanitized HTML and its structured form.
+    """
+    html = sanitize_html(description)
+    splitter = _BlockSplitter()
+    splitter.feed(html)
+    splitter.close()
+
+    statement: list[str] = []
+    examples: list[DescriptionExample] = []
+    constraints: list[str] = []
+    follow_up: list[str] = []
+    section = "statement"
+    for block in splitter.blocks:
+        text = _collapse("".join(block.text))
+        if _EXAMPLE_HEADING.match(text):
+            section = "example"
+            continue
+        if _CONSTRAINTS_HEADING.match(text):
+            section = "constraints"
+            continue
+        if _FOLLOW_UP.match(text):
+            section = "follow_up"
+
+        if section == "statement":
+            statement.append("".join(block.html))
+        elif section == "example":
+            example = _parse_example("".join(block.text))
+            if example is not None:
+                examples.append(example)
+        elif section == "constraints":
+            constraints.extend(item for item in block.items if item)
+            if not block.items and text:
+                constraints.append(text)
+        else:
+            # The heading may sit alone in its block, with the question in the next one
+            text = _FOLLOW_UP.sub("", text)
+            if text:
+                follow_up.append(text)
+
+    return RenderedDescription(html=html,
+                               statement="\n".join(statement).strip(),
+                               examples=examples,
+                               constraints=constraints,
+                               follow_up=" ".join(follow_up) or None)
+
+
+def _render_chunk(descriptions: list[str]) -> list[Optional[RenderedDescription]]:
+    rendered = []
+    for description in descriptions:
+        try:
+            rendered.append(render_description(description))
+        except Exception as e:
+            # One malformed description must not fail the whole ingest
+            logger.error(f"Could not render description: {e}")
+            rendered.append(None)
+    return rendered
+
+
+async def render_descriptions(descriptions: list[str],
+                              workers: int = DESCRIPTION_WORKERS) -> list[Optional[RenderedDescription]]:
+    """
+    Renders many descriptions in a process pool, keeping the CPU-bound parsing off
+    the event loop and spreading it over every core.
+
+    Args:
+        descriptions (list[str]): The descriptions as scraped.
+        workers (int): The number of worker processes.
+
+    Returns:
+        list[RenderedDescription | None]: The rendered descriptions in input order,
+            None for descriptions that could not be parsed.
+    """
+    if not descriptions:
+        return []
+    chunks = [descriptions[i:i + DESCRIPTION_CHUNK_SIZE]
+              for i in range(0, len(descriptions), DESCRIPTION_CHUNK_SIZE)]
+    loop = asyncio.get_running_loop()
+    # Spawned rather than forked: the ingest process already runs database threads
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), mp_context=context) as pool:
+        results = await asyncio.gather(*(loop.run_in_executor(pool, _render_chunk, chunk)
+                                         for chunk in chunks))
+    return [rendered for chunk in results for rendered in chunk]
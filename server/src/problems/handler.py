@@ -1,6 +1,12 @@
-from fastapi import APIRouter, Query
-from typing import List
-from .service import ProblemService, FilterForProblem, SortOrder
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response, status
+from typing import List, Optional
+from cache import coalescer
+from catalog import CatalogExporter, negotiate_encoding
+from .schemas import ProblemDetail, ProblemListItem
+from .service import (ProblemService, FilterForProblem, SortOrder,
+                      BatchProblemsRequest, ProblemNotFoundError)
+from .typeahead import TYPEAHEAD_MAX_LIMIT
 
 
 router = APIRouter(prefix="/leetcode", tags=["leetcode"])
@@ -8,15 +14,113 @@ problems_service = ProblemService()
 
 
 @router.get("/tags")
-async def get_tags():
+async def get_tags(with_counts: bool = Query(default=False)):
+    if with_counts:
+        return await problems_service.get_tag_summaries()
     return await problems_service.get_all_tags()
 
 
-@router.get("/problems/{problem_id}")
-async def get_problem_by_id(problem_id: str):
-    prob = await problems_service.get_problem_by_public_id(problem_id)
-    print(prob)
-    return prob
+@router.get("/metrics/coalescing")
+async def get_coalescing_metrics():
+    return coalescer.stats()
+
+
+@router.get("/search")
+async def search_problems(query: str = Query(min_length=1), limit: int = Query(default=10, ge=1, le=50)):
+    return await problems_service.search_problems(query, limit)
+
+
+@router.get("/typeahead")
+async def typeahead(query: str = Query(min_length=1, max_length=100),
+                    limit: int = Query(default=8, ge=1, le=TYPEAHEAD_MAX_LIMIT)):
+    return problems_service.suggest(query, limit)
+
+
+@router.post("/problems/batch")
+async def get_problems_by_ids(request: BatchProblemsRequest, include_raw: bool = Query(default=False)):
+    problems = await problems_service.get_problems_by_public_ids(request.ids, include_raw)
+    return {"problems": problems}
+
+
+@router.get("/problems/export")
+async def export_problems(request: Request, since: Optional[int] = Query(default=None)):
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    export = CatalogExporter.export(since, encoding)
+    if export is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="The problem catalog has not been published yet")
+
+    etag = f'"{export.version}-{since or 0}"'
+    headers = {
+        "ETag": etag,
+        "X-Catalog-Version": str(export.version),
+        "Vary": "Accept-Encoding",
+        "Cache-Control": "no-cache",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if export.encoding:
+        headers["Content-Encoding"] = export.encoding
+    return Response(content=export.body, media_type="application/json", headers=headers)
+
+
+@router.get("/problems/random", response_model=ProblemListItem)
+async def get_random_problem(
+    tags: List[str] = Query(default=[]),
+    difficulty: List[str] = Query(default=[]),
+    seed: Optional[int] = Query(default=None)
+):
+    try:
+        return problems_service.get_random_problem(tags, difficulty, seed)
+    except ProblemNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.get("/problems/daily", response_model=ProblemListItem)
+async def get_daily_problem(
+    response: Response,
+    tags: List[str] = Query(default=[]),
+    difficulty: List[str] = Query(default=[])
+):
+    now = datetime.now(timezone.utc)
+    try:
+        problem = problems_service.get_daily_problem(tags, difficulty, now.date())
+    except ProblemNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), timezone.utc)
+    response.headers["Cache-Control"] = f"public, max-age={int((midnight - now).total_seconds())}"
+    return problem
+
+
+@router.get("/problems/slug/{slug}", response_model=ProblemListItem)
+async def get_problem_by_slug(slug: str):
+    try:
+        return problems_service.get_problem_by_slug(slug)
+    except ProblemNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.get("/problems/number/{number}", response_model=ProblemListItem)
+async def get_problem_by_number(number: int = Path(ge=1)):
+    try:
+        return problems_service.get_problem_by_number(number)
+    except ProblemNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.get("/problems/{problem_id}/similar")
+async def get_similar_problems(problem_id: str, limit: int = Query(default=10, ge=1, le=50)):
+    similar = await problems_service.get_similar_problems(problem_id, limit)
+    return {"similar": similar}
+
+
+@router.get("/problems/{problem_id}", response_model=ProblemDetail)
+async def get_problem_by_id(problem_id: str, include_raw: bool = Query(default=False)):
+    try:
+        return await problems_service.get_problem_by_public_id(problem_id, include_raw)
+    except ProblemNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
 
 @router.get("/problems")
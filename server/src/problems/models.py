@@ -1,19 +1,87 @@
-from typing import Literal
+from typing import Iterable, Literal, Optional
 from sqlalchemy import (
+    case,
     Integer,
     String,
     Float,
+    LargeBinary,
     ForeignKey,
     Index,
     func)
 from sqlalchemy.orm import (
+    aliased,
     relationship,
     joinedload,
+    selectinload,
+    undefer_group,
     Mapped,
     mapped_column)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import select
+from sqlalchemy.dialects.sqlite import Insert, insert as sqlite_insert
+from sqlalchemy.sql import Select, delete, insert, select
 from db import Base, PublicIDMixin, TimestampMixin, with_session
+from .schemas import ProblemDetail, ProblemListItem, RenderedDescription, TagItem, TagSummaryItem
+from .compression import DescriptionCodec
+
+
+class DescriptionDictionary(Base, TimestampMixin):
+    """
+    A zstd dictionary trained on problem descriptions. Its ID is the dictionary version.
+
+    Attributes:
+        id (int): The dictionary version.
+        data (bytes): The raw dictionary.
+    """
+    __tablename__ = 'description_dictionaries'
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    @classmethod
+    async def ensure_registered(cls, versions: set[Optional[int]]):
+        """
+        Makes sure every given dictionary version is registered with the codec,
+        touching the database only for versions this process has not seen yet.
+        """
+        missing = [v for v in versions if not DescriptionCodec.is_registered(v)]
+        if missing:
+            await cls._register(missing)
+
+    @classmethod
+    @with_session()
+    async def _register(cls, session: AsyncSession, versions: list[int]):
+        result = await session.execute(
+            select(cls.id, cls.data).where(cls.id.in_(versions))
+        )
+        for version, data in result.tuples():
+            DescriptionCodec.register(version, data)
+
+    @classmethod
+    async def get_or_train(cls, session: AsyncSession, samples: list[str]) -> Optional[int]:
+        """
+        Returns the latest dictionary version, training and storing one on the
+        given samples if none exists yet.
+
+        Args:
+            session (AsyncSession): The database session to use.
+            samples (list[str]): Descriptions to train on if a dictionary is needed.
+
+        Returns:
+            int | None: The dictionary version, or None if no dictionary could be trained.
+        """
+        latest = (await session.execute(
+            select(cls.id, cls.data).order_by(cls.id.desc()).limit(1)
+        )).first()
+        if latest is not None:
+            DescriptionCodec.register(latest.id, latest.data)
+            return latest.id
+
+        data = DescriptionCodec.train(samples)
+        if data is None:
+            return None
+        result = await session.execute(insert(cls).values(data=data).returning(cls.id))
+        version = result.scalar_one()
+        DescriptionCodec.register(version, data)
+        return version
 
 
 class ProblemTags(Base, TimestampMixin):
@@ -25,6 +93,9 @@ class ProblemTags(Base, TimestampMixin):
         tag_id (int): The ID of the tag associated with the problem.
     """
     __tablename__ = 'problem_tags'
+    __table_args__ = (
+        Index('ix_problem_tags_tag_id_problem_id', 'tag_id', 'problem_id'),
+    )
     problem_id: Mapped[int] = mapped_column(
         ForeignKey('problems.id'), primary_key=True)
     tag_id: Mapped[int] = mapped_column(
@@ -37,29 +108,243 @@ class Problem(Base, PublicIDMixin, TimestampMixin):
 
     Attributes:
         name (str): The name of the problem.
+        slug (str | None): The normalized LeetCode slug of the problem, e.g. "two-sum".
+        number (int | None): The LeetCode number of the problem.
         difficulty (str): The difficulty level of the problem (e.g., Easy, Medium, Hard).
         acceptance_rate (float): The acceptance rate of the problem.
-        description (str): A detailed description of the problem.
+        description (str): A detailed description of the problem, decompressed on access.
+        description_zstd (bytes | None): The zstd-compressed description.
+        description_dict_version (int | None): The dictionary the description was compressed with.
+        rendered_zstd (bytes | None): The sanitized and structured description prepared at
+            ingest, as compressed JSON; None until an ingest renders it.
         tags (list[Tag]): A list of tags associated with the problem.
         code_generated (list[ProblemCodeGenerated]): A list of generated code solutions for the problem.
     """
     __tablename__ = 'problems'
     __table_args__ = (
         Index('ix_problems_name', 'name'),
+        Index('ix_problems_slug', 'slug', unique=True),
+        Index('ix_problems_number', 'number', unique=True),
+        Index('ix_problems_difficulty_acceptance_rate_id', 'difficulty', 'acceptance_rate', 'id'),
+        Index('ix_problems_acceptance_rate_id', 'acceptance_rate', 'id'),
     )
 
     name: Mapped[str] = mapped_column(String, nullable=False)
+    # Nullable only for rows ingested before they were stored; ingest fills them in.
+    slug: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    number: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     difficulty: Mapped[str] = mapped_column(String, nullable=False)
     acceptance_rate: Mapped[float] = mapped_column(Float, nullable=False)
-    description: Mapped[str] = mapped_column(String, nullable=False)
     link: Mapped[str] = mapped_column(String, nullable=False)
 
+    # Plain text is only kept for rows that have not been compressed yet.
+    plain_description: Mapped[str] = mapped_column(
+        'description', String, nullable=False, default='',
+        deferred=True, deferred_group='description')
+    description_zstd: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary, nullable=True, deferred=True, deferred_group='description')
+    description_dict_version: Mapped[Optional[int]] = mapped_column(
+        ForeignKey('description_dictionaries.id'), nullable=True)
+    # Compressed with the same dictionary as the description.
+    rendered_zstd: Mapped[Optional[bytes]] = mapped_column(
+        LargeBinary, nullable=True, deferred=True, deferred_group='description')
+
     tags: Mapped[list["Tag"]] = relationship(
         'Tag', secondary='problem_tags',
         back_populates='problems')
     code_generated: Mapped[list["ProblemCodeGenerated"]] = relationship(
         'ProblemCodeGenerated', back_populates='problem')
 
+    @property
+    def description(self) -> str:
+        return DescriptionCodec.decode(self.plain_description,
+                                       self.description_zstd,
+                                       self.description_dict_version)
+
+    @description.setter
+    def description(self, value: str):
+        self.plain_description = value
+        self.description_zstd = None
+        self.description_dict_version = None
+        # Rendered from the old description
+        self.rendered_zstd = None
+
+    def compress_description(self, version: Optional[int]):
+        """
+        Replaces the plain-text description with its compressed form.
+
+        Args:
+            version (Optional[int]): The dictionary version to compress with, or None
+                to compress without a dictionary.
+        """
+        text = self.description
+        rendered = self.rendered_description
+        self.description_zstd = DescriptionCodec.compress(text, version)
+        self.description_dict_version = version
+        self.plain_description = ''
+        if rendered is not None:
+            self.store_rendered(rendered)
+
+    @property
+    def rendered_description(self) -> Optional[RenderedDescription]:
+        if self.rendered_zstd is None:
+            return None
+        return RenderedDescription.model_validate_json(
+            DescriptionCodec.decompress(self.rendered_zstd, self.description_dict_version))
+
+    def store_rendered(self, rendered: RenderedDescription):
+        """
+        Stores the rendered description, compressed with the description's dictionary.
+        """
+        self.rendered_zstd = DescriptionCodec.compress(rendered.model_dump_json(),
+                                                       self.description_dict_version)
+
+    def to_detail(self) -> ProblemDetail:
+        """
+        Converts a problem loaded with its tags and description into the detail schema.
+        """
+        return ProblemDetail(
+            public_id=self.public_id,
+            name=self.name,
+            difficulty=self.difficulty,
+            acceptance_rate=self.acceptance_rate,
+            link=self.link,
+            tags=[TagItem(public_id=tag.public_id, name=tag.name) for tag in self.tags],
+            description=self.description,
+            rendered=self.rendered_description,
+        )
+
+    @classmethod
+    def _batch_load_options(cls) -> list:
+        return [selectinload(Problem.tags), undefer_group('description')]
+
+    @classmethod
+    async def get_details(cls, public_ids: list[str]) -> list[Optional[ProblemDetail]]:
+        """
+        Retrieves full problem details, descriptions included, by public ID.
+
+        Args:
+            public_ids (list[str]): The public IDs of the problems.
+
+        Returns:
+            list[ProblemDetail | None]: The details in request order, None for unknown IDs.
+        """
+        problems = await cls.get_by_public_ids(public_ids)
+        await DescriptionDictionary.ensure_registered(
+            {p.description_dict_version for p in problems if p is not None})
+        return [p.to_detail() if p is not None else None for p in problems]
+
+    @classmethod
+    async def get_detail(cls, public_id: str) -> Optional[ProblemDetail]:
+        """
+        Retrieves the full details of a single problem by public ID.
+        """
+        return (await cls.get_details([public_id]))[0]
+
+    @classmethod
+    def list_query(cls) -> Select:
+        """
+        Builds a query selecting only the columns needed for list views.
+        The description column is never part of it.
+        """
+        return select(Problem.id, Problem.public_id, Problem.name, Problem.difficulty,
+                      Problem.acceptance_rate, Problem.link)
+
+    @classmethod
+    def list_order(cls, acceptance_sort: str = 'none') -> list:
+        """
+        Builds the ORDER BY of filtered lists. The id tie-breaker keeps consecutive
+        pages from overlapping and runs in the same direction as the acceptance rate,
+        so one walk of ix_problems_difficulty_acceptance_rate_id yields the rows in
+        order without a temporary sort.
+        """
+        if acceptance_sort == 'asc':
+            return [Problem.acceptance_rate.asc(), Problem.id.asc()]
+        if acceptance_sort == 'desc':
+            return [Problem.acceptance_rate.desc(), Problem.id.desc()]
+        return [Problem.id]
+
+    @classmethod
+    def filter_query(cls, tags: list[str] = None, difficulty: list[str] = None,
+                     acceptance_sort: str = 'none') -> Select:
+        """
+        Builds the ordered `list_query` of `get_problems_by_filter`, before pagination.
+
+        The filters are written so SQLite reads the rows in the requested order from
+        an index and stops at the page limit, instead of sorting every match:
+
+        - Sorted lists check the tags of each problem against the problem_tags primary
+          key while walking an acceptance rate index; unsorted lists read the tagged
+          IDs from ix_problem_tags_tag_id_problem_id, which yields them in ID order.
+        - Several difficulties are matched as `difficulty || ''`, which no index
+          serves; the (difficulty, ...) index would return one range per difficulty
+          and need a sort to merge them.
+        """
+        query = cls.list_query()
+        if tags:
+            if acceptance_sort in ('asc', 'desc'):
+                query = query.filter(cls._ids_with_tags(tags)
+                                     .where(ProblemTags.problem_id == Problem.id)
+                                     .exists())
+            else:
+                query = query.filter(Problem.id.in_(cls._ids_with_tags(tags)))
+        if difficulty and len(difficulty) > 1:
+            query = query.filter(Problem.difficulty.concat('').in_(difficulty))
+        elif difficulty:
+            query = query.filter(Problem.difficulty == difficulty[0])
+        return query.order_by(*cls.list_order(acceptance_sort))
+
+    @classmethod
+    def count_query(cls, tags: list[str] = None, difficulty: list[str] = None) -> Select:
+        """
+        Builds the total count of `get_problems_by_filter`. It visits every match
+        anyway, so it narrows through the indexes rather than walking them in order.
+        """
+        query = select(func.count()).select_from(Problem)
+        if tags:
+            query = query.where(Problem.id.in_(cls._ids_with_tags(tags)))
+        if difficulty:
+            query = query.where(Problem.difficulty.in_(difficulty))
+        return query
+
+    @classmethod
+    def search_query(cls, name: str, limit: int = 10) -> Select:
+        """
+        Builds the `list_query` of `search_problems_with_name`.
+        """
+        return cls.list_query().filter(Problem.name.like(f"%{name}%")).limit(limit)
+
+    @classmethod
+    def _ids_with_tags(cls, tags: list[str]) -> Select:
+        return (select(ProblemTags.problem_id)
+                .join(Tag, Tag.id == ProblemTags.tag_id)
+                .where(Tag.name.in_(tags)))
+
+    @classmethod
+    async def _fetch_list_items(cls, session: AsyncSession, query: Select) -> list[ProblemListItem]:
+        """
+        Runs a `list_query` and attaches tags with a single extra query.
+
+        Rows are plain column tuples rather than ORM instances, so nothing is added
+        to the identity map and no per-object refresh happens when the session closes.
+        """
+        rows = (await session.execute(query)).mappings().all()
+        if not rows:
+            return []
+
+        tag_rows = await session.execute(
+            select(ProblemTags.problem_id, Tag.public_id, Tag.name)
+            .join(Tag, Tag.id == ProblemTags.tag_id)
+            .where(ProblemTags.problem_id.in_([row["id"] for row in rows]))
+        )
+        tags_by_problem: dict[int, list[TagItem]] = {}
+        # Sorted here: a page carries a few dozen tags, not worth a temporary b-tree
+        for problem_id, public_id, name in sorted(tag_rows.tuples(), key=lambda row: row[2]):
+            tags_by_problem.setdefault(problem_id, []).append(
+                TagItem(public_id=public_id, name=name))
+
+        return [ProblemListItem(**row, tags=tags_by_problem.get(row["id"], [])) for row in rows]
+
     @classmethod
     @with_session()
     async def get_all_problems(cls, session: AsyncSession):
@@ -70,15 +355,9 @@ class Problem(Base, PublicIDMixin, TimestampMixin):
             session (AsyncSession): The database session to use for the query.
 
         Returns:
-            list[Problem]: A list of all problems with their associated tags.
+            list[ProblemListItem]: A list of all problems with their associated tags.
         """
-        result = await session.execute(
-            select(Problem).options(joinedload(Problem.tags))
-        )
-        problems = result.unique().scalars().all()
-        for problem in problems:
-            _ = [tag.name for tag in problem.tags]
-        return problems
+        return await cls._fetch_list_items(session, cls.list_query())
 
     @classmethod
     @with_session()
@@ -112,14 +391,9 @@ class Problem(Base, PublicIDMixin, TimestampMixin):
             limit (int): The maximum number of problems to return.
 
         Returns:
-            list[Problem]: A list of problems that match the search criteria.
+            list[ProblemListItem]: A list of problems that match the search criteria.
         """
-        result = await session.execute(
-            select(Problem).filter(Problem.name.like(f"%{name}%")).options(
-                joinedload(Problem.tags)
-            ).limit(limit)
-        )
-        return result.unique().scalars().all()
+        return await cls._fetch_list_items(session, cls.search_query(name, limit))
 
     @classmethod
     @with_session()
@@ -132,14 +406,10 @@ class Problem(Base, PublicIDMixin, TimestampMixin):
             tags (list[str]): A list of tag names to filter problems by.
 
         Returns:
-            list[Problem]: A list of problems associated with the specified tags.
+            list[ProblemListItem]: A list of problems associated with the specified tags.
         """
-        result = await session.execute(
-            select(Problem).join(Problem.tags).filter(Tag.name.in_(tags)).options(
-                joinedload(Problem.tags)
-            )
-        )
-        return result.unique().scalars().all()
+        query = cls.list_query().filter(Problem.id.in_(cls._ids_with_tags(tags)))
+        return await cls._fetch_list_items(session, query)
 
     @classmethod
     @with_session()
@@ -167,8 +437,8 @@ class Problem(Base, PublicIDMixin, TimestampMixin):
             page (int, optional): Page number to retrieve (1-indexed). Defaults to 1.
 
         Returns:
-            tuple[list[Problem], int]: A tuple containing:
-                - List of Problem objects for the requested page
+            tuple[list[ProblemListItem], int]: A tuple containing:
+                - List of list items for the requested page
                 - Total count of problems matching the filter criteria (before pagination)
 
         Raises:
@@ -177,29 +447,13 @@ class Problem(Base, PublicIDMixin, TimestampMixin):
         if limit < 1 or page < 1:
             raise ValueError("Limit and page must be positive integers")
 
-        query = select(Problem).options(joinedload(Problem.tags))
-
-        if tags:
-            query = query.join(Problem.tags).filter(
-                Tag.name.in_(tags)).distinct()
-
-        if difficulty:
-            query = query.filter(Problem.difficulty.in_(difficulty))
-
-        if acceptance_sort != 'none':
-            if acceptance_sort == 'asc':
-                query = query.order_by(Problem.acceptance_rate.asc())
-            else:
-                query = query.order_by(Problem.acceptance_rate.desc())
+        query = cls.filter_query(tags, difficulty, acceptance_sort)
 
-        count_query = select(func.count()).select_from(query.subquery())
-        total_count_result = await session.execute(count_query)
+        total_count_result = await session.execute(cls.count_query(tags, difficulty))
         total_count = total_count_result.scalar_one()
 
         query = query.limit(limit).offset((page - 1) * limit)
-
-        result = await session.execute(query)
-        problems = result.unique().scalars().all()
+        problems = await cls._fetch_list_items(session, query)
 
         return problems, total_count
 
@@ -213,6 +467,9 @@ class Tag(Base, PublicIDMixin, TimestampMixin):
         problems (list[Problem]): A list of problems associated with the tag.
     """
     __tablename__ = 'tags'
+    __table_args__ = (
+        Index('ix_tags_name', 'name', unique=True),
+    )
     name: Mapped[str] = mapped_column(String, nullable=False)
     problems: Mapped[list["Problem"]] = relationship(
         'Problem', secondary='problem_tags',
@@ -228,6 +485,87 @@ class Tag(Base, PublicIDMixin, TimestampMixin):
         return result.scalars().all()
 
 
+class TagSummary(Base):
+    """
+    Materialized per-tag problem counts, so the tag sidebar is one indexed read
+    instead of a grouped join over `problem_tags` and `problems`.
+
+    Attributes:
+        tag_id (int): The ID of the summarized tag.
+        total (int): Number of problems with the tag.
+        easy (int): Number of Easy problems with the tag.
+        medium (int): Number of Medium problems with the tag.
+        hard (int): Number of Hard problems with the tag.
+        avg_acceptance_rate (float | None): Mean acceptance rate of those problems.
+    """
+    __tablename__ = 'tag_summaries'
+
+    tag_id: Mapped[int] = mapped_column(ForeignKey('tags.id'), primary_key=True)
+    total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    easy: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    medium: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    hard: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    avg_acceptance_rate: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+    @classmethod
+    def refresh_statement(cls, tag_ids: Optional[Iterable[int]] = None) -> Insert:
+        """
+        Builds the upsert recomputing the summaries of the given tags, or of every tag.
+        Tags without problems get a zero row rather than none.
+        """
+        def count(level: str):
+            return func.coalesce(func.sum(case((Problem.difficulty == level, 1), else_=0)), 0)
+
+        aggregate = (
+            select(Tag.id,
+                   func.count(Problem.id),
+                   count('Easy'),
+                   count('Medium'),
+                   count('Hard'),
+                   func.avg(Problem.acceptance_rate))
+            .outerjoin(ProblemTags, ProblemTags.tag_id == Tag.id)
+            .outerjoin(Problem, Problem.id == ProblemTags.problem_id)
+            .group_by(Tag.id)
+        )
+        if tag_ids is not None:
+            aggregate = aggregate.where(Tag.id.in_(list(tag_ids)))
+
+        statement = sqlite_insert(cls).from_select(
+            ['tag_id', 'total', 'easy', 'medium', 'hard', 'avg_acceptance_rate'], aggregate)
+        return statement.on_conflict_do_update(
+            index_elements=[cls.tag_id],
+            set_={column: statement.excluded[column]
+                  for column in ('total', 'easy', 'medium', 'hard', 'avg_acceptance_rate')},
+        )
+
+    @classmethod
+    async def refresh(cls, session: AsyncSession, tag_ids: Optional[Iterable[int]] = None):
+        """
+        Recomputes the summaries of the given tags within the caller's transaction.
+
+        Args:
+            session (AsyncSession): The database session to use.
+            tag_ids (Optional[Iterable[int]]): Tags whose problems changed; None rebuilds all.
+        """
+        if tag_ids is None:
+            await session.execute(delete(cls))
+        await session.execute(cls.refresh_statement(tag_ids))
+
+    @classmethod
+    @with_session()
+    async def get_all(cls, session: AsyncSession) -> list[TagSummaryItem]:
+        """
+        Retrieves every tag with its problem counts, most used tags first.
+        """
+        result = await session.execute(
+            select(Tag.public_id, Tag.name, cls.total, cls.easy, cls.medium, cls.hard,
+                   cls.avg_acceptance_rate)
+            .join(Tag, Tag.id == cls.tag_id)
+            .order_by(cls.total.desc(), Tag.name)
+        )
+        return [TagSummaryItem(**row) for row in result.mappings()]
+
+
 class ProblemCodeGenerated(Base, PublicIDMixin, TimestampMixin):
     """
     Represents a generated code solution for a problem.
@@ -236,15 +574,160 @@ class ProblemCodeGenerated(Base, PublicIDMixin, TimestampMixin):
         solution (str): The generated code solution.
         model (str): The model used to generate the solution.
         language (str): The programming language of the generated solution.
+        time_complexity (str | None): The time complexity reported with the solution.
+        space_complexity (str | None): The space complexity reported with the solution.
+        source_language (str | None): The language the solution was translated from, None if it was solved.
+        prompt_tokens (int | None): Prompt tokens spent generating the solution.
+        completion_tokens (int | None): Completion tokens spent generating the solution.
+        latency_ms (int | None): How long generating the solution took.
         problem_id (int): The ID of the problem associated with this generated code.
         problem (Problem): The problem associated with this generated code.
     """
     __tablename__ = 'problem_code_generated'
+    __table_args__ = (
+        Index('ix_problem_code_generated_problem_id_language_model',
+              'problem_id', 'language', 'model'),
+    )
 
     solution: Mapped[str] = mapped_column(String, nullable=False)
     model: Mapped[str] = mapped_column(String, nullable=False)
     language: Mapped[str] = mapped_column(String, nullable=False)
+    time_complexity: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    space_complexity: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    source_language: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    prompt_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    completion_tokens: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    latency_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
     problem_id: Mapped[int] = mapped_column(Integer, ForeignKey('problems.id'))
     problem: Mapped["Problem"] = relationship(
         'Problem', back_populates='code_generated')
+
+    @classmethod
+    @with_session()
+    async def get_cached(cls, session: AsyncSession, problem_public_id: str,
+                         language: str, model: Optional[str] = None) -> Optional[dict]:
+        """
+        Finds the latest stored solution of a problem in a language.
+
+        Args:
+            session (AsyncSession): The database session to use for the query.
+            problem_public_id (str): The public ID of the problem.
+            language (str): The programming language of the solution.
+            model (Optional[str]): Only accept solutions generated by this model.
+
+        Returns:
+            dict | None: The stored columns of the solution, or None if none is stored.
+        """
+        query = (
+            cls._cached_query()
+            .join(Problem, Problem.id == cls.problem_id)
+            .where(Problem.public_id == problem_public_id, cls.language == language)
+            .order_by(cls.id.desc())
+            .limit(1)
+        )
+        if model is not None:
+            query = query.where(cls.model == model)
+        row = (await session.execute(query)).mappings().first()
+        return dict(row) if row is not None else None
+
+    @classmethod
+    @with_session()
+    async def get_sibling(cls, session: AsyncSession, problem_public_id: str,
+                          language: str) -> Optional[dict]:
+        """
+        Finds a stored solution of a problem in any other language to translate from.
+        Solutions that were solved from the description are preferred over translations.
+
+        Args:
+            session (AsyncSession): The database session to use for the query.
+            problem_public_id (str): The public ID of the problem.
+            language (str): The language a solution is wanted in.
+
+        Returns:
+            dict | None: The stored columns of the solution, or None if none is stored.
+        """
+        query = (
+            cls._cached_query()
+            .join(Problem, Problem.id == cls.problem_id)
+            .where(Problem.public_id == problem_public_id, cls.language != language)
+            .order_by(cls.source_language.is_not(None), cls.id.desc())
+            .limit(1)
+        )
+        row = (await session.execute(query)).mappings().first()
+        return dict(row) if row is not None else None
+
+    @classmethod
+    def _cached_query(cls) -> Select:
+        return select(cls.solution, cls.model, cls.language, cls.time_complexity,
+                      cls.space_complexity, cls.source_language, cls.prompt_tokens,
+                      cls.completion_tokens, cls.latency_ms)
+
+    @classmethod
+    @with_session()
+    async def store(cls, session: AsyncSession, problem_public_id: str, language: str, model: str,
+                    solution: str, time_complexity: Optional[str], space_complexity: Optional[str],
+                    **usage):
+        """
+        Stores a generated solution for later reuse.
+
+        Args:
+            usage: The optional source_language, prompt_tokens, completion_tokens and latency_ms columns.
+        """
+        problem_id = select(Problem.id).where(Problem.public_id == problem_public_id).scalar_subquery()
+        await session.execute(insert(cls).values(
+            public_id=cls.generate_public_id(),
+            problem_id=problem_id,
+            language=language,
+            model=model,
+            solution=solution,
+            time_complexity=time_complexity,
+            space_complexity=space_complexity,
+            **usage,
+        ))
+
+
+class ProblemSimilarity(Base):
+    """
+    Precomputed nearest neighbours of a problem, rebuilt offline by `problems.similarity`.
+
+    Attributes:
+        problem_id (int): The ID of the problem the neighbours belong to.
+        rank (int): The position of the neighbour, 0 being the most similar.
+        similar_problem_id (int): The ID of the similar problem.
+        score (float): The combined tag and description similarity score.
+    """
+    __tablename__ = 'problem_similarities'
+
+    problem_id: Mapped[int] = mapped_column(
+        ForeignKey('problems.id'), primary_key=True)
+    rank: Mapped[int] = mapped_column(Integer, primary_key=True)
+    similar_problem_id: Mapped[int] = mapped_column(
+        ForeignKey('problems.id'), nullable=False)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+
+    @classmethod
+    @with_session()
+    async def get_similar(cls, session: AsyncSession, public_id: str, limit: int = 10):
+        """
+        Retrieves the precomputed similar problems of a problem.
+
+        Args:
+            session (AsyncSession): The database session to use for the query.
+            public_id (str): The public ID of the problem.
+            limit (int): The maximum number of similar problems to return.
+
+        Returns:
+            list[dict]: The similar problems, most similar first.
+        """
+        similar = aliased(Problem)
+        result = await session.execute(
+            select(similar.public_id, similar.name, similar.difficulty,
+                   similar.acceptance_rate, ProblemSimilarity.score)
+            .join(Problem, Problem.id == ProblemSimilarity.problem_id)
+            .join(similar, similar.id == ProblemSimilarity.similar_problem_id)
+            .where(Problem.public_id == public_id)
+            .order_by(ProblemSimilarity.rank)
+            .limit(limit)
+        )
+        return [dict(row) for row in result.mappings()]
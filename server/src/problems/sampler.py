@@ -0,0 +1,182 @@
+import random
+import hashlib
+from datetime import date, datetime, timezone
+from typing import Optional, Sequence
+
+from cachetools import LRUCache
+from loguru import logger
+
+from catalog import CatalogProblem, CatalogSnapshot, CatalogStore
+
+
+MIN_WEIGHT = 0.1
+
+FilterKey = tuple[frozenset[str], frozenset[str]]
+
+
+class AliasTable:
+    """
+    Walker/Vose alias table for O(1) weighted sampling over a fixed set of rows.
+
+    Attributes:
+        rows (list[int]): Catalog rows that can be drawn.
+    """
+    __slots__ = ("rows", "_probability", "_alias")
+
+    def __init__(self, rows: Sequence[int], weights: Sequence[float]):
+        n = len(rows)
+        self.rows = list(rows)
+        self._probability = [0.0] * n
+        self._alias = list(range(n))
+        if n == 0:
+            return
+
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self._probability[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+
+        for i in small + large:
+            self._probability[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def sample(self, rng: random.Random) -> int:
+        """
+        Draws one catalog row.
+        """
+        i = rng.randrange(len(self.rows))
+        return self.rows[i] if rng.random() < self._probability[i] else self.rows[self._alias[i]]
+
+
+def filter_key(tags: Optional[list[str]] = None, difficulty: Optional[list[str]] = None) -> FilterKey:
+    """
+    Normalizes tag and difficulty filters into a hashable bucket key.
+    """
+    return frozenset(tags or ()), frozenset(difficulty or ())
+
+
+class ProblemSampler:
+    """
+    Weighted random problem picker over the catalog snapshot.
+
+    Problems are weighted by acceptance rate. Alias tables for the whole catalog,
+    every difficulty, every tag and every (tag, difficulty) pair are precomputed
+    by `rebuild`, which must be subscribed to the CatalogStore; other filter
+    combinations are built on first use and kept in a bounded LRU. Every pick is
+    then O(1).
+    """
+
+    def __init__(self, max_combined_buckets: int = 256):
+        self._version: Optional[int] = None
+        self._buckets: dict[FilterKey, AliasTable] = {}
+        self._combined = LRUCache[FilterKey, AliasTable](maxsize=max_combined_buckets)
+        self._difficulties: list[str] = []
+        self._weights: list[float] = []
+        self._rng = random.Random()
+
+    def _current(self) -> Optional[CatalogSnapshot]:
+        snapshot = CatalogStore.current()
+        # Not rebuilt here, so no pick pays for it. Never the previous snapshot either:
+        # the store closes it once a new one is mapped, even if `rebuild` failed for it.
+        if snapshot is None or snapshot.version != self._version:
+            return None
+        return snapshot
+
+    def rebuild(self, snapshot: CatalogSnapshot):
+        """
+        Builds the buckets of a catalog snapshot and swaps them in. Nothing is
+        swapped in if building fails, so the sampler never mixes two versions.
+        """
+        if snapshot.version == self._version:
+            return
+        problems = list(snapshot.problems())
+        difficulties = [p.difficulty for p in problems]
+        weights = [max(p.acceptance_rate, MIN_WEIGHT) for p in problems]
+
+        all_rows = range(len(problems))
+        by_difficulty: dict[str, list[int]] = {}
+        for row in all_rows:
+            by_difficulty.setdefault(difficulties[row], []).append(row)
+
+        buckets = {filter_key(): self._table(weights, all_rows)}
+        for level, rows in by_difficulty.items():
+            buckets[filter_key(difficulty=[level])] = self._table(weights, rows)
+
+        for tag in snapshot.tags():
+            tag_rows = list(snapshot.problem_rows_for_tag(tag.name))
+            buckets[filter_key(tags=[tag.name])] = self._table(weights, tag_rows)
+            for level in by_difficulty:
+                rows = [r for r in tag_rows if difficulties[r] == level]
+                buckets[filter_key([tag.name], [level])] = self._table(weights, rows)
+
+        self._difficulties, self._weights, self._buckets = difficulties, weights, buckets
+        self._combined.clear()
+        self._version = snapshot.version
+        logger.info(f"Built {len(buckets)} sampler buckets for catalog version {snapshot.version}")
+
+    @staticmethod
+    def _table(weights: list[float], rows: Sequence[int]) -> AliasTable:
+        return AliasTable(rows, [weights[r] for r in rows])
+
+    def _bucket(self, snapshot: CatalogSnapshot, key: FilterKey) -> AliasTable:
+        table = self._buckets.get(key)
+        if table is None:
+            table = self._combined.get(key)
+        if table is not None:
+            return table
+
+        tags, levels = key
+        rows = sorted({r for tag in tags for r in snapshot.problem_rows_for_tag(tag)}) \
+            if tags else range(snapshot.problem_count)
+        if levels:
+            rows = [r for r in rows if self._difficulties[r] in levels]
+
+        table = self._combined[key] = self._table(self._weights, rows)
+        return table
+
+    def pick(self, tags: Optional[list[str]] = None, difficulty: Optional[list[str]] = None,
+             seed: Optional[int | str] = None) -> Optional[CatalogProblem]:
+        """
+        Picks a random problem matching the filters, weighted by acceptance rate.
+
+        Args:
+            tags (Optional[list[str]]): Tag names; a problem matches if it has any of them.
+            difficulty (Optional[list[str]]): Allowed difficulty levels.
+            seed (Optional[int | str]): Makes the pick deterministic when given.
+
+        Returns:
+            CatalogProblem | None: The picked problem, or None if nothing matches.
+        """
+        snapshot = self._current()
+        if snapshot is None:
+            return None
+
+        table = self._bucket(snapshot, filter_key(tags, difficulty))
+        if not table:
+            return None
+
+        rng = random.Random(seed) if seed is not None else self._rng
+        return snapshot.problem(table.sample(rng))
+
+    def daily(self, tags: Optional[list[str]] = None, difficulty: Optional[list[str]] = None,
+              day: Optional[date] = None) -> Optional[CatalogProblem]:
+        """
+        Picks the problem of the day for the given filters.
+
+        The seed is derived from the day and the filters only, so every worker mapping
+        the same catalog version returns the same problem for the whole day.
+        """
+        day = day or datetime.now(timezone.utc).date()
+        tags_key, levels_key = filter_key(tags, difficulty)
+        material = f"{day.isoformat()}|{','.join(sorted(tags_key))}|{','.join(sorted(levels_key))}"
+        seed = int.from_bytes(hashlib.sha256(material.encode()).digest()[:8], "big")
+        return self.pick(tags, difficulty, seed=seed)
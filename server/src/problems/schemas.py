@@ -0,0 +1,89 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class TagItem(BaseModel):
+    """
+    A tag as embedded in problem list items.
+    """
+    public_id: str
+    name: str
+
+
+class TagSummaryItem(TagItem):
+    """
+    A tag with the problem counts shown in the tag sidebar.
+
+    Attributes:
+        total (int): Number of problems with the tag.
+        easy (int): Number of Easy problems with the tag.
+        medium (int): Number of Medium problems with the tag.
+        hard (int): Number of Hard problems with the tag.
+        avg_acceptance_rate (float | None): Mean acceptance rate, None if the tag has no problems.
+    """
+    total: int
+    easy: int
+    medium: int
+    hard: int
+    avg_acceptance_rate: float | None = None
+
+
+class ProblemListItem(BaseModel):
+    """
+    List-level view of a problem, without the description.
+
+    Attributes:
+        public_id (str): The public ID of the problem.
+        name (str): The name of the problem.
+        difficulty (str): The difficulty level of the problem.
+        acceptance_rate (float): The acceptance rate of the problem.
+        link (str): The LeetCode link of the problem.
+        tags (list[TagItem]): The tags of the problem.
+    """
+    public_id: str
+    name: str
+    difficulty: str
+    acceptance_rate: float
+    link: str
+    tags: list[TagItem] = []
+
+
+class DescriptionExample(BaseModel):
+    """
+    An example extracted from a problem description.
+    """
+    input: str
+    output: str
+    explanation: Optional[str] = None
+
+
+class RenderedDescription(BaseModel):
+    """
+    A description prepared at ingest, so no request has to clean it up.
+
+    Attributes:
+        html (str): The sanitized description HTML.
+        statement (str): The sanitized HTML of the statement, before the first example.
+        examples (list[DescriptionExample]): The examples, as plain text.
+        constraints (list[str]): The constraints, as plain text with powers written as "^".
+        follow_up (str | None): The follow-up question, if any.
+    """
+    html: str
+    statement: str
+    examples: list[DescriptionExample] = []
+    constraints: list[str] = []
+    follow_up: Optional[str] = None
+
+
+class ProblemDetail(ProblemListItem):
+    """
+    Full view of a problem served by the detail routes.
+
+    Attributes:
+        description (str): The description of the problem. The detail routes serve the
+            sanitized HTML unless the scraped, unsanitized one is asked for.
+        rendered (RenderedDescription | None): The sanitized and structured description,
+            None for problems not rendered by an ingest yet.
+    """
+    description: str
+    rendered: Optional[RenderedDescription] = None
@@ -1,6 +1,15 @@
 from enum import Enum
+from datetime import date
 from pydantic import BaseModel, Field
-from .models import Problem, Tag
+from db.mixins import MAX_BATCH_SIZE
+from cache import coalesced
+from catalog import CatalogProblem, CatalogStore
+from .models import Problem, Tag, TagSummary, ProblemSimilarity
+from .schemas import ProblemDetail, ProblemListItem, TagItem
+from .descriptions import render_description
+from .sampler import ProblemSampler
+from .typeahead import Typeahead
+from .slugs import normalize_slug
 
 
 class SortOrder(str, Enum):
@@ -22,14 +31,50 @@ class FilterForProblem(BaseModel):
         frozen = True
 
 
+class BatchProblemsRequest(BaseModel):
+    ids: list[str] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+
 class ProblemNotFoundError(Exception):
     def __init__(self, problem_id: str):
         self.problem_id = problem_id
         super().__init__(f"Problem with id {problem_id} not found")
 
 
+def to_list_item(problem: CatalogProblem) -> ProblemListItem:
+    """
+    Maps a catalog problem to its public list item, dropping the internal ID and
+    snapshot row and resolving its tag names to public tags.
+    """
+    snapshot = CatalogStore.current()
+    tags = []
+    for name in problem.tags:
+        row = snapshot.tag_row(name) if snapshot is not None else None
+        if row is not None:
+            tags.append(TagItem(public_id=snapshot.tag(row).public_id, name=name))
+    return ProblemListItem(public_id=problem.public_id, name=problem.name,
+                           difficulty=problem.difficulty, acceptance_rate=problem.acceptance_rate,
+                           link=problem.link, tags=tags)
+
+
+def to_public_detail(problem: ProblemDetail, include_raw: bool = False) -> ProblemDetail:
+    """
+    Maps a problem detail to what the detail routes serve: `description` holds the
+    sanitized HTML unless the scraped one is asked for. Problems no ingest has
+    rendered yet are rendered here.
+    """
+    if problem.rendered is None:
+        problem = problem.model_copy(update={"rendered": render_description(problem.description)})
+    if not include_raw:
+        problem = problem.model_copy(update={"description": problem.rendered.html})
+    return problem
+
+
 class ProblemService:
+    sampler = ProblemSampler()
+    typeahead = Typeahead()
 
+    @coalesced
     async def get_problems_by_filter(self, filter: FilterForProblem):
         return await Problem.get_problems_by_filter(
             tags=filter.tags,
@@ -39,6 +84,33 @@ class ProblemService:
             page=filter.page
         )
 
+    async def search_problems(self, query: str, limit: int = 10):
+        """
+        Searches problems by name.
+
+        Args:
+            query (str): The text to look for within problem names.
+            limit (int): The maximum number of problems to return.
+
+        Returns:
+            list[ProblemListItem]: The matching problems, without descriptions.
+        """
+        return await Problem.search_problems_with_name(query, limit)
+
+    def suggest(self, query: str, limit: int = 8):
+        """
+        Suggests problems and tags for a search box, from the in-memory prefix indexes.
+
+        Args:
+            query (str): The text typed so far.
+            limit (int): The maximum number of problems and of tags to return.
+
+        Returns:
+            dict: The matching problems and tags, with only the fields a suggestion shows.
+        """
+        return self.typeahead.suggest(query, limit)
+
+    @coalesced
     async def get_all_tags(self):
         """
         Retrieves all tags from the database.
@@ -49,21 +121,132 @@ class ProblemService:
         tags = await Tag.get_all_tags()
         return tags
 
-    async def get_problem_by_public_id(self, problem_id: str):
+    @coalesced
+    async def get_tag_summaries(self):
+        """
+        Retrieves every tag with its per-difficulty problem counts and average
+        acceptance rate, read from the materialized summaries.
+
+        Returns:
+            list[TagSummaryItem]: The tags, most used first.
+        """
+        return await TagSummary.get_all()
+
+    @coalesced
+    async def get_problem_by_public_id(self, problem_id: str, include_raw: bool = False):
         """
         Retrieves a problem by its public ID.
 
         Args:
             problem_id (str): The public ID of the problem to retrieve.
+            include_raw (bool): Whether to serve the description as scraped, unsanitized.
 
         Raises:
             ProblemNotFoundError: If no problem is found with the given public ID.
 
         Returns:
-            Problem: The problem associated with the given public ID.
+            ProblemDetail: The problem associated with the given public ID, description included.
         """
-        problem = await Problem.get_by_public_id(problem_id)
-        print(problem)
+        problem = await Problem.get_detail(problem_id)
         if problem is None:
             raise ProblemNotFoundError(problem_id)
-        return problem
+        return to_public_detail(problem, include_raw)
+
+    async def get_problems_by_public_ids(self, problem_ids: list[str], include_raw: bool = False):
+        """
+        Retrieves many problems by their public IDs in one round trip.
+
+        Args:
+            problem_ids (list[str]): The public IDs of the problems to retrieve.
+            include_raw (bool): Whether to serve the descriptions as scraped, unsanitized.
+
+        Returns:
+            list[dict]: One entry per requested ID, in request order, with the
+                problem or a not-found marker.
+        """
+        problems = await Problem.get_details(problem_ids)
+        return [
+            {"public_id": problem_id, "found": problem is not None,
+             "problem": to_public_detail(problem, include_raw) if problem is not None else None}
+            for problem_id, problem in zip(problem_ids, problems)
+        ]
+
+    async def get_similar_problems(self, problem_id: str, limit: int = 10):
+        """
+        Retrieves the precomputed similar problems of a problem.
+
+        Args:
+            problem_id (str): The public ID of the problem.
+            limit (int): The maximum number of similar problems to return.
+
+        Returns:
+            list[dict]: The similar problems, most similar first.
+        """
+        return await ProblemSimilarity.get_similar(problem_id, limit)
+
+    def get_random_problem(self, tags: list[str], difficulty: list[str], seed: int | None = None):
+        """
+        Picks a random problem matching the filters, weighted by acceptance rate.
+
+        Raises:
+            ProblemNotFoundError: If no problem matches the filters.
+
+        Returns:
+            ProblemListItem: The picked problem.
+        """
+        problem = self.sampler.pick(tags, difficulty, seed=seed)
+        if problem is None:
+            raise ProblemNotFoundError("random")
+        return to_list_item(problem)
+
+    def get_daily_problem(self, tags: list[str], difficulty: list[str], day: date | None = None):
+        """
+        Picks the problem of the day for the filters; stable for the whole (UTC) day.
+
+        Raises:
+            ProblemNotFoundError: If no problem matches the filters.
+
+        Returns:
+            ProblemListItem: The problem of the day.
+        """
+        problem = self.sampler.daily(tags, difficulty, day=day)
+        if problem is None:
+            raise ProblemNotFoundError("daily")
+        return to_list_item(problem)
+
+    def get_problem_by_slug(self, slug: str):
+        """
+        Resolves a LeetCode slug, name or link from the in-memory catalog maps.
+
+        Raises:
+            ProblemNotFoundError: If no problem has the slug.
+
+        Returns:
+            ProblemListItem: The problem with the slug.
+        """
+        snapshot = CatalogStore.current()
+        problem = snapshot.find_by_slug(normalize_slug(slug)) if snapshot is not None else None
+        if problem is None:
+            raise ProblemNotFoundError(slug)
+        return to_list_item(problem)
+
+    def get_problem_by_number(self, number: int):
+        """
+        Resolves a LeetCode problem number from the in-memory catalog maps.
+
+        Raises:
+            ProblemNotFoundError: If no problem has the number.
+
+        Returns:
+            ProblemListItem: The problem with the number.
+        """
+        snapshot = CatalogStore.current()
+        problem = snapshot.find_by_number(number) if snapshot is not None else None
+        if problem is None:
+            raise ProblemNotFoundError(str(number))
+        return to_list_item(problem)
+
+
+# Built when a catalog version is mapped, so no suggestion or random pick pays for it
+CatalogStore.subscribe(ProblemService.typeahead.build)
+CatalogStore.subscribe(ProblemService.sampler.rebuild)
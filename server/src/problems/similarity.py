@@ -0,0 +1,258 @@
+import re
+import asyncio
+from typing import Optional
+
+import numpy as np
+from loguru import logger
+from scipy import sparse
+from sqlalchemy import delete, insert, select
+
+from db import db_session
+from .models import DescriptionDictionary, Problem, ProblemTags, ProblemSimilarity
+from .compression import DescriptionCodec
+
+
+TOP_K = 10
+TAG_WEIGHT = 0.4
+CHUNK_SIZE = 512
+
+_HTML_TAG = re.compile(r"<[^>]+>")
+_HTML_ENTITY = re.compile(r"&[a-z]+;|&#\d+;")
+_TOKEN = re.compile(r"[a-z][a-z0-9]+")
+_STOP_WORDS = frozenset("""
+    a an and are as at be by can for from given has have if in into is it its
+    of on or return such that the their then there these this to was were which
+    will with you your example input output explanation constraints
+""".split())
+
+
+def tokenize(description: str) -> list[str]:
+    """
+    Splits a problem description into lowercase word tokens, dropping markup and stop words.
+    """
+    text = _HTML_ENTITY.sub(" ", _HTML_TAG.sub(" ", description or "")).lower()
+    return [token for token in _TOKEN.findall(text) if token not in _STOP_WORDS]
+
+
+def _normalize_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return (sparse.diags(1.0 / norms) @ matrix).tocsr()
+
+
+def tfidf_matrix(descriptions: list[str]) -> sparse.csr_matrix:
+    """
+    Builds an L2-normalized TF-IDF matrix with sublinear term frequencies.
+
+    Args:
+        descriptions (list[str]): One description per problem.
+
+    Returns:
+        sparse.csr_matrix: A (problems x vocabulary) matrix.
+    """
+    vocabulary: dict[str, int] = {}
+    rows, cols = [], []
+    for row, description in enumerate(descriptions):
+        for token in tokenize(description):
+            rows.append(row)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+
+    counts = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(descriptions), len(vocabulary)),
+    )
+    counts.sum_duplicates()
+    counts.data = 1.0 + np.log(counts.data)
+
+    document_frequency = np.bincount(counts.indices, minlength=len(vocabulary))
+    idf = np.log((1.0 + len(descriptions)) / (1.0 + document_frequency)) + 1.0
+    return _normalize_rows((counts @ sparse.diags(idf.astype(np.float32))).tocsr())
+
+
+def tag_matrix(tag_ids: list[list[int]]) -> sparse.csr_matrix:
+    """
+    Builds a binary (problems x tags) incidence matrix.
+    """
+    columns = {tag_id: i for i, tag_id in enumerate(sorted({t for tags in tag_ids for t in tags}))}
+    rows = [row for row, tags in enumerate(tag_ids) for _ in tags]
+    cols = [columns[t] for tags in tag_ids for t in tags]
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(tag_ids), len(columns)),
+    )
+
+
+class SimilarityIndex:
+    """
+    Combined tag-Jaccard and description TF-IDF similarity over the whole catalog.
+
+    Attributes:
+        problem_ids (np.ndarray): Internal problem IDs, one per matrix row.
+        tag_weight (float): Weight of the tag Jaccard term; the cosine term gets the rest.
+    """
+
+    def __init__(self, problem_ids: list[int], descriptions: list[str], tag_ids: list[list[int]],
+                 tag_weight: float = TAG_WEIGHT):
+        self.problem_ids = np.asarray(problem_ids, dtype=np.int64)
+        self.rows = {problem_id: row for row, problem_id in enumerate(problem_ids)}
+        self.tag_weight = tag_weight
+        self._text = tfidf_matrix(descriptions)
+        self._tags = tag_matrix(tag_ids)
+        self._tag_sizes = np.asarray(self._tags.sum(axis=1)).ravel()
+
+    def scores(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Returns the dense (len(rows) x problems) similarity block for the given rows.
+        Self-similarity is set to -inf so a problem never recommends itself.
+        """
+        text = (self._text[rows] @ self._text.T).toarray()
+
+        intersection = (self._tags[rows] @ self._tags.T).toarray()
+        union = self._tag_sizes[rows][:, None] + self._tag_sizes[None, :] - intersection
+        jaccard = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+        block = self.tag_weight * jaccard + (1.0 - self.tag_weight) * text
+        block[np.arange(len(rows)), rows] = -np.inf
+        return block
+
+    def top_k(self, rows: np.ndarray, k: int = TOP_K) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the row indices and scores of the k most similar problems for each row,
+        best first, processed in chunks to bound memory.
+        """
+        k = min(k, len(self.problem_ids) - 1)
+        if k <= 0 or len(rows) == 0:
+            return np.empty((len(rows), 0), dtype=np.int64), np.empty((len(rows), 0))
+
+        neighbours, neighbour_scores = [], []
+        for start in range(0, len(rows), CHUNK_SIZE):
+            block = self.scores(rows[start:start + CHUNK_SIZE])
+            candidates = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            candidate_scores = np.take_along_axis(block, candidates, axis=1)
+            order = np.argsort(-candidate_scores, axis=1)
+            neighbours.append(np.take_along_axis(candidates, order, axis=1))
+            neighbour_scores.append(np.take_along_axis(candidate_scores, order, axis=1))
+        return np.vstack(neighbours), np.vstack(neighbour_scores)
+
+
+async def _load_corpus() -> tuple[list[int], list[str], list[list[int]]]:
+    async with db_session() as session:
+        problems = (await session.execute(
+            select(Problem.id, Problem.plain_description, Problem.description_zstd,
+                   Problem.description_dict_version).order_by(Problem.id)
+        )).tuples().all()
+        pairs = (await session.execute(
+            select(ProblemTags.problem_id, ProblemTags.tag_id)
+        )).tuples().all()
+
+    tags_by_problem: dict[int, list[int]] = {}
+    for problem_id, tag_id in pairs:
+        tags_by_problem.setdefault(problem_id, []).append(tag_id)
+
+    await DescriptionDictionary.ensure_registered({version for *_, version in problems})
+    problem_ids = [problem_id for problem_id, *_ in problems]
+    descriptions = [DescriptionCodec.decode(plain, blob, version)
+                    for _, plain, blob, version in problems]
+    return problem_ids, descriptions, [tags_by_problem.get(p, []) for p in problem_ids]
+
+
+async def _load_neighbours() -> dict[int, list[tuple[int, float]]]:
+    async with db_session() as session:
+        result = await session.execute(
+            select(ProblemSimilarity.problem_id,
+                   ProblemSimilarity.similar_problem_id,
+                   ProblemSimilarity.score).order_by(ProblemSimilarity.problem_id,
+                                                     ProblemSimilarity.rank)
+        )
+        neighbours: dict[int, list[tuple[int, float]]] = {}
+        for problem_id, similar_id, score in result.tuples():
+            neighbours.setdefault(problem_id, []).append((similar_id, score))
+    return neighbours
+
+
+def _affected_rows(index: SimilarityIndex, touched_rows: np.ndarray,
+                   neighbours: dict[int, list[tuple[int, float]]], k: int) -> np.ndarray:
+    """
+    Finds the rows whose top-k list can change when the touched rows change: the touched
+    rows themselves, rows that currently list a touched problem, and rows for which some
+    touched problem now scores above their current k-th neighbour.
+    """
+    touched_ids = set(index.problem_ids[touched_rows].tolist())
+    kth_score = np.full(len(index.problem_ids), -np.inf)
+    affected = np.zeros(len(index.problem_ids), dtype=bool)
+    affected[touched_rows] = True
+
+    for problem_id, row in index.rows.items():
+        current = neighbours.get(problem_id, [])
+        if len(current) < min(k, len(index.problem_ids) - 1):
+            affected[row] = True
+        elif current:
+            kth_score[row] = current[-1][1]
+        if any(similar_id in touched_ids for similar_id, _ in current):
+            affected[row] = True
+
+    for start in range(0, len(touched_rows), CHUNK_SIZE):
+        block = index.scores(touched_rows[start:start + CHUNK_SIZE])
+        affected |= (block > kth_score[None, :]).any(axis=0)
+
+    return np.flatnonzero(affected)
+
+
+async def refresh_similar_problems(touched_ids: Optional[set[int]] = None, k: int = TOP_K) -> int:
+    """
+    Rebuilds the precomputed top-k similar problems table.
+
+    With `touched_ids`, only the touched problems and the problems whose neighbour lists
+    they can enter or leave are recomputed; otherwise every row is rebuilt.
+
+    Args:
+        touched_ids (Optional[set[int]]): Internal IDs of problems added or changed by ingest.
+        k (int): Number of neighbours to keep per problem.
+
+    Returns:
+        int: The number of problems whose neighbour lists were rewritten.
+    """
+    problem_ids, descriptions, tag_ids = await _load_corpus()
+    if len(problem_ids) < 2:
+        return 0
+
+    index = await asyncio.to_thread(SimilarityIndex, problem_ids, descriptions, tag_ids)
+
+    if touched_ids is None:
+        rows = np.arange(len(problem_ids))
+    else:
+        neighbours = await _load_neighbours()
+        touched_rows = np.asarray(sorted(index.rows[p] for p in touched_ids if p in index.rows),
+                                  dtype=np.int64)
+        if len(touched_rows) == 0:
+            return 0
+        rows = await asyncio.to_thread(_affected_rows, index, touched_rows, neighbours, k)
+
+    neighbour_rows, scores = await asyncio.to_thread(index.top_k, rows, k)
+
+    affected_ids = index.problem_ids[rows].tolist()
+    records = [
+        {
+            "problem_id": problem_id,
+            "rank": rank,
+            "similar_problem_id": int(index.problem_ids[neighbour_rows[i, rank]]),
+            "score": float(scores[i, rank]),
+        }
+        for i, problem_id in enumerate(affected_ids)
+        for rank in range(neighbour_rows.shape[1])
+    ]
+
+    async with db_session() as session:
+        await session.execute(
+            delete(ProblemSimilarity).where(ProblemSimilarity.problem_id.in_(affected_ids))
+        )
+        if records:
+            await session.execute(insert(ProblemSimilarity), records)
+
+    logger.info(f"Recomputed similar problems for {len(affected_ids)} problems")
+    return len(affected_ids)
+
+
+# For command-line execution
+if __name__ == "__main__":
+    asyncio.run(refresh_similar_problems())
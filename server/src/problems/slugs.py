@@ -0,0 +1,27 @@
+import re
+from typing import Optional
+
+
+_NON_SLUG = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_slug(value: str) -> str:
+    """
+    Normalizes a problem slug, name or LeetCode link to the canonical slug,
+    e.g. "Two Sum", "two_sum" and "https://leetcode.com/problems/two-sum/" all
+    become "two-sum".
+    """
+    value = value.strip().lower()
+    if "/problems/" in value:
+        value = value.split("/problems/", 1)[1].split("/", 1)[0]
+    return _NON_SLUG.sub("-", value).strip("-")
+
+
+def parse_problem_number(title: str) -> Optional[int]:
+    """
+    Extracts the LeetCode number from a numbered title such as "1. Two Sum".
+    """
+    number, dot, _ = title.partition(".")
+    if not dot or not number.strip().isdigit():
+        return None
+    return int(number)
@@ -0,0 +1,164 @@
+import os
+import re
+import time
+import heapq
+from bisect import bisect_left
+from typing import Optional
+
+from loguru import logger
+
+from catalog import CatalogSnapshot, CatalogStore
+
+
+TYPEAHEAD_MAX_LIMIT = 20
+# Prefixes up to this length match too many keys to scan, so their top results are precomputed.
+TYPEAHEAD_PRECOMPUTED_PREFIX = int(os.getenv("TYPEAHEAD_PRECOMPUTED_PREFIX", "3"))
+
+_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_query(text: str) -> str:
+    """
+    Lowercases a query or key and collapses punctuation, so "Two-Sum", "two_sum"
+    and "two sum" are the same key.
+    """
+    return _SEPARATORS.sub(" ", text.lower()).strip()
+
+
+class PrefixIndex:
+    """
+    Immutable prefix index from normalized keys to ranked entries.
+
+    Entries are identified by their rank, 0 being the best, so "top k" is always
+    "smallest k". Keys are kept sorted for a bisect over longer prefixes, and the
+    top entries of every short prefix are precomputed.
+
+    Attributes:
+        entries (list): The entries, best ranked first.
+    """
+    __slots__ = ("entries", "_keys", "_ranks", "_exact", "_top")
+
+    def __init__(self, entries: list, keys_of_entry: list[list[str]]):
+        self.entries = entries
+        pairs = sorted((key, rank) for rank, keys in enumerate(keys_of_entry) for key in keys)
+        self._keys = [key for key, _ in pairs]
+        self._ranks = [rank for _, rank in pairs]
+
+        self._exact: dict[str, list[int]] = {}
+        self._top: dict[str, list[int]] = {}
+        for rank, keys in enumerate(keys_of_entry):
+            for key in keys:
+                exact = self._exact.setdefault(key, [])
+                if not exact or exact[-1] != rank:
+                    exact.append(rank)
+                for length in range(1, min(TYPEAHEAD_PRECOMPUTED_PREFIX, len(key)) + 1):
+                    top = self._top.setdefault(key[:length], [])
+                    if len(top) < TYPEAHEAD_MAX_LIMIT and (not top or top[-1] != rank):
+                        top.append(rank)
+
+    def search(self, prefix: str, limit: int) -> list:
+        """
+        Returns up to `limit` entries with a key starting with `prefix`; entries whose
+        key equals it come first, the rest follow in rank order.
+        """
+        exact = self._exact.get(prefix, ())
+        if len(prefix) > TYPEAHEAD_PRECOMPUTED_PREFIX:
+            start = bisect_left(self._keys, prefix)
+            end = bisect_left(self._keys, prefix + "\x7f", start)
+            top = heapq.nsmallest(limit + len(exact), set(self._ranks[start:end]))
+        else:
+            top = self._top.get(prefix, ())
+
+        ranks = list(exact[:limit])
+        for rank in top:
+            if len(ranks) >= limit:
+                break
+            if rank not in exact:
+                ranks.append(rank)
+        return [self.entries[rank] for rank in ranks]
+
+
+def _word_suffixes(text: str) -> list[str]:
+    words = normalize_query(text).split()
+    # Every word starts a key, so "sum" finds "Two Sum"
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def _problem_keys(name: str, slug: str, number: Optional[int]) -> list[str]:
+    keys = _word_suffixes(name)
+    slug_key = normalize_query(slug)
+    if slug_key and slug_key not in keys:
+        keys.append(slug_key)
+    if number is not None:
+        keys.append(str(number))
+    return keys
+
+
+class Typeahead:
+    """
+    Search-box suggestions served from prefix indexes over the catalog snapshot.
+
+    Problems are matched on their names (from any word), slugs and numbers and
+    ranked by acceptance rate; tags are matched on their names (from any word) and
+    ranked by how many problems carry them. Entries only hold the fields a suggestion
+    list shows. The indexes are rebuilt by `build` when a new catalog version is
+    mapped, i.e. at startup and after each ingest, and swapped in with a single
+    assignment, so a lookup never sees a half-built index.
+    """
+
+    def __init__(self):
+        self._indexes: Optional[tuple[int, PrefixIndex, PrefixIndex]] = None
+
+    def _current(self) -> Optional[tuple[int, PrefixIndex, PrefixIndex]]:
+        snapshot = CatalogStore.current()
+        indexes = self._indexes
+        if snapshot is not None and (indexes is None or indexes[0] != snapshot.version):
+            # Only when this instance was not subscribed to the CatalogStore
+            indexes = self._indexes = self._build(snapshot)
+        return indexes
+
+    def build(self, snapshot: CatalogSnapshot):
+        """
+        Builds the indexes of a catalog snapshot and swaps them in.
+        """
+        if self._indexes is None or self._indexes[0] != snapshot.version:
+            self._indexes = self._build(snapshot)
+
+    @staticmethod
+    def _build(snapshot: CatalogSnapshot) -> tuple[int, PrefixIndex, PrefixIndex]:
+        started = time.perf_counter()
+        problems = sorted(snapshot.problems(), key=lambda p: (-p.acceptance_rate, p.id))
+        problem_index = PrefixIndex(
+            [{"public_id": p.public_id, "name": p.name, "slug": p.slug,
+              "number": p.number, "difficulty": p.difficulty} for p in problems],
+            [_problem_keys(p.name, p.slug, p.number) for p in problems])
+
+        tags = sorted(snapshot.tags(), key=lambda t: (-t.problem_count, t.name))
+        tag_index = PrefixIndex(
+            [{"public_id": t.public_id, "name": t.name, "problem_count": t.problem_count} for t in tags],
+            [_word_suffixes(t.name) for t in tags])
+
+        logger.info(f"Built typeahead indexes for catalog version {snapshot.version} in "
+                    f"{(time.perf_counter() - started) * 1000:.1f}ms")
+        return snapshot.version, problem_index, tag_index
+
+    def suggest(self, query: str, limit: int = 8) -> dict:
+        """
+        Suggests problems and tags for what has been typed so far.
+
+        Args:
+            query (str): The text typed so far.
+            limit (int): The maximum number of problems and of tags to return.
+
+        Returns:
+            dict: The matching problems and tags, best first.
+        """
+        prefix = normalize_query(query)
+        indexes = self._current()
+        if not prefix or indexes is None:
+            return {"problems": [], "tags": []}
+
+        _, problem_index, tag_index = indexes
+        limit = min(limit, TYPEAHEAD_MAX_LIMIT)
+        return {"problems": problem_index.search(prefix, limit),
+                "tags": tag_index.search(prefix, limit)}
@@ -1,3 +1,4 @@
 from .app import app
+from .admin import router as admin_router
 
-__all__ = ["app"]
+__all__ = ["app", "admin_router"]
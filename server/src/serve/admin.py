@@ -0,0 +1,83 @@
+import hmac
+import time
+from typing import Literal
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import Response
+from pydantic import BaseModel, Field
+from usage import LLMUsage, UsageLedger
+from .profiling import (ADMIN_TOKEN, PROFILE_TOKEN_MAX_TTL, ProfileStore, ProfilingControl,
+                        sign_profile_token)
+
+
+async def require_admin(x_admin_token: str = Header(default="")):
+    """
+    Lets a request through only with the configured ADMIN_TOKEN. Without one,
+    the admin routes do not exist.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+class ProfilingSettings(BaseModel):
+    """
+    Sampled profiling settings.
+
+    Attributes:
+        sample_rate (float): The fraction of requests to profile, 0 to turn sampling off.
+        path_prefix (str): Only requests under this path are sampled.
+    """
+    sample_rate: float = Field(ge=0, le=1)
+    path_prefix: str = "/"
+
+
+@router.get("/profiling")
+async def get_profiling_settings():
+    return ProfilingControl.snapshot()
+
+
+@router.put("/profiling")
+async def update_profiling_settings(settings: ProfilingSettings):
+    ProfilingControl.configure(settings.sample_rate, settings.path_prefix)
+    return ProfilingControl.snapshot()
+
+
+@router.post("/profiling/token")
+async def create_profiling_token(ttl_seconds: int = 300):
+    if not 0 < ttl_seconds <= PROFILE_TOKEN_MAX_TTL:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"ttl_seconds must be between 1 and {PROFILE_TOKEN_MAX_TTL}")
+    return {"header": "X-Profile", "value": sign_profile_token(ttl_seconds)}
+
+
+@router.get("/profiles")
+async def list_profiles():
+    return ProfileStore.list()
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str, output: Literal["html", "speedscope"] = "html"):
+    rendered = ProfileStore.render(profile_id, output)
+    if rendered is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Profile {profile_id} not found")
+    report, media_type = rendered
+    extension = "html" if output == "html" else "speedscope.json"
+    return Response(report, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{profile_id}.{extension}"'})
+
+
+@router.get("/usage")
+async def get_usage(group_by: Literal["model", "client", "problem_id", "purpose", "status"] = "model",
+                    days: float = Query(default=1, gt=0, le=90)):
+    await UsageLedger.flush()
+    return await LLMUsage.summarize(time.time() - days * 86400, group_by)
+
+
+@router.get("/usage/budgets")
+async def get_usage_budgets():
+    return UsageLedger.budgets()
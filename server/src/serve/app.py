@@ -1,6 +1,6 @@
 import os
+import asyncio
 from loguru import logger
-from dotenv import load_dotenv
 from enum import Enum
 
 from fastapi import FastAPI, Request, status
@@ -10,9 +10,19 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError, ResponseValidationError
 from contextlib import asynccontextmanager
 from db import init_db
+from catalog import CatalogStore, build_catalog_snapshot
+from jobs import job_queue
+from db.instrumentation import SQLMetrics
+from llm.hedging import HedgeStats
+from llm.http import close_llm_http_client, pool_stats
+from solution.translate import TranslationStats
+from usage import BudgetExceeded, UsageLedger
 
 
-from .middleware import RequestLoggingMiddleware
+from .middleware import RequestLoggingMiddleware, QueryInstrumentationMiddleware
+from .ratelimit import AdmissionControlMiddleware
+from .profiling import ProfilingMiddleware
+from .warmup import Readiness, warm_up
 
 
 class Environment(Enum):
@@ -20,18 +30,32 @@ class Environment(Enum):
     PROD = "production"
 
 
-load_dotenv()
-
 ENVIRONMENT = Environment(os.getenv("ENVIRONMENT", "dev"))
 ALLOWED_HOSTS = os.getenv("ALLOWED_HOSTS", "").split(",")
 
-print(ENVIRONMENT, ALLOWED_HOSTS)
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await init_db()
+    logger.info(f"Starting in {ENVIRONMENT.value} with allowed hosts {ALLOWED_HOSTS}")
+    async with Readiness.phase("init_db"):
+        await init_db()
+    async with Readiness.phase("catalog"):
+        CatalogStore.refresh()
+        if CatalogStore.outdated:
+            # Snapshots written before a format change are republished from the database
+            await build_catalog_snapshot(CatalogStore.directory)
+            CatalogStore.refresh()
+    async with Readiness.phase("usage_ledger"):
+        await UsageLedger.start()
+    async with Readiness.phase("job_queue"):
+        await job_queue.start()
+    # Warm-up runs after startup so the process answers /ready with 503 meanwhile
+    warm_up_task = asyncio.create_task(warm_up())
     yield
+    warm_up_task.cancel()
+    await job_queue.stop()
+    await UsageLedger.stop()
+    await close_llm_http_client()
 
 
 app = FastAPI(
@@ -61,6 +85,51 @@ app.add_middleware(
 app.add_middleware(RequestLoggingMiddleware)
 
 
+app.add_middleware(QueryInstrumentationMiddleware, expose_headers=ENVIRONMENT == Environment.DEV)
+
+
+# Inside admission control, so rejected requests are never profiled
+app.add_middleware(ProfilingMiddleware)
+
+
+# Added last so it is the outermost layer and rejects before any other work
+app.add_middleware(AdmissionControlMiddleware)
+
+
+@app.get("/ready")
+async def get_readiness():
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if Readiness.ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=Readiness.snapshot()
+    )
+
+
+@app.get("/metrics/sql")
+async def get_sql_metrics():
+    return SQLMetrics.snapshot()
+
+
+@app.get("/metrics/admission")
+async def get_admission_metrics():
+    return AdmissionControlMiddleware.stats()
+
+
+@app.get("/metrics/llm")
+async def get_llm_metrics():
+    return {**HedgeStats.snapshot(),
+            "translation": TranslationStats.snapshot(),
+            "http_pool": pool_stats()}
+
+
+@app.exception_handler(BudgetExceeded)
+async def budget_exceeded_handler(request: Request, exc: BudgetExceeded):
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(int(exc.retry_after) + 1)}
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Global exception: {exc}")
@@ -2,6 +2,7 @@ import json
 from loguru import logger
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware
+from db.instrumentation import SQLMetrics, start_tracking
 
 
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
@@ -28,3 +29,32 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
 
         response = await call_next(request)
         return response
+
+
+class QueryInstrumentationMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app, expose_headers: bool = False):
+        super().__init__(app)
+        self.expose_headers = expose_headers
+
+    async def dispatch(self, request: Request, call_next):
+        """
+        Counts and times the SQL statements of the request and flags statements
+        repeated often enough to be an N+1 pattern. The numbers are added as
+        response headers when `expose_headers` is set and always aggregated in
+        SQLMetrics.
+        """
+        stats = start_tracking()
+        response = await call_next(request)
+
+        repeated = stats.n_plus_one()
+        for statement, count in repeated.items():
+            logger.warning(f"Possible N+1 in {request.method} {request.url.path}: "
+                           f"{count}x {' '.join(statement.split())[:200]}")
+        SQLMetrics.record(stats)
+
+        if self.expose_headers:
+            response.headers["X-SQL-Queries"] = str(stats.count)
+            response.headers["X-SQL-Time-Ms"] = f"{stats.total_ms:.2f}"
+            response.headers["X-SQL-Slow-Queries"] = str(stats.slow)
+            response.headers["X-SQL-N-Plus-One"] = str(len(repeated))
+        return response
@@ -0,0 +1,213 @@
+import os
+import re
+import hmac
+import json
+import time
+import uuid
+import random
+import asyncio
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger
+from pyinstrument import Profiler
+from pyinstrument.renderers import HTMLRenderer, SpeedscopeRenderer
+from pyinstrument.session import Session
+
+from .ratelimit import _header
+
+
+# Signs profiling tokens and guards the admin routes; both are disabled when unset.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "./profiles"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+PROFILE_TOKEN_MAX_TTL = int(os.getenv("PROFILE_TOKEN_MAX_TTL", "3600"))
+
+PROFILE_HEADER = b"x-profile"
+RENDERERS = {"html": (HTMLRenderer, "text/html"),
+             "speedscope": (SpeedscopeRenderer, "application/json")}
+
+_PROFILE_ID = re.compile(r"^\d{13}-[0-9a-f]{8}$")
+
+
+def _signature(expires: int) -> str:
+    return hmac.new(ADMIN_TOKEN.encode(), f"profile:{expires}".encode(), hashlib.sha256).hexdigest()
+
+
+def sign_profile_token(ttl_seconds: int) -> str:
+    """
+    Creates a value for the X-Profile header that profiles every request carrying it
+    until it expires, so the admin token itself never has to be handed out.
+    """
+    expires = int(time.time()) + min(ttl_seconds, PROFILE_TOKEN_MAX_TTL)
+    return f"{expires}.{_signature(expires)}"
+
+
+def verify_profile_token(token: str) -> bool:
+    if not ADMIN_TOKEN:
+        return False
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(int(expires)))
+
+
+class ProfilingControl:
+    """
+    The runtime switch for sampled profiling, flipped through the admin routes.
+
+    Attributes:
+        sample_rate (float): The fraction of requests to profile, 0 to profile none.
+        path_prefix (str): Only requests under this path are sampled.
+    """
+    sample_rate: float = PROFILE_SAMPLE_RATE
+    path_prefix: str = "/"
+
+    @classmethod
+    def configure(cls, sample_rate: float, path_prefix: str = "/"):
+        cls.sample_rate = sample_rate
+        cls.path_prefix = path_prefix
+        logger.info(f"Profiling {sample_rate:.1%} of requests under {path_prefix}")
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        return {"sample_rate": cls.sample_rate, "path_prefix": cls.path_prefix}
+
+
+class ProfileStore:
+    """
+    A bounded on-disk ring buffer of profiles.
+
+    Each profile is a pyinstrument session file next to a small JSON summary. IDs start
+    with the capture time in milliseconds, so sorting them orders the ring, and only the
+    newest `keep` profiles are kept.
+    """
+    directory: Path = PROFILE_DIR
+    keep: int = PROFILE_KEEP
+
+    @classmethod
+    def _write(cls, session: Session, summary: dict):
+        cls.directory.mkdir(parents=True, exist_ok=True)
+        profile_id = summary["id"]
+        session_tmp = cls.directory / f"{profile_id}.pyisession.tmp"
+        session.save(session_tmp)
+        os.replace(session_tmp, cls.directory / f"{profile_id}.pyisession")
+        summary_tmp = cls.directory / f"{profile_id}.json.tmp"
+        summary_tmp.write_text(json.dumps(summary))
+        os.replace(summary_tmp, cls.directory / f"{profile_id}.json")
+
+        for old in sorted(cls.directory.glob("*.json"), reverse=True)[cls.keep:]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".pyisession").unlink(missing_ok=True)
+
+    @classmethod
+    async def save(cls, session: Session, method: str, path: str, status: Optional[int],
+                   trigger: str) -> str:
+        """
+        Stores a profile without blocking the event loop.
+
+        Returns:
+            str: The ID of the profile.
+        """
+        profile_id = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        summary = {
+            "id": profile_id,
+            "method": method,
+            "path": path,
+            "status": status,
+            "trigger": trigger,
+            "duration_ms": round(session.duration * 1000, 2),
+            "samples": session.sample_count,
+            "created_at": session.start_time,
+        }
+        await asyncio.to_thread(cls._write, session, summary)
+        return profile_id
+
+    @classmethod
+    def list(cls) -> list[dict]:
+        """
+        Returns the summaries of the stored profiles, newest first.
+        """
+        if not cls.directory.exists():
+            return []
+        summaries = []
+        for path in sorted(cls.directory.glob("*.json"), reverse=True):
+            try:
+                summaries.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                # Pruned or being replaced by a concurrent writer
+                continue
+        return summaries
+
+    @classmethod
+    def render(cls, profile_id: str, output: str = "html") -> Optional[tuple[str, str]]:
+        """
+        Renders a stored profile.
+
+        Args:
+            profile_id (str): The ID of the profile.
+            output (str): "html" for pyinstrument's interactive report, or "speedscope"
+                for a flame graph to open in speedscope.
+
+        Returns:
+            tuple[str, str] | None: The report and its media type, or None if the profile is unknown.
+        """
+        path = cls.directory / f"{profile_id}.pyisession"
+        if not _PROFILE_ID.match(profile_id) or not path.exists():
+            return None
+        renderer, media_type = RENDERERS[output]
+        return renderer().render(Session.load(path)), media_type
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware that profiles a request with pyinstrument when it carries a
+    valid X-Profile token or is picked by ProfilingControl's sample rate.
+
+    Requests that are not profiled pay for a sample rate check, plus a header lookup
+    when ADMIN_TOKEN is configured; no profiler is created for them.
+    """
+
+    def __init__(self, app, interval: float = PROFILE_INTERVAL):
+        self.app = app
+        self.interval = interval
+
+    def _trigger(self, scope) -> Optional[str]:
+        if ADMIN_TOKEN:
+            token = _header(scope, PROFILE_HEADER)
+            if token is not None and verify_profile_token(token):
+                return "header"
+        rate = ProfilingControl.sample_rate
+        if rate and scope["path"].startswith(ProfilingControl.path_prefix) and random.random() < rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = None
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            session = profiler.stop()
+            try:
+                profile_id = await ProfileStore.save(session, scope["method"], scope["path"],
+                                                     status, trigger)
+                logger.info(f"Profiled {scope['method']} {scope['path']} as {profile_id}")
+            except Exception as e:
+                logger.warning(f"Could not store profile of {scope['path']}: {e}")
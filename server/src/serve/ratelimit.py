@@ -0,0 +1,217 @@
+import os
+import json
+import time
+import hashlib
+from typing import Optional
+
+from cachetools import TTLCache
+from loguru import logger
+from usage import set_client
+
+
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "5"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "60"))
+API_KEY_RATE_MULTIPLIER = float(os.getenv("API_KEY_RATE_MULTIPLIER", "4"))
+LLM_ROUTE_COST = float(os.getenv("LLM_ROUTE_COST", "20"))
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "256"))
+MAX_TRACKED_CLIENTS = int(os.getenv("MAX_TRACKED_CLIENTS", "100000"))
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() == "true"
+
+
+def _hash_key(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest()[:32]
+
+
+# Comma-separated keys that get their own, larger bucket; only their hashes are kept.
+API_KEY_HASHES = frozenset(_hash_key(key.strip()) for key in os.getenv("API_KEYS", "").split(",")
+                           if key.strip())
+
+# Routes that start an LLM call; everything else is a cheap read.
+LLM_ROUTES = ("/leetcode/solution",)
+
+# Long-lived streams would hold a concurrency slot for their whole lifetime.
+UNBOUNDED_SUFFIXES = ("/events",)
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `capacity` tokens, refilled continuously at `rate` per second.
+    """
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, capacity: float, now: float):
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, cost: float, rate: float, capacity: float, now: float) -> float:
+        """
+        Takes `cost` tokens if available.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise the seconds until they will be.
+        """
+        self.tokens = min(capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / rate
+
+
+class RateLimiter:
+    """
+    Per-client token buckets in bounded memory.
+
+    A bucket left alone for `capacity / rate` seconds is full again, which is exactly
+    what a new bucket looks like, so buckets expire after that long without losing
+    anything. Beyond `max_clients` the least recently used bucket is dropped.
+
+    Args:
+        rate (float): Tokens refilled per second for anonymous clients.
+        capacity (float): Bucket size, i.e. the allowed burst.
+        key_multiplier (float): Rate and burst multiplier for clients sending an API key.
+        max_clients (int): The maximum number of buckets kept.
+    """
+
+    def __init__(self,
+                 rate: float = RATE_LIMIT_PER_SECOND,
+                 capacity: float = RATE_LIMIT_BURST,
+                 key_multiplier: float = API_KEY_RATE_MULTIPLIER,
+                 max_clients: int = MAX_TRACKED_CLIENTS):
+        self.rate = rate
+        self.capacity = capacity
+        self.key_multiplier = key_multiplier
+        self._buckets = TTLCache[str, TokenBucket](maxsize=max_clients, ttl=capacity / rate)
+
+    def acquire(self, client: str, cost: float, has_key: bool = False) -> float:
+        """
+        Charges a request to a client.
+
+        Args:
+            client (str): The client key, see `client_key`.
+            cost (float): Tokens the request costs.
+            has_key (bool): Whether the client authenticated with an API key.
+
+        Returns:
+            float: 0 if the request is admitted, otherwise the seconds to wait before retrying.
+        """
+        multiplier = self.key_multiplier if has_key else 1.0
+        rate, capacity = self.rate * multiplier, self.capacity * multiplier
+        now = time.monotonic()
+        bucket = self._buckets.pop(client, None) or TokenBucket(capacity, now)
+        wait = bucket.take(min(cost, capacity), rate, capacity, now)
+        # Re-inserting restarts the expiry timer
+        self._buckets[client] = bucket
+        return wait
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", []):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def client_key(scope) -> tuple[str, bool]:
+    """
+    Identifies the client of a request: its API key if it sent one listed in API_KEYS,
+    otherwise its IP. Unknown keys are ignored, or a client could get a fresh bucket,
+    and a fresh token budget, on every request by making up a new key each time.
+    API keys are hashed so they are never kept in memory in plain text.
+
+    Returns:
+        tuple[str, bool]: The bucket key and whether it is an API key.
+    """
+    api_key = _header(scope, b"x-api-key")
+    if api_key:
+        hashed = _hash_key(api_key)
+        if hashed in API_KEY_HASHES:
+            return "key:" + hashed, True
+        logger.debug("Ignoring an unknown API key")
+
+    forwarded = _header(scope, b"x-forwarded-for") if TRUST_FORWARDED_FOR else None
+    if forwarded:
+        return "ip:" + forwarded.split(",")[0].strip(), False
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown"), False
+
+
+def request_cost(scope) -> float:
+    return LLM_ROUTE_COST if scope["path"].startswith(LLM_ROUTES) else 1.0
+
+
+async def _reject(send, status_code: int, detail: str, retry_after: float):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, int(retry_after + 0.999))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionControlMiddleware:
+    """
+    Pure ASGI middleware that rejects requests before any other work is done:
+
+    - 503 when `max_concurrent` requests are already being served, so excess load
+      is shed instead of queueing on a saturated event loop;
+    - 429 when the client's token bucket cannot pay for the request. LLM routes
+      cost LLM_ROUTE_COST tokens, everything else one.
+
+    Both responses carry Retry-After. Counters are class-level so they can be read
+    without a handle on the instance Starlette builds.
+    """
+    in_flight = 0
+    shed = 0
+    throttled = 0
+
+    def __init__(self, app, limiter: Optional[RateLimiter] = None,
+                 max_concurrent: int = MAX_CONCURRENT_REQUESTS):
+        self.app = app
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.max_concurrent = max_concurrent
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        cls = type(self)
+        bounded = not scope["path"].endswith(UNBOUNDED_SUFFIXES)
+        if bounded and cls.in_flight >= self.max_concurrent:
+            cls.shed += 1
+            logger.warning(f"Shedding {scope['method']} {scope['path']}: "
+                           f"{cls.in_flight} requests in flight")
+            await _reject(send, 503, "Server is busy, please retry shortly", 1)
+            return
+
+        client, has_key = client_key(scope)
+        wait = self.limiter.acquire(client, request_cost(scope), has_key)
+        if wait > 0:
+            cls.throttled += 1
+            await _reject(send, 429, "Too many requests", wait)
+            return
+        # LLM usage of the request is charged to the same client
+        set_client(client)
+
+        if not bounded:
+            await self.app(scope, receive, send)
+            return
+
+        cls.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            cls.in_flight -= 1
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {"in_flight": cls.in_flight, "shed": cls.shed, "throttled": cls.throttled}
@@ -1,51 +1,257 @@
+import os
 import json
+import uuid
+import asyncio
 from loguru import logger
 from datetime import datetime
-from contextlib import asynccontextmanager
-from typing import Optional, Callable, AsyncGenerator
+from collections import deque
+from typing import Any, Optional, Callable, AsyncGenerator
 
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Request, status
 from fastapi.responses import StreamingResponse
 
 
-class StreamManager:
-    """Manages streaming responses with error handling and cleanup"""
+HEARTBEAT_INTERVAL = float(os.getenv("SSE_HEARTBEAT_INTERVAL", "15"))
+REPLAY_BUFFER_SIZE = int(os.getenv("SSE_REPLAY_BUFFER_SIZE", "256"))
+MAX_PENDING_EVENTS = int(os.getenv("SSE_MAX_PENDING_EVENTS", "64"))
+RESUME_TIMEOUT = float(os.getenv("SSE_RESUME_TIMEOUT", "60"))
+RETRY_MILLISECONDS = 3000
 
-    @staticmethod
-    @asynccontextmanager
-    async def stream_context():
-        try:
-            yield
-        except Exception as e:
-            logger.error(f"Streaming error: {str(e)}")
-            yield json.dumps({"error": "Streaming error occurred", "details": str(e)})
+
+def _serialize(data: Any) -> str:
+    return json.dumps(
+        data,
+        default=lambda o: o.isoformat() if isinstance(o, datetime) else str(o)
+    )
+
+
+def format_event(data: str, event: Optional[str] = None, event_id: Optional[str] = None,
+                 retry: Optional[int] = None) -> str:
+    """
+    Frames one Server-Sent Event.
+
+    Args:
+        data: The serialized payload; a multi-line payload is sent as several data lines.
+        event: The event type; clients treat a missing type as "message".
+        event_id: Sent back by the client as `Last-Event-ID` when it reconnects.
+        retry: Reconnection delay the client should use, in milliseconds.
+
+    Returns:
+        str: The framed event, terminated by a blank line.
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    if retry is not None:
+        lines.append(f"retry: {retry}")
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return "\n".join(lines) + "\n\n"
 
 
-async def stream_text_response(stream_function: Callable[[], AsyncGenerator[str, None]]):
-    async with StreamManager.stream_context():
+class ResumableStream:
+    """
+    Runs a producer in the background and keeps its latest events so a client
+    that reconnects with `Last-Event-ID` resumes where it left off instead of
+    starting the producer again.
+
+    The producer may run at most `max_pending` events ahead of the client, so a
+    slow or disconnected client pauses it instead of growing memory; if nobody
+    reconnects within `resume_timeout` seconds the producer is cancelled.
+
+    Attributes:
+        stream_id (str): Prefix of every event ID of this stream.
+        resource (str): What the stream was opened for; it is only resumed by requests for the same.
+    """
+
+    def __init__(self, stream_func: Callable[[], AsyncGenerator[Any, None]],
+                 resource: str = "",
+                 replay_size: int = REPLAY_BUFFER_SIZE,
+                 max_pending: int = MAX_PENDING_EVENTS,
+                 resume_timeout: float = RESUME_TIMEOUT):
+        self.stream_id = uuid.uuid4().hex
+        self.resource = resource
+        self.done = False
+        self.resume_timeout = resume_timeout
+        self._max_pending = min(max_pending, replay_size)
+        self._events: deque[tuple[int, str]] = deque(maxlen=replay_size)
+        self._last_seq = 0
+        self._delivered_seq = 0
+        self._consumers = 0
+        self._changed = asyncio.Condition()
+        self._task = asyncio.create_task(self._produce(stream_func))
+
+    def _event_id(self, seq: int) -> str:
+        return f"{self.stream_id}:{seq}"
+
+    async def _publish(self, data: str, event: Optional[str] = None):
+        async with self._changed:
+            await self._changed.wait_for(
+                lambda: self._last_seq - self._delivered_seq < self._max_pending)
+            self._last_seq += 1
+            self._events.append(
+                (self._last_seq, format_event(data, event, self._event_id(self._last_seq))))
+            self._changed.notify_all()
+
+    async def _produce(self, stream_func: Callable[[], AsyncGenerator[Any, None]]):
         try:
-            async for chunk in stream_function():
+            async for chunk in stream_func():
                 try:
-                    serialized = json.dumps(
-                        chunk,
-                        default=lambda o: o.isoformat() if isinstance(o, datetime) else str(o)
-                    )
-                    yield serialized
+                    data = _serialize(chunk)
                 except (TypeError, ValueError) as e:
                     logger.error(f"Serialization error: {str(e)}")
-                    yield json.dumps({"error": "Failed to serialize response"})
+                    await self._publish(_serialize({"error": "Failed to serialize response"}), "error")
+                    continue
+                await self._publish(data)
+            await self._publish("", "done")
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"Unexpected streaming error: {str(e)}")
-            yield json.dumps({"error": "Internal server error"})
+            await self._publish(_serialize({"error": "Internal server error"}), "error")
+        finally:
+            async with self._changed:
+                self.done = True
+                self._changed.notify_all()
+
+    def cancel(self):
+        self._task.cancel()
 
+    async def subscribe(self, after: int = 0,
+                        heartbeat: float = HEARTBEAT_INTERVAL) -> AsyncGenerator[str, None]:
+        """
+        Yields framed events with a sequence number above `after`, replaying the
+        buffered ones first, and a comment line whenever nothing was sent for
+        `heartbeat` seconds so proxies keep the connection open.
+        """
+        self._consumers += 1
+        try:
+            if after < self._last_seq and self._events and after < self._events[0][0] - 1:
+                logger.warning(f"Stream {self.stream_id} cannot replay events "
+                               f"{after + 1}-{self._events[0][0] - 1}")
+            yield format_event("", "open", retry=RETRY_MILLISECONDS)
+            while True:
+                async with self._changed:
+                    try:
+                        await asyncio.wait_for(
+                            self._changed.wait_for(lambda: self._last_seq > after or self.done),
+                            heartbeat)
+                    except asyncio.TimeoutError:
+                        pending = None
+                    else:
+                        pending = [frame for seq, frame in self._events if seq > after]
+                        after = self._last_seq
+                        if self._events:
+                            self._delivered_seq = max(self._delivered_seq, after)
+                        self._changed.notify_all()
+
+                if pending is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                for frame in pending:
+                    yield frame
+                if self.done and after == self._last_seq:
+                    return
+        finally:
+            self._consumers -= 1
+
+    @property
+    def idle(self) -> bool:
+        return self._consumers == 0
 
-def stream_response(stream_func: Callable[[], AsyncGenerator[str, None]], headers: Optional[dict[str, str]] = None):
+
+class StreamRegistry:
+    """
+    Keeps resumable streams by ID until they finish and no client is attached,
+    or until nobody has resumed them for their resume timeout.
     """
-    Create a StreamingResponse with configurable options.
+    _streams: dict[str, ResumableStream] = {}
+    _reapers: dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def create(cls, stream_func: Callable[[], AsyncGenerator[Any, None]],
+               resource: str = "") -> ResumableStream:
+        stream = ResumableStream(stream_func, resource)
+        cls._streams[stream.stream_id] = stream
+        return stream
+
+    @classmethod
+    def resume(cls, last_event_id: Optional[str],
+               resource: str = "") -> Optional[tuple[ResumableStream, int]]:
+        """
+        Finds the stream and position a `Last-Event-ID` header refers to.
+
+        Args:
+            last_event_id: The `Last-Event-ID` header of the request.
+            resource: What the request streams; a stream opened for anything else is not resumed.
+
+        Returns:
+            tuple[ResumableStream, int] | None: The stream and the last sequence number
+            the client saw, or None if the stream is unknown, already gone or was
+            opened for another resource.
+        """
+        if not last_event_id:
+            return None
+        stream_id, _, seq = last_event_id.partition(":")
+        stream = cls._streams.get(stream_id)
+        if stream is None or not seq.isdigit():
+            return None
+        if stream.resource != resource:
+            logger.warning(f"Not resuming stream {stream_id} of {stream.resource!r} for {resource!r}")
+            return None
+        reaper = cls._reapers.pop(stream_id, None)
+        if reaper is not None:
+            reaper.cancel()
+        return stream, int(seq)
+
+    @classmethod
+    def release(cls, stream: ResumableStream):
+        """
+        Called when a client disconnects; drops the stream once it can no longer be resumed.
+        """
+        if not stream.idle or stream.stream_id in cls._reapers:
+            return
+        cls._reapers[stream.stream_id] = asyncio.create_task(cls._reap(stream))
+
+    @classmethod
+    async def _reap(cls, stream: ResumableStream):
+        try:
+            await asyncio.sleep(stream.resume_timeout)
+        except asyncio.CancelledError:
+            return
+        cls._reapers.pop(stream.stream_id, None)
+        if stream.idle:
+            stream.cancel()
+            cls._streams.pop(stream.stream_id, None)
+            logger.info(f"Dropped stream {stream.stream_id} after {stream.resume_timeout}s without a client")
+
+
+async def stream_text_response(stream: ResumableStream, after: int = 0):
+    try:
+        async for frame in stream.subscribe(after):
+            yield frame
+    finally:
+        StreamRegistry.release(stream)
+
+
+def stream_response(stream_func: Callable[[], AsyncGenerator[Any, None]],
+                    request: Optional[Request] = None,
+                    headers: Optional[dict[str, str]] = None,
+                    resource: Optional[str] = None):
+    """
+    Create a Server-Sent Events StreamingResponse.
+
+    Every event carries an ID; when the request has a `Last-Event-ID` header for a stream
+    that is still known and was opened for the same resource, the stream is resumed from
+    there and `stream_func` is not called.
 
     Args:
         stream_func: The streaming function
+        request: The incoming request, used to resume a dropped stream
         headers: Additional headers to include
+        resource: What is being streamed, when the method and path alone do not tell
+            (e.g. a POST body); defaults to the method and path of the request
     """
     default_headers = {
         "Cache-Control": "no-cache, no-transform",
@@ -56,9 +262,18 @@ def stream_response(stream_func: Callable[[], AsyncGenerator[str, None]], header
 
     if headers:
         default_headers.update(headers)
+    if resource is None:
+        resource = f"{request.method} {request.url.path}" if request else ""
     try:
+        resumed = StreamRegistry.resume(request.headers.get("last-event-id"), resource) \
+            if request else None
+        if resumed is not None:
+            stream, after = resumed
+            logger.info(f"Resuming stream {stream.stream_id} after event {after}")
+        else:
+            stream, after = StreamRegistry.create(stream_func, resource), 0
         return StreamingResponse(
-            stream_text_response(stream_func),
+            stream_text_response(stream, after),
             media_type="text/event-stream",
             headers=default_headers
         )
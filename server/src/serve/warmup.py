@@ -0,0 +1,126 @@
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable
+
+from loguru import logger
+from sqlalchemy import text
+
+from db.config import async_engine
+from llm.http import warm_up as warm_up_llm_connections
+from llm.models import get_model, get_models_available
+from problems import Problem, ProblemService
+from problems.service import FilterForProblem
+from usage import LLMUsage
+
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "30"))
+WARMUP_DB_CONNECTIONS = int(os.getenv("WARMUP_DB_CONNECTIONS", "5"))
+WARMUP_POPULAR_PROBLEMS = int(os.getenv("WARMUP_POPULAR_PROBLEMS", "50"))
+WARMUP_POPULAR_DAYS = float(os.getenv("WARMUP_POPULAR_DAYS", "7"))
+
+
+class Readiness:
+    """
+    Startup progress of the process: how long each startup phase took and whether
+    warm-up has finished, which is what `/ready` reports.
+    """
+    ready: bool = False
+    phases: dict[str, float] = {}
+    failed: list[str] = []
+
+    @classmethod
+    @asynccontextmanager
+    async def phase(cls, name: str):
+        """
+        Times a startup phase and records it if it fails.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            cls.failed.append(name)
+            raise
+        finally:
+            cls.phases[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        return {"ready": cls.ready, "phases_ms": dict(cls.phases), "failed": list(cls.failed)}
+
+
+async def _open_db_connections():
+    async def ping():
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # Held concurrently so the pool ends up with that many open connections
+    await asyncio.gather(*(ping() for _ in range(WARMUP_DB_CONNECTIONS)))
+
+
+async def _open_llm_connections():
+    for model in get_models_available():
+        get_model(model)
+    await warm_up_llm_connections()
+
+
+async def _preload_tags():
+    service = ProblemService()
+    await service.get_all_tags()
+    await service.get_tag_summaries()
+
+
+async def _preload_popular_problems():
+    await ProblemService().get_problems_by_filter(FilterForProblem())
+    since = time.time() - WARMUP_POPULAR_DAYS * 86400
+    public_ids = await LLMUsage.popular_problems(since, WARMUP_POPULAR_PROBLEMS)
+    if public_ids:
+        await Problem.get_details(public_ids)
+
+
+async def _prime_query_plans():
+    # A command-line tool module, so only imported when warming up
+    from utils.check_query_plans import hot_queries
+
+    # Compiles each hot statement once into SQLAlchemy's cache and pulls its pages into SQLite's
+    async with async_engine.connect() as conn:
+        for query in hot_queries().values():
+            await conn.execute(query)
+
+
+WARMUP_STEPS: dict[str, Callable[[], Awaitable[None]]] = {
+    "db_connections": _open_db_connections,
+    "llm_connections": _open_llm_connections,
+    "tags": _preload_tags,
+    "popular_problems": _preload_popular_problems,
+    "query_plans": _prime_query_plans,
+}
+
+
+async def warm_up():
+    """
+    Runs the warm-up steps concurrently, bounded by WARMUP_TIMEOUT, then marks the
+    process ready. Warm-up only makes the first requests faster, so a failing or
+    slow step is logged and does not keep the process from becoming ready.
+    """
+    if WARMUP_ENABLED:
+        async def step(name: str, run: Callable[[], Awaitable[None]]):
+            try:
+                async with Readiness.phase(f"warmup.{name}"):
+                    await run()
+            except Exception as e:
+                logger.warning(f"Warm-up step {name} failed: {e}")
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.gather(*(step(name, run) for name, run in WARMUP_STEPS.items())),
+                                   WARMUP_TIMEOUT)
+        except asyncio.TimeoutError:
+            Readiness.failed.append("warmup.timeout")
+            logger.warning(f"Warm-up did not finish within {WARMUP_TIMEOUT}s")
+        Readiness.phases["warmup"] = round((time.perf_counter() - started) * 1000, 2)
+
+    Readiness.ready = True
+    logger.info(f"Ready: {Readiness.phases}")
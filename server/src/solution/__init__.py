@@ -0,0 +1,3 @@
+from .handler import router as solution_router
+
+__all__ = ["solution_router"]
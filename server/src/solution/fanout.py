@@ -0,0 +1,108 @@
+import os
+import asyncio
+from typing import AsyncGenerator, Optional
+from pydantic import BaseModel, Field
+from llm.hedging import current_deadline, set_deadline
+from problems.schemas import ProblemDetail
+from .solve import SolutionResponse, get_cached_solution, solve
+from .translate import TranslationReport
+
+
+MAX_FANOUT_TARGETS = int(os.getenv("MAX_FANOUT_TARGETS", "8"))
+
+
+class SolutionTarget(BaseModel):
+    """
+    One (language, model) pair of a fan-out request.
+    """
+    prog_lang: str
+    model: str
+
+
+class FanoutConfig(BaseModel):
+    """
+    Configuration for generating solutions in several languages and models at once.
+
+    Attributes:
+        problem_id (str): The public ID of the LeetCode problem.
+        targets (list[SolutionTarget]): The (language, model) pairs to generate; duplicates are ignored.
+        additional_context (Optional[str]): Any additional context to provide for every generation.
+            Stored solutions are not used when it is set.
+        deadline_seconds (Optional[float]): Latency budget for the whole fan-out.
+    """
+    problem_id: str
+    targets: list[SolutionTarget] = Field(min_length=1, max_length=MAX_FANOUT_TARGETS)
+    additional_context: Optional[str] = None
+    deadline_seconds: Optional[float] = Field(default=None, gt=0, le=300)
+
+
+class FanoutResult(BaseModel):
+    """
+    The outcome of one target, streamed as soon as it is known.
+
+    Attributes:
+        prog_lang (str): The requested language.
+        model (str): The requested model.
+        cached (bool): Whether the solution was a stored one.
+        answered_by (str | None): The model that actually produced the solution.
+        solution (SolutionResponse | None): The solution, None if the generation failed.
+        error (str | None): Why the generation failed.
+        translation (TranslationReport | None): The savings when the solution was translated
+            from a stored one in another language.
+    """
+    prog_lang: str
+    model: str
+    cached: bool = False
+    answered_by: Optional[str] = None
+    solution: Optional[SolutionResponse] = None
+    error: Optional[str] = None
+    translation: Optional[TranslationReport] = None
+
+
+async def stream_solutions(problem: ProblemDetail,
+                           config: FanoutConfig) -> AsyncGenerator[dict, None]:
+    """
+    Generates solutions for every target of a fan-out request concurrently.
+
+    Stored solutions are yielded first, then generated ones in the order they complete.
+    All generations share the problem, the deadline and the process-wide LLM slots;
+    a failing target is reported in its own result and does not stop the others.
+
+    Args:
+        problem (ProblemDetail): The problem, loaded once for all targets.
+        config (FanoutConfig): The fan-out request.
+
+    Yields:
+        dict: A serialized FanoutResult per target.
+    """
+    if config.deadline_seconds is not None:
+        set_deadline(config.deadline_seconds)
+    deadline = current_deadline()
+
+    targets = list(dict.fromkeys((target.prog_lang, target.model) for target in config.targets))
+    missing = []
+    for prog_lang, model in targets:
+        cached = None
+        if not config.additional_context:
+            cached = await get_cached_solution(problem.public_id, prog_lang, model)
+        if cached is None:
+            missing.append((prog_lang, model))
+            continue
+        yield FanoutResult(prog_lang=prog_lang, model=model, cached=True,
+                           answered_by=model, solution=cached).model_dump()
+
+    async def run(prog_lang: str, model: str) -> FanoutResult:
+        try:
+            result = await solve(problem, prog_lang, model, config.additional_context, deadline)
+        except Exception as e:
+            return FanoutResult(prog_lang=prog_lang, model=model, error=str(e) or type(e).__name__)
+        return FanoutResult(prog_lang=prog_lang, model=model, answered_by=result.model,
+                            solution=result.solution, translation=result.translation)
+
+    tasks = [asyncio.create_task(run(prog_lang, model)) for prog_lang, model in missing]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield (await next_done).model_dump()
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException, Request, status
+from jobs import job_queue
+from problems import Problem
+from serve.stream import stream_response
+from usage import UsageLedger, current_client
+from .solve import SolutionConfig
+from .fanout import FanoutConfig, stream_solutions
+from .jobs import SOLUTION_JOB
+
+
+router = APIRouter(prefix="/leetcode", tags=["solution"])
+
+
+@router.post("/solution/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_solution_job(config: SolutionConfig):
+    # Model budgets are checked per call, where the hedge model can still step in
+    client = current_client()
+    UsageLedger.check_client(client)
+    job_id = await job_queue.submit(SOLUTION_JOB, {**config.model_dump(), "client": client})
+    return {"job_id": job_id, "events": f"/jobs/{job_id}/events"}
+
+
+@router.post("/solution/fanout")
+async def fanout_solutions(config: FanoutConfig, request: Request):
+    UsageLedger.check_client(current_client())
+    problem = await Problem.get_detail(config.problem_id)
+    if problem is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Problem with id {config.problem_id} not found")
+    return stream_response(lambda: stream_solutions(problem, config), request,
+                           resource=f"fanout:{config.model_dump_json()}")
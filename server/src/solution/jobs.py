@@ -0,0 +1,21 @@
+from jobs import job_queue
+from usage import set_client
+from .solve import SolutionConfig, generate_solution
+
+
+SOLUTION_JOB = "solution"
+
+
+@job_queue.handler(SOLUTION_JOB)
+async def run_solution_job(payload: dict, report):
+    """
+    Runs `generate_solution` as a background job.
+    """
+    config = SolutionConfig.model_validate(payload)
+    set_client(payload.get("client", "internal"))
+    await report({"stage": "generating", "model": config.model, "language": config.prog_lang})
+    result = await generate_solution(config)
+    solution = result.solution.model_dump()
+    if result.translation is not None:
+        solution["translation"] = result.translation.model_dump()
+    return solution
@@ -1,9 +1,17 @@
+import time
+import asyncio
+from dataclasses import dataclass
 from typing import Optional
-from llm.models import get_model
+from loguru import logger
+from llm.models import get_model, llm_slots
+from llm.hedging import Deadline, current_deadline, hedged_call, set_deadline
 from langchain_core.prompts import PromptTemplate
-from problems import Problem
+from problems import Problem, ProblemCodeGenerated
+from problems.schemas import ProblemDetail
+from usage import UsageLedger, current_client
 from langchain_core.messages import AIMessage
-from pydantic import ValidationError, BaseModel
+from pydantic import ValidationError, BaseModel, Field
+from .translate import TRANSLATE_PROMPT, TokenUsage, TranslationReport, TranslationStats, parse_code
 
 
 class SolutionConfig(BaseModel):
@@ -15,11 +23,14 @@ class SolutionConfig(BaseModel):
         model (str): The model to be used for generating the solution.
         problem_id (str | int): The unique identifier for the LeetCode problem.
         additional_context (Optional[str]): Any additional context to provide for the solution generation.
+        deadline_seconds (Optional[float]): Latency budget for the whole generation; the
+            LLM_DEADLINE_SECONDS default applies when omitted.
     """
     prog_lang: str
     model: str
     problem_id: str | int
     additional_context: Optional[str] = None
+    deadline_seconds: Optional[float] = Field(default=None, gt=0, le=300)
 
 
 class SolutionResponse(BaseModel):
@@ -36,26 +47,7 @@ class SolutionResponse(BaseModel):
     space_complexity: str
 
 
-async def generate_code_solution(config: SolutionConfig):
-    """
-    Generates a code solution for a given LeetCode problem.
-
-    Args:
-        config (SolutionConfig): The configuration containing details about the programming language,
-                                 model, problem ID, and any additional context.
-
-    Returns:
-        SolutionResponse: A response object containing the generated code, time complexity, and space complexity.
-
-    Raises:
-        ValueError: If the problem with the specified ID is not found or if the response cannot be parsed.
-    """
-    problem = await Problem.get_by_public_id(config.problem_id)
-
-    if problem is None:
-        raise ValueError(f"Problem with id {config.problem_id} not found")
-
-    prompt = PromptTemplate.from_template("""You are an expert {prog_lang} programmer helping with coding interviews. 
+SOLUTION_PROMPT = PromptTemplate.from_template("""You are an expert {prog_lang} programmer helping with coding interviews. 
 Given the following LeetCode problem, provide a solution that follows these requirements:
 
 Problem Title: {title}
@@ -86,18 +78,14 @@ Return your response in this exact format:
     "space_complexity": "O(?)"
 }}""")
 
-    model = get_model(config.model)
-
-    chain = prompt | model
 
-    result = await chain.ainvoke({
-        "prog_lang": config.prog_lang,
-        "title": problem.name,
-        "description": problem.description,
-        "tags": problem.tags,
-        "context": config.additional_context or ""
-    })
+def parse_solution(result) -> SolutionResponse:
+    """
+    Parses a raw model answer into a SolutionResponse.
 
+    Raises:
+        ValueError: If the answer is not valid solution JSON.
+    """
     if isinstance(result, AIMessage):
         result = result.content
 
@@ -112,11 +100,179 @@ Return your response in this exact format:
             cleaned_result = cleaned_result[:-3]  # Remove trailing ```
 
         # Parse the cleaned JSON
-        solution = SolutionResponse.model_validate_json(cleaned_result.strip())
-        return solution
+        return SolutionResponse.model_validate_json(cleaned_result.strip())
 
     except ValidationError as e:
         raise ValueError(
             f"Failed to parse LLM response into expected format: {str(e)}")
     except Exception as e:
         raise ValueError(f"Error generating solution: {str(e)}")
+
+
+@dataclass(frozen=True)
+class GeneratedSolution:
+    """
+    A solution and how it was obtained.
+
+    Attributes:
+        solution (SolutionResponse): The solution.
+        model (str): The model that produced it.
+        translation (TranslationReport | None): Set when the solution was translated from
+            a stored one in another language instead of solved.
+    """
+    solution: SolutionResponse
+    model: str
+    translation: Optional[TranslationReport] = None
+
+
+async def solve(problem: ProblemDetail, prog_lang: str, model: str,
+                additional_context: Optional[str] = None,
+                deadline: Optional[Deadline] = None) -> GeneratedSolution:
+    """
+    Generates a solution for an already loaded problem and stores it for reuse.
+
+    When a solution in another language is stored, it is translated with a short
+    prompt and its complexities are reused, instead of solving from the description.
+
+    Args:
+        problem (ProblemDetail): The problem to solve.
+        prog_lang (str): The programming language for the solution.
+        model (str): The model asked first.
+        additional_context (Optional[str]): Extra instructions for the model. Solutions
+            generated with extra instructions are neither translated nor stored, since
+            they answer a different prompt.
+        deadline (Optional[Deadline]): The latency budget; defaults to the current one.
+
+    Returns:
+        GeneratedSolution: The solution and the model that produced it.
+    """
+    source = None
+    if not additional_context:
+        source = await ProblemCodeGenerated.get_sibling(problem.public_id, prog_lang)
+
+    if source is not None:
+        prompt = TRANSLATE_PROMPT
+        inputs = {"source_lang": source["language"], "prog_lang": prog_lang, "code": source["solution"]}
+
+        def parse(message) -> SolutionResponse:
+            return SolutionResponse(code=parse_code(message),
+                                    time_complexity=source["time_complexity"] or "",
+                                    space_complexity=source["space_complexity"] or "")
+    else:
+        prompt, parse = SOLUTION_PROMPT, parse_solution
+        inputs = {
+            "prog_lang": prog_lang,
+            "title": problem.name,
+            "description": problem.description,
+            "tags": ", ".join(tag.name for tag in problem.tags),
+            "context": additional_context or ""
+        }
+
+    client = current_client()
+    purpose = "translate" if source is not None else "solve"
+
+    async def invoke(model: str):
+        UsageLedger.check(client, model)
+        chain = prompt | get_model(model)
+        async with llm_slots:
+            started = time.perf_counter()
+            message, status = None, "error"
+            try:
+                message = await chain.ainvoke(inputs)
+                status = "ok"
+            except asyncio.CancelledError:
+                # The hedge winner or the timeout cut this call off; it was still dispatched
+                status = "cancelled"
+                raise
+            finally:
+                usage = TokenUsage.of(message)
+                UsageLedger.record(client, model, purpose, problem.public_id, usage.prompt_tokens,
+                                   usage.completion_tokens, usage.cached_tokens,
+                                   round((time.perf_counter() - started) * 1000), status)
+        return message
+
+    async def attempt(model: str, timeout: float) -> tuple[SolutionResponse, TokenUsage]:
+        # The timeout covers waiting for a free slot as well as the call itself
+        message = await asyncio.wait_for(invoke(model), timeout)
+        return parse(message), TokenUsage.of(message)
+
+    result = await hedged_call(attempt, primary=model, deadline=deadline)
+    solution, usage = result.value
+    latency_ms = round(result.latency * 1000)
+    if result.path != "primary":
+        logger.info(f"Solution for {problem.public_id} came from {result.model} ({result.path})")
+
+    report = None
+    if source is not None:
+        report = TranslationReport.compare(source, usage, latency_ms)
+        TranslationStats.record(report)
+        logger.info(f"Translated {problem.public_id} from {report.source_lang} to {prog_lang}: "
+                    f"{report.tokens_saved} tokens and {report.latency_saved_ms}ms saved")
+
+    if not additional_context:
+        await ProblemCodeGenerated.store(problem.public_id, prog_lang, result.model,
+                                         solution.code, solution.time_complexity,
+                                         solution.space_complexity,
+                                         source_language=source["language"] if source else None,
+                                         prompt_tokens=usage.prompt_tokens,
+                                         completion_tokens=usage.completion_tokens,
+                                         latency_ms=latency_ms)
+    return GeneratedSolution(solution, result.model, report)
+
+
+async def get_cached_solution(problem_id: str, prog_lang: str,
+                              model: Optional[str] = None) -> Optional[SolutionResponse]:
+    """
+    Returns the latest stored solution of a problem in a language, if any.
+    """
+    row = await ProblemCodeGenerated.get_cached(problem_id, prog_lang, model)
+    if row is None:
+        return None
+    return SolutionResponse(code=row["solution"],
+                            time_complexity=row["time_complexity"] or "",
+                            space_complexity=row["space_complexity"] or "")
+
+
+async def generate_solution(config: SolutionConfig) -> GeneratedSolution:
+    """
+    Generates a code solution for a given LeetCode problem, with how it was obtained.
+
+    Args:
+        config (SolutionConfig): The configuration containing details about the programming language,
+                                 model, problem ID, and any additional context.
+
+    Returns:
+        GeneratedSolution: The solution, the model that produced it and, for translations, the savings.
+
+    Raises:
+        ValueError: If the problem with the specified ID is not found or if the response cannot be parsed.
+        DeadlineExceeded: If no model answered within the latency budget.
+    """
+    if config.deadline_seconds is not None:
+        set_deadline(config.deadline_seconds)
+    deadline = current_deadline()
+
+    problem = await Problem.get_detail(config.problem_id)
+
+    if problem is None:
+        raise ValueError(f"Problem with id {config.problem_id} not found")
+
+    return await solve(problem, config.prog_lang, config.model, config.additional_context, deadline)
+
+
+async def generate_code_solution(config: SolutionConfig):
+    """
+    Generates a code solution for a given LeetCode problem.
+
+    Args:
+        config (SolutionConfig): The configuration containing details about the programming language,
+                                 model, problem ID, and any additional context.
+
+    Returns:
+        SolutionResponse: A response object containing the generated code, time complexity, and space complexity.
+
+    Raises:
+        ValueError: If the problem with the specified ID is not found or if the response cannot be parsed.
+        DeadlineExceeded: If no model answered within the latency budget.
+    """
+    return (await generate_solution(config)).solution
@@ -0,0 +1,113 @@
+from typing import Optional
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import PromptTemplate
+from pydantic import BaseModel
+
+
+# Much shorter than the solve prompt: no description, and only code comes back,
+# since the complexities of a faithful translation are those of its source.
+TRANSLATE_PROMPT = PromptTemplate.from_template("""Translate this {source_lang} solution to {prog_lang}.
+Keep the same algorithm, write idiomatic {prog_lang}, include the necessary imports,
+and reply with only the code.
+
+{code}""")
+
+
+class TokenUsage(BaseModel):
+    """
+    Tokens spent on one model call.
+    """
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+
+    @classmethod
+    def of(cls, message) -> "TokenUsage":
+        usage = getattr(message, "usage_metadata", None) or {}
+        details = usage.get("input_token_details") or {}
+        return cls(prompt_tokens=usage.get("input_tokens", 0),
+                   completion_tokens=usage.get("output_tokens", 0),
+                   cached_tokens=details.get("cache_read") or 0)
+
+    @property
+    def total(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class TranslationReport(BaseModel):
+    """
+    What a translation cost compared with the solve it was translated from.
+
+    Attributes:
+        source_lang (str): The language of the solution that was translated.
+        prompt_tokens (int): Prompt tokens spent on the translation.
+        completion_tokens (int): Completion tokens spent on the translation.
+        latency_ms (int): How long the translation took.
+        tokens_saved (int | None): Tokens the source solve spent minus those spent here,
+            None when the source solve did not record its usage.
+        latency_saved_ms (int | None): The same for latency.
+    """
+    source_lang: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency_ms: int
+    tokens_saved: Optional[int] = None
+    latency_saved_ms: Optional[int] = None
+
+    @classmethod
+    def compare(cls, source: dict, usage: TokenUsage, latency_ms: int) -> "TranslationReport":
+        """
+        Builds the report from the stored source solution and the translation call.
+        """
+        report = cls(source_lang=source["language"], prompt_tokens=usage.prompt_tokens,
+                     completion_tokens=usage.completion_tokens, latency_ms=latency_ms)
+        if source["prompt_tokens"] is not None and source["completion_tokens"] is not None:
+            report.tokens_saved = source["prompt_tokens"] + source["completion_tokens"] - usage.total
+        if source["latency_ms"] is not None:
+            report.latency_saved_ms = source["latency_ms"] - latency_ms
+        return report
+
+
+class TranslationStats:
+    """
+    Running totals of translation savings, to confirm they beat fresh solves.
+    """
+    translations: int = 0
+    tokens_saved: int = 0
+    latency_saved_ms: int = 0
+
+    @classmethod
+    def record(cls, report: TranslationReport):
+        cls.translations += 1
+        cls.tokens_saved += report.tokens_saved or 0
+        cls.latency_saved_ms += report.latency_saved_ms or 0
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        return {
+            "translations": cls.translations,
+            "tokens_saved": cls.tokens_saved,
+            "latency_saved_ms": cls.latency_saved_ms,
+        }
+
+
+def parse_code(result) -> str:
+    """
+    Extracts the code from a translation answer.
+
+    Raises:
+        ValueError: If the answer contains no code.
+    """
+    if isinstance(result, AIMessage):
+        result = result.content
+
+    code = result.strip()
+    if code.startswith('```'):
+        # Drop the opening fence along with its language tag
+        code = code.split('\n', 1)[1] if '\n' in code else ''
+    if code.endswith('```'):
+        code = code[:-3]
+    code = code.strip()
+    if not code:
+        raise ValueError("Translation answer contained no code")
+    return code
@@ -0,0 +1,10 @@
+from .models import LLMUsage
+from .ledger import BudgetExceeded, UsageLedger, current_client, set_client
+
+__all__ = [
+    "LLMUsage",
+    "BudgetExceeded",
+    "UsageLedger",
+    "current_client",
+    "set_client"
+]
@@ -0,0 +1,216 @@
+import os
+import time
+import asyncio
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import insert
+
+from db import db_session
+from .models import CALL_STATUS, LLMUsage
+
+
+USAGE_FLUSH_INTERVAL = float(os.getenv("USAGE_FLUSH_INTERVAL", "2"))
+USAGE_FLUSH_BATCH = int(os.getenv("USAGE_FLUSH_BATCH", "200"))
+USAGE_MAX_PENDING = int(os.getenv("USAGE_MAX_PENDING", "10000"))
+
+
+def _parse_budgets(value: str) -> dict[str, int]:
+    budgets = {}
+    for item in value.split(","):
+        model, _, budget = item.partition("=")
+        if model.strip() and budget.strip():
+            budgets[model.strip()] = int(budget)
+    return budgets
+
+
+# Daily token budgets per model, e.g. "gpt-4o=2000000,gpt-4o-mini=10000000"; unlisted models are unlimited.
+MODEL_DAILY_TOKEN_BUDGETS = _parse_budgets(os.getenv("MODEL_DAILY_TOKEN_BUDGETS", ""))
+# Daily token budget of every single client, 0 for unlimited.
+CLIENT_DAILY_TOKEN_BUDGET = int(os.getenv("CLIENT_DAILY_TOKEN_BUDGET", "0"))
+
+_current_client: ContextVar[str] = ContextVar("client", default="internal")
+
+
+def set_client(client: str):
+    """
+    Attributes the LLM calls made from the current context to a client.
+    """
+    _current_client.set(client)
+
+
+def current_client() -> str:
+    return _current_client.get()
+
+
+class BudgetExceeded(Exception):
+    """
+    Raised before dispatching an LLM call that a daily budget no longer covers.
+
+    Attributes:
+        retry_after (float): Seconds until the budgets reset at midnight UTC.
+    """
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _day_start(now: datetime) -> datetime:
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class UsageLedger:
+    """
+    Records every LLM call and enforces the daily token budgets.
+
+    Calls are appended to an in-memory batch that a background task writes to the
+    `llm_usage` table every USAGE_FLUSH_INTERVAL seconds, or as soon as USAGE_FLUSH_BATCH
+    calls are pending, so the request path never waits on the database. Today's totals
+    per model and per client are kept in memory, loaded from the ledger at start, and
+    budgets are checked against them before a call is dispatched.
+    """
+    _pending: list[dict] = []
+    _model_totals: dict[str, int] = {}
+    _client_totals: dict[str, int] = {}
+    _day: Optional[datetime] = None
+    _flush_requested = asyncio.Event()
+    _flusher: Optional[asyncio.Task] = None
+    dropped: int = 0
+
+    @classmethod
+    def _roll_day(cls) -> datetime:
+        today = _day_start(datetime.now(timezone.utc))
+        if cls._day != today:
+            cls._day = today
+            cls._model_totals.clear()
+            cls._client_totals.clear()
+        return today
+
+    @classmethod
+    def _retry_after(cls) -> float:
+        return (cls._roll_day() + timedelta(days=1) - datetime.now(timezone.utc)).total_seconds()
+
+    @classmethod
+    def check_client(cls, client: str):
+        """
+        Verifies that the client's budget for today is not spent.
+
+        Raises:
+            BudgetExceeded: If it is.
+        """
+        cls._roll_day()
+        if CLIENT_DAILY_TOKEN_BUDGET and cls._client_totals.get(client, 0) >= CLIENT_DAILY_TOKEN_BUDGET:
+            raise BudgetExceeded("Daily token budget of this client is spent", cls._retry_after())
+
+    @classmethod
+    def check(cls, client: str, model: str):
+        """
+        Verifies that today's budgets still cover a call to a model for a client.
+
+        Raises:
+            BudgetExceeded: If the model's or the client's budget is spent.
+        """
+        cls.check_client(client)
+        budget = MODEL_DAILY_TOKEN_BUDGETS.get(model)
+        if budget is not None and cls._model_totals.get(model, 0) >= budget:
+            raise BudgetExceeded(f"Daily token budget of {model} is spent", cls._retry_after())
+
+    @classmethod
+    def record(cls, client: str, model: str, purpose: str, problem_id: Optional[str],
+               prompt_tokens: int, completion_tokens: int, cached_tokens: int, latency_ms: int,
+               status: CALL_STATUS = "ok"):
+        """
+        Counts a call against the budgets and queues it for the ledger. Calls that were
+        cancelled or failed are recorded too, so the ledger shows what was dispatched.
+        """
+        cls._roll_day()
+        tokens = prompt_tokens + completion_tokens
+        cls._model_totals[model] = cls._model_totals.get(model, 0) + tokens
+        cls._client_totals[client] = cls._client_totals.get(client, 0) + tokens
+
+        if len(cls._pending) >= USAGE_MAX_PENDING:
+            # The database is not keeping up; budgets still count the call
+            cls.dropped += 1
+            return
+        cls._pending.append({
+            "created_at": time.time(),
+            "client": client,
+            "model": model,
+            "purpose": purpose,
+            "problem_id": problem_id,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": cached_tokens,
+            "latency_ms": latency_ms,
+            "status": status,
+        })
+        if len(cls._pending) >= USAGE_FLUSH_BATCH:
+            cls._flush_requested.set()
+
+    @classmethod
+    async def flush(cls):
+        """
+        Writes the pending calls to the ledger in one statement.
+        """
+        if not cls._pending:
+            return
+        batch, cls._pending = cls._pending, []
+        try:
+            async with db_session() as session:
+                await session.execute(insert(LLMUsage), batch)
+        except Exception as e:
+            logger.error(f"Could not write {len(batch)} usage records: {e}")
+            cls._pending = batch + cls._pending
+
+    @classmethod
+    async def _run(cls):
+        while True:
+            try:
+                await asyncio.wait_for(cls._flush_requested.wait(), USAGE_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            cls._flush_requested.clear()
+            await cls.flush()
+
+    @classmethod
+    async def start(cls):
+        """
+        Loads today's totals from the ledger and starts the background writer.
+        """
+        today = cls._roll_day()
+        for client, model, tokens in await LLMUsage.totals_since(today.timestamp()):
+            cls._model_totals[model] = cls._model_totals.get(model, 0) + (tokens or 0)
+            cls._client_totals[client] = cls._client_totals.get(client, 0) + (tokens or 0)
+        cls._flush_requested = asyncio.Event()
+        cls._flusher = asyncio.create_task(cls._run())
+
+    @classmethod
+    async def stop(cls):
+        """
+        Stops the background writer and writes what is still pending.
+        """
+        if cls._flusher is not None:
+            cls._flusher.cancel()
+            await asyncio.gather(cls._flusher, return_exceptions=True)
+            cls._flusher = None
+        await cls.flush()
+
+    @classmethod
+    def budgets(cls) -> dict:
+        """
+        Today's spending against the budgets.
+        """
+        cls._roll_day()
+        return {
+            "day": cls._day.date().isoformat(),
+            "models": {model: {"spent": cls._model_totals.get(model, 0),
+                               "budget": MODEL_DAILY_TOKEN_BUDGETS.get(model)}
+                       for model in sorted(set(cls._model_totals) | set(MODEL_DAILY_TOKEN_BUDGETS))},
+            "client_budget": CLIENT_DAILY_TOKEN_BUDGET or None,
+            "top_clients": sorted(cls._client_totals.items(), key=lambda item: item[1], reverse=True)[:20],
+            "pending_records": len(cls._pending),
+            "dropped_records": cls.dropped,
+        }
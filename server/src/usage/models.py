@@ -0,0 +1,102 @@
+from typing import Literal, Optional
+from sqlalchemy import Float, Index, Integer, String, func, select
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.ext.asyncio import AsyncSession
+from db import Base, with_session
+
+
+GROUP_BY = Literal["model", "client", "problem_id", "purpose", "status"]
+# "cancelled" covers hedge losers and calls cut off by a timeout
+CALL_STATUS = Literal["ok", "cancelled", "error"]
+
+
+class LLMUsage(Base):
+    """
+    One LLM call in the usage ledger.
+
+    Written in batches by UsageLedger; `created_at` is a POSIX timestamp so daily
+    windows compare plain numbers.
+
+    Attributes:
+        created_at (float): When the call finished.
+        client (str): The client the call was made for, see `serve.ratelimit.client_key`.
+        model (str): The model that was called.
+        purpose (str): What the call was for, e.g. "solve" or "translate".
+        problem_id (str | None): The public ID of the problem the call was about.
+        prompt_tokens (int): Prompt tokens billed.
+        completion_tokens (int): Completion tokens billed.
+        cached_tokens (int): Prompt tokens served from the provider's prompt cache.
+        latency_ms (int): How long the call took.
+        status (str): How the call ended, see CALL_STATUS. Token counts of calls that
+            did not finish are unknown and recorded as 0.
+    """
+    __tablename__ = 'llm_usage'
+    __table_args__ = (
+        Index('ix_llm_usage_created_at', 'created_at'),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    created_at: Mapped[float] = mapped_column(Float, nullable=False)
+    client: Mapped[str] = mapped_column(String, nullable=False)
+    model: Mapped[str] = mapped_column(String, nullable=False)
+    purpose: Mapped[str] = mapped_column(String, nullable=False)
+    problem_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    prompt_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completion_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    cached_tokens: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    latency_ms: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    status: Mapped[str] = mapped_column(String, nullable=False, default="ok", server_default="ok")
+
+    @classmethod
+    @with_session()
+    async def totals_since(cls, session: AsyncSession, since: float) -> list[tuple[str, str, int]]:
+        """
+        Returns the tokens spent per (client, model) since a point in time.
+        """
+        query = (select(cls.client, cls.model,
+                        func.sum(cls.prompt_tokens + cls.completion_tokens))
+                 .where(cls.created_at >= since)
+                 .group_by(cls.client, cls.model))
+        return [tuple(row) for row in (await session.execute(query)).all()]
+
+    @classmethod
+    @with_session()
+    async def summarize(cls, session: AsyncSession, since: float,
+                        group_by: GROUP_BY = "model") -> list[dict]:
+        """
+        Aggregates the ledger since a point in time.
+
+        Args:
+            session (AsyncSession): The database session to use for the query.
+            since (float): The POSIX timestamp to aggregate from.
+            group_by (str): The column to group by.
+
+        Returns:
+            list[dict]: Per group the call count, token sums and latency, most tokens first.
+        """
+        key = getattr(cls, group_by)
+        total = func.sum(cls.prompt_tokens + cls.completion_tokens)
+        query = (select(key.label("key"),
+                        func.count().label("calls"),
+                        func.sum(cls.prompt_tokens).label("prompt_tokens"),
+                        func.sum(cls.completion_tokens).label("completion_tokens"),
+                        func.sum(cls.cached_tokens).label("cached_tokens"),
+                        total.label("total_tokens"),
+                        func.avg(cls.latency_ms).label("avg_latency_ms"))
+                 .where(cls.created_at >= since)
+                 .group_by(key)
+                 .order_by(total.desc()))
+        return [dict(row) for row in (await session.execute(query)).mappings().all()]
+
+    @classmethod
+    @with_session()
+    async def popular_problems(cls, session: AsyncSession, since: float, limit: int) -> list[str]:
+        """
+        Returns the public IDs of the problems with the most LLM calls since a point in time.
+        """
+        query = (select(cls.problem_id)
+                 .where(cls.created_at >= since, cls.problem_id.is_not(None))
+                 .group_by(cls.problem_id)
+                 .order_by(func.count().desc())
+                 .limit(limit))
+        return list((await session.execute(query)).scalars().all())
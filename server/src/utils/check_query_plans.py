@@ -0,0 +1,119 @@
+import sys
+import asyncio
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.sql import Select
+
+from db.config import async_engine, init_db
+from problems.models import Problem, ProblemCodeGenerated, ProblemSimilarity, ProblemTags, Tag
+
+
+# Steps a query is expected to take, each with the reason no index can serve it.
+EXPECTED_STEPS = {
+    # LIKE '%name%' matches anywhere in the name, which no b-tree index can serve
+    "problems by name search": {"SCAN problems"},
+    # Walks the table in ID order and stops at the page limit; an index would
+    # return the matches out of ID order and need a sort
+    "unfiltered page": {"SCAN problems"},
+    "page by several difficulties": {"SCAN problems"},
+}
+
+
+def filtered_page(tags: list[str] = None, difficulty: list[str] = None,
+                  acceptance_sort: str = "none") -> Select:
+    """
+    Builds the second page of a filtered list, the way `get_problems_by_filter` does.
+    """
+    return Problem.filter_query(tags, difficulty, acceptance_sort).limit(40).offset(40)
+
+
+def hot_queries() -> dict[str, Select]:
+    """
+    The statements behind the list, filter, search, detail and similar-problem
+    endpoints, built by the same `problems/models.py` helpers that run them.
+    """
+    tags, difficulties = ["Array", "Graph"], ["Easy", "Medium"]
+    return {
+        "unfiltered page": filtered_page(),
+        "unfiltered page sorted by acceptance": filtered_page(acceptance_sort="desc"),
+        "page by tag": filtered_page(tags),
+        "page by tag sorted by acceptance": filtered_page(tags, acceptance_sort="desc"),
+        "page by tag sorted by acceptance ascending": filtered_page(tags, acceptance_sort="asc"),
+        "page by tag and difficulty sorted by acceptance": filtered_page(tags, ["Easy"], "desc"),
+        "page by tag and several difficulties sorted by acceptance": filtered_page(tags, difficulties, "desc"),
+        "page by difficulty sorted by acceptance": filtered_page(difficulty=["Easy"], acceptance_sort="desc"),
+        "page by several difficulties": filtered_page(difficulty=difficulties),
+        "page by several difficulties sorted by acceptance": filtered_page(difficulty=difficulties,
+                                                                           acceptance_sort="desc"),
+        "count by tag": Problem.count_query(tags),
+        "count by several difficulties": Problem.count_query(difficulty=difficulties),
+        "count by tag and difficulty": Problem.count_query(tags, ["Easy"]),
+        "problems by name search": Problem.search_query("sum"),
+        "tags of listed problems": (select(ProblemTags.problem_id, Tag.public_id, Tag.name)
+                                    .join(Tag, Tag.id == ProblemTags.tag_id)
+                                    .where(ProblemTags.problem_id.in_([1, 2, 3]))),
+        "tag by name": select(Tag.id).where(Tag.name == "Array"),
+        "problem by public id": select(Problem.id).where(Problem.public_id == "pro_x"),
+        "problem by name": select(Problem.id).where(Problem.name == "Two Sum"),
+        "problem by slug": select(Problem.id).where(Problem.slug == "two-sum"),
+        "problem by number": select(Problem.id).where(Problem.number == 1),
+        "similar problems": (select(ProblemSimilarity.similar_problem_id, ProblemSimilarity.score)
+                             .join(Problem, Problem.id == ProblemSimilarity.problem_id)
+                             .where(Problem.public_id == "pro_x")
+                             .order_by(ProblemSimilarity.rank)),
+        "cached solution": (select(ProblemCodeGenerated.solution)
+                            .join(Problem, Problem.id == ProblemCodeGenerated.problem_id)
+                            .where(Problem.public_id == "pro_x",
+                                   ProblemCodeGenerated.language == "Python",
+                                   ProblemCodeGenerated.model == "gpt-4o")
+                            .order_by(ProblemCodeGenerated.id.desc())
+                            .limit(1)),
+    }
+
+
+def full_scans(plan: list[str]) -> list[str]:
+    """
+    Returns the plan steps that read a whole table instead of going through an index.
+    """
+    return [step for step in plan if step.startswith("SCAN ") and " INDEX" not in step]
+
+
+def temp_sorts(plan: list[str]) -> list[str]:
+    """
+    Returns the plan steps that sort rows in a temporary b-tree because no index
+    yields them in the requested order.
+    """
+    return [step for step in plan if step.startswith("USE TEMP B-TREE")]
+
+
+async def check_query_plans() -> dict[str, list[str]]:
+    """
+    Runs EXPLAIN QUERY PLAN for every hot query against the migrated schema.
+
+    Returns:
+        dict[str, list[str]]: The full-scan and temporary-sort steps per query; empty
+            when every query is served by an index.
+    """
+    await init_db()
+    failures = {}
+    async with async_engine.connect() as conn:
+        for name, query in hot_queries().items():
+            statement = str(query.compile(dialect=sqlite.dialect(),
+                                          compile_kwargs={"literal_binds": True}))
+            rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}")).all()
+            plan = [row[-1] for row in rows]
+            expected = EXPECTED_STEPS.get(name, set())
+            steps = [step for step in full_scans(plan) + temp_sorts(plan) if step not in expected]
+            if steps:
+                failures[name] = steps
+            logger.info(f"{name}: {'; '.join(plan)}")
+    return failures
+
+
+# For command-line execution, e.g. from CI
+if __name__ == "__main__":
+    failures = asyncio.run(check_query_plans())
+    for name, steps in failures.items():
+        logger.error(f"{name} is not served by an index: {'; '.join(steps)}")
+    sys.exit(1 if failures else 0)
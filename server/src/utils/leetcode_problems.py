@@ -4,7 +4,11 @@ from loguru import logger
 from pathlib import Path
 import asyncio
 from db.config import db_session, init_db
-from problems.models import Problem, Tag
+from problems.models import DescriptionDictionary, Problem, Tag, TagSummary
+from problems.descriptions import render_descriptions
+from problems.similarity import refresh_similar_problems
+from problems.slugs import normalize_slug, parse_problem_number
+from catalog import build_catalog_snapshot
 from sqlalchemy import select
 
 
@@ -29,6 +33,20 @@ def get_all_problems():
     print(len(problems))
 
 
+def _unique(value, taken: set, kind: str, problem_name: str):
+    """
+    Returns `value` and marks it as taken, or None if another problem already has it,
+    as migration 0008 does: the unique index would otherwise fail the rest of the ingest.
+    """
+    if value is None:
+        return None
+    if value in taken:
+        logger.warning(f"Problem {problem_name} has the {kind} {value!r} of another problem; not storing it")
+        return None
+    taken.add(value)
+    return value
+
+
 async def add_problems_to_db():
     """
     Reads problems from the JSON file and adds them to the database in one operation.
@@ -107,8 +125,30 @@ async def add_problems_to_db():
             logger.info("Saving tags to database...")
             await session.flush()
 
+            # Reuse the current description dictionary, training one on first ingest
+            dictionary_version = await DescriptionDictionary.get_or_train(
+                session, [d.get("description", "") for d in problem_details.values()])
+
+            # Render every description that is new or was ingested before rendering existed
+            rendered_names = set((await session.execute(
+                select(Problem.name).where(Problem.rendered_zstd.is_not(None))
+            )).scalars())
+            to_render = [name for name in problem_details if name not in rendered_names]
+            logger.info(f"Rendering {len(to_render)} descriptions...")
+            rendered = dict(zip(to_render, await render_descriptions(
+                [problem_details[name].get("description", "") for name in to_render])))
+
+            # Slugs and numbers are unique; two entries may still normalize to the same one
+            taken_slugs = set((await session.execute(
+                select(Problem.slug).where(Problem.slug.is_not(None)))).scalars())
+            taken_numbers = set((await session.execute(
+                select(Problem.number).where(Problem.number.is_not(None)))).scalars())
+
             # Create problem objects with associated tags
             problems_added = 0
+            descriptions_backfilled = 0
+            slugs_backfilled = 0
+            added_problems = []
             logger.info("Adding problems to database...")
             for p_data in problem_data:
                 try:
@@ -120,12 +160,27 @@ async def add_problems_to_db():
                             f"No details found for problem: {problem_name}")
                         continue
 
+                    slug = normalize_slug(p_data["link"]) or normalize_slug(problem_name)
+                    number = parse_problem_number(p_data["problem"])
+
                     # Check if problem already exists
                     result = await session.execute(
                         select(Problem).filter(Problem.name == problem_name)
                     )
-                    if result.scalar_one_or_none():
+                    existing = result.scalar_one_or_none()
+                    if existing:
                         logger.info(f"Problem already exists: {problem_name}")
+                        # Rows ingested before slugs and numbers were stored get them now
+                        if existing.slug is None or existing.number is None:
+                            if existing.slug is None:
+                                existing.slug = _unique(slug, taken_slugs, "slug", problem_name)
+                            if existing.number is None:
+                                existing.number = _unique(number, taken_numbers, "number", problem_name)
+                            slugs_backfilled += 1
+                        if rendered.get(problem_name) is not None:
+                            await DescriptionDictionary.ensure_registered({existing.description_dict_version})
+                            existing.store_rendered(rendered[problem_name])
+                            descriptions_backfilled += 1
                         continue  # Skip if problem already exists
 
                     details = problem_details[problem_name]
@@ -145,13 +200,19 @@ async def add_problems_to_db():
                     # Create new problem with associated tags
                     problem = Problem(
                         name=problem_name,
+                        slug=_unique(slug, taken_slugs, "slug", problem_name),
+                        number=_unique(number, taken_numbers, "number", problem_name),
                         difficulty=p_data["difficulty"],
                         acceptance_rate=acceptance_rate,
                         description=details.get("description", ""),
                         link=p_data["link"],
                         tags=problem_tags
                     )
+                    problem.compress_description(dictionary_version)
+                    if rendered.get(problem_name) is not None:
+                        problem.store_rendered(rendered[problem_name])
                     session.add(problem)
+                    added_problems.append(problem)
                     problems_added += 1
 
                     if problems_added % 100 == 0:
@@ -163,9 +224,27 @@ async def add_problems_to_db():
 
             logger.info(
                 f"Successfully added {problems_added} problems to the database")
+            if slugs_backfilled:
+                logger.info(f"Stored slugs and numbers of {slugs_backfilled} existing problems")
+            if descriptions_backfilled:
+                logger.info(f"Stored rendered descriptions of {descriptions_backfilled} existing problems")
+
+            await session.flush()
+            added_ids = {problem.id for problem in added_problems}
 
+            touched_tags = {tag.id for problem in added_problems for tag in problem.tags}
+            if touched_tags:
+                logger.info(f"Refreshing summaries of {len(touched_tags)} tags...")
+                await TagSummary.refresh(session, touched_tags)
             await session.commit()
 
+        if added_ids:
+            logger.info("Updating similar problems...")
+            await refresh_similar_problems(added_ids)
+
+        logger.info("Publishing catalog snapshot...")
+        await build_catalog_snapshot()
+
     except Exception as e:
         logger.error(f"Error in add_problems_to_db: {str(e)}")
         raise
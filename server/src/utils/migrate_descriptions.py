@@ -0,0 +1,62 @@
+import asyncio
+from loguru import logger
+from sqlalchemy import select, text, update
+
+from db.config import async_engine, db_session, init_db
+from problems.models import DescriptionDictionary, Problem
+from problems.compression import DescriptionCodec
+
+
+BATCH_SIZE = 500
+
+
+async def migrate_descriptions():
+    """
+    Compresses every description still stored as plain text.
+
+    A dictionary is trained on the whole existing corpus if none exists yet,
+    rows are rewritten in batches, and the database is vacuumed at the end so
+    the freed pages are actually returned. The columns themselves are added
+    by the schema migrations `init_db` applies.
+    """
+    await init_db()
+
+    async with db_session() as session:
+        rows = (await session.execute(
+            select(Problem.id, Problem.plain_description)
+            .where(Problem.description_zstd.is_(None))
+        )).tuples().all()
+
+        if not rows:
+            logger.info("All descriptions are already compressed")
+            return
+
+        version = await DescriptionDictionary.get_or_train(
+            session, [description for _, description in rows])
+
+        before = after = 0
+        for start in range(0, len(rows), BATCH_SIZE):
+            batch = rows[start:start + BATCH_SIZE]
+            values = []
+            for problem_id, description in batch:
+                blob = DescriptionCodec.compress(description or "", version)
+                before += len((description or "").encode("utf-8"))
+                after += len(blob)
+                values.append({"id": problem_id,
+                               "description_zstd": blob,
+                               "description_dict_version": version,
+                               "plain_description": ""})
+            await session.execute(update(Problem), values)
+            logger.info(f"Compressed {start + len(batch)}/{len(rows)} descriptions")
+
+    logger.info(f"Descriptions: {before} bytes -> {after} bytes "
+                f"({before / max(after, 1):.1f}x, dictionary version {version})")
+
+    async with async_engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM"))
+
+
+# For command-line execution
+if __name__ == "__main__":
+    asyncio.run(migrate_descriptions())
@@ -0,0 +1,78 @@
+import os
+import sys
+import subprocess
+from dataclasses import dataclass
+from pathlib import Path
+
+
+SRC_DIR = Path(__file__).parent.parent
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    """
+    One module import as reported by `python -X importtime`.
+
+    Attributes:
+        module (str): The imported module.
+        self_ms (float): Time spent in the module itself.
+        cumulative_ms (float): Time including the modules it imported first.
+        depth (int): Nesting level; 0 for modules imported directly by the entry point.
+    """
+    module: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+
+def profile_imports(entry: str = "main") -> list[ImportTiming]:
+    """
+    Imports `entry` in a fresh interpreter with `-X importtime` and parses the timings.
+    """
+    env = {"OPENAI_API_KEY": "startup-profile", **os.environ}
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {entry}"],
+                               cwd=SRC_DIR, env=env, capture_output=True, text=True, check=True)
+    timings = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2 - 1
+        timings.append(ImportTiming(name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000, depth))
+    return timings
+
+
+def first_party_packages() -> set[str]:
+    return {path.name for path in SRC_DIR.iterdir()
+            if path.is_dir() and (path / "__init__.py").exists()} | {"main"}
+
+
+def startup_report(entry: str = "main", top: int = 15) -> str:
+    """
+    Summarizes where import time goes: the total, the slowest first-party modules
+    and the slowest third-party packages, both by cumulative time.
+    """
+    timings = profile_imports(entry)
+    ours = first_party_packages()
+    total = next(t.cumulative_ms for t in timings if t.module == entry)
+
+    own = sorted((t for t in timings if t.module.split(".")[0] in ours),
+                 key=lambda t: t.cumulative_ms, reverse=True)
+    # A third-party package counts once, at its outermost import
+    external: dict[str, float] = {}
+    for t in timings:
+        package = t.module.split(".")[0]
+        if package not in ours and not package.startswith("_"):
+            external[package] = max(external.get(package, 0.0), t.cumulative_ms)
+
+    lines = [f"import {entry}: {total:.1f} ms", "", "first-party modules (cumulative / self ms):"]
+    lines += [f"  {t.cumulative_ms:9.1f} {t.self_ms:9.1f}  {t.module}" for t in own[:top]]
+    lines += ["", "third-party packages (cumulative ms):"]
+    lines += [f"  {ms:9.1f}  {package}"
+              for package, ms in sorted(external.items(), key=lambda item: item[1], reverse=True)[:top]]
+    return "\n".join(lines)
+
+
+# For command-line execution: python -m utils.startup_profile [entry module]
+if __name__ == "__main__":
+    print(startup_report(*sys.argv[1:2]))
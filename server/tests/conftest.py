@@ -0,0 +1,53 @@
+import os
+import shutil
+import atexit
+import tempfile
+
+import pytest
+
+# Read when the application modules are imported, so set before any of them is.
+_workdir = tempfile.mkdtemp(prefix="smash-tests-")
+atexit.register(shutil.rmtree, _workdir, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_workdir}/sqlite.db"
+os.environ["CATALOG_DIR"] = os.path.join(_workdir, "catalog_data")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("OPENAI_BASE_URL", "http://127.0.0.1:9/v1")
+
+from catalog import CatalogStore
+from catalog.snapshot import encode_snapshot, write_snapshot
+from db import init_db
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    # Session-scoped so every test shares one event loop, and with it the engine's pool.
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def database(anyio_backend):
+    """
+    Applies every migration to the scratch database once per session.
+    """
+    await init_db()
+
+
+@pytest.fixture
+def publish_catalog(tmp_path, monkeypatch):
+    """
+    Points the CatalogStore at a scratch directory and returns a function that
+    publishes catalog rows there and maps them as the current snapshot.
+    """
+    monkeypatch.setattr(CatalogStore, "directory", tmp_path)
+    monkeypatch.setattr(CatalogStore, "_snapshot", None)
+    monkeypatch.setattr(CatalogStore, "_pointer", None)
+    monkeypatch.setattr(CatalogStore, "_previous", {})
+
+    def publish(problems: list[dict], tags: list[dict], problem_tags: list[tuple[int, int]]):
+        write_snapshot(encode_snapshot(problems, tags, problem_tags), tmp_path)
+        return CatalogStore.refresh()
+
+    yield publish
+    for snapshot in [CatalogStore._snapshot, *CatalogStore._previous.values()]:
+        if snapshot is not None:
+            snapshot.close()
@@ -0,0 +1,55 @@
+import pytest
+
+from problems.schemas import ProblemListItem
+from problems.service import ProblemNotFoundError, ProblemService
+from problems.slugs import normalize_slug, parse_problem_number
+
+
+PROBLEMS = [
+    {"id": 1, "public_id": "pro_two_sum", "name": "Two Sum", "difficulty": "Easy",
+     "link": "https://leetcode.com/problems/two-sum/", "acceptance_rate": 55.0,
+     "updated_at": None, "slug": "two-sum", "number": 1},
+    {"id": 2, "public_id": "pro_lru", "name": "LRU Cache", "difficulty": "Medium",
+     "link": "https://leetcode.com/problems/lru-cache/", "acceptance_rate": 44.0,
+     "updated_at": None, "slug": "lru-cache", "number": None},
+]
+TAGS = [{"id": 1, "public_id": "tag_hash", "name": "Hash Table"}]
+
+
+@pytest.fixture
+def service(publish_catalog):
+    publish_catalog(PROBLEMS, TAGS, [(1, 1)])
+    return ProblemService()
+
+
+@pytest.mark.parametrize("value", ["two-sum", "Two Sum", "two_sum", " TWO-SUM ",
+                                   "https://leetcode.com/problems/two-sum/description/"])
+def test_slug_forms_are_normalized(value):
+    assert normalize_slug(value) == "two-sum"
+
+
+@pytest.mark.parametrize("title, number", [("1. Two Sum", 1), ("146. LRU Cache", 146),
+                                           ("Two Sum", None), (". Sum", None)])
+def test_problem_number_is_parsed_from_numbered_titles(title, number):
+    assert parse_problem_number(title) == number
+
+
+def test_problem_is_found_by_any_slug_form(service):
+    for value in ["two-sum", "Two Sum", "https://leetcode.com/problems/two-sum/"]:
+        problem = service.get_problem_by_slug(value)
+        assert isinstance(problem, ProblemListItem)
+        assert problem.public_id == "pro_two_sum"
+        assert [tag.public_id for tag in problem.tags] == ["tag_hash"]
+
+
+def test_problem_is_found_by_number(service):
+    problem = service.get_problem_by_number(1)
+    assert problem.public_id == "pro_two_sum"
+    assert set(problem.model_dump()) == set(ProblemListItem.model_fields)
+
+
+def test_unknown_slug_and_number_are_not_found(service):
+    with pytest.raises(ProblemNotFoundError):
+        service.get_problem_by_slug("three-sum")
+    with pytest.raises(ProblemNotFoundError):
+        service.get_problem_by_number(146)
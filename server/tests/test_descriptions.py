@@ -0,0 +1,95 @@
+import pytest
+
+from problems.descriptions import render_description, render_descriptions, sanitize_html
+from problems.schemas import ProblemDetail
+from problems.service import to_public_detail
+
+
+DESCRIPTION = """<p>Given an array of integers <code>nums</code>&nbsp;and an integer <code>target</code>,
+return <em>indices of the two numbers such that they add up to <code>target</code></em>.</p>
+<p>&nbsp;</p>
+<p><strong class="example">Example 1:</strong></p>
+<pre><strong>Input:</strong> nums = [2,7,11,15], target = 9
+<strong>Output:</strong> [0,1]
+<strong>Explanation:</strong> Because nums[0] + nums[1] == 9, we return [0, 1].
+</pre>
+<p><strong class="example">Example 2:</strong></p>
+<pre><strong>Input:</strong> nums = [3,2,4], target = 6
+<strong>Output:</strong> [1,2]
+</pre>
+<p>&nbsp;</p>
+<p><strong>Constraints:</strong></p>
+<ul>
+\t<li><code>2 &lt;= nums.length &lt;= 10<sup>4</sup></code></li>
+\t<li><code>-10<sup>9</sup> &lt;= nums[i] &lt;= 10<sup>9</sup></code></li>
+</ul>
+<p>&nbsp;</p>
+<strong>Follow-up:&nbsp;</strong>Can you come up with an algorithm that is less than <code>O(n<sup>2</sup>)</code><font face="monospace">&nbsp;</font>time complexity?"""
+
+
+def test_scripts_and_their_content_are_dropped():
+    assert sanitize_html("<p>a<script>alert(1)</script>b</p><style>p {}</style>") == "<p>ab</p>"
+
+
+def test_event_handlers_and_unlisted_attributes_are_dropped():
+    assert sanitize_html('<p onclick="x()" class="c">a</p><img src="/a.png" onerror="x()">') == \
+           '<p>a</p><img src="/a.png">'
+
+
+@pytest.mark.parametrize("url", ["javascript:alert(1)", " JavaScript:alert(1)", "data:text/html,x"])
+def test_unsafe_urls_are_dropped(url):
+    assert sanitize_html(f'<a href="{url}" title="t">a</a>') == '<a title="t">a</a>'
+
+
+def test_safe_urls_are_kept_and_escaped():
+    assert sanitize_html('<a href="https://leetcode.com/?a=1&b=&quot;2&quot;">a</a>') == \
+           '<a href="https://leetcode.com/?a=1&amp;b=&quot;2&quot;">a</a>'
+
+
+def test_unknown_tags_are_unwrapped_and_text_escaped():
+    assert sanitize_html("<section><p>1 &lt; 2</p></section>") == "<p>1 &lt; 2</p>"
+
+
+def test_unclosed_and_stray_tags_are_balanced():
+    assert sanitize_html("<ul><li><b>a</li></ul></i><p>b") == "<ul><li><b>a</b></li></ul><p>b</p>"
+
+
+def test_description_is_split_into_its_sections():
+    rendered = render_description(DESCRIPTION)
+
+    assert rendered.statement.startswith("<p>Given an array of integers <code>nums</code>")
+    assert "Example" not in rendered.statement
+    assert [(e.input, e.output) for e in rendered.examples] == \
+           [("nums = [2,7,11,15], target = 9", "[0,1]"), ("nums = [3,2,4], target = 6", "[1,2]")]
+    assert rendered.examples[0].explanation == "Because nums[0] + nums[1] == 9, we return [0, 1]."
+    assert rendered.examples[1].explanation is None
+    assert rendered.constraints == ["2 <= nums.length <= 10^4", "-10^9 <= nums[i] <= 10^9"]
+    assert rendered.follow_up == \
+           "Can you come up with an algorithm that is less than O(n^2) time complexity?"
+
+
+def test_follow_up_heading_in_its_own_block():
+    rendered = render_description("<p>Statement.</p><p><strong>Follow up:</strong>&nbsp;</p><p>&nbsp;Can you?</p>")
+    assert rendered.follow_up == "Can you?"
+
+
+def test_description_without_headings_is_all_statement():
+    rendered = render_description("<p>Only a statement.</p>")
+    assert rendered.statement == "<p>Only a statement.</p>"
+    assert rendered.examples == [] and rendered.constraints == [] and rendered.follow_up is None
+
+
+@pytest.mark.anyio
+async def test_descriptions_are_rendered_in_a_pool_in_order():
+    rendered = await render_descriptions(["<p>one</p>", "<p>two</p>"], workers=1)
+    assert [r.statement for r in rendered] == ["<p>one</p>", "<p>two</p>"]
+
+
+def test_raw_description_is_only_served_when_asked_for():
+    problem = ProblemDetail(public_id="pro_x", name="X", difficulty="Easy", acceptance_rate=50.0,
+                            link="https://leetcode.com/problems/x/",
+                            description='<p onclick="x()">Statement.</p>')
+
+    served = to_public_detail(problem)
+    assert served.description == served.rendered.html == "<p>Statement.</p>"
+    assert to_public_detail(problem, include_raw=True).description == problem.description
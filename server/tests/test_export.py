@@ -0,0 +1,81 @@
+import gzip
+import json
+
+from catalog import CatalogExporter, CatalogStore
+from catalog.export import build_export
+
+
+def problem(problem_id: int, name: str, acceptance_rate: float = 50.0) -> dict:
+    return {"id": problem_id, "public_id": f"pro_{problem_id}", "name": name, "difficulty": "Easy",
+            "link": f"https://leetcode.com/problems/problem-{problem_id}/",
+            "acceptance_rate": acceptance_rate, "updated_at": None}
+
+
+PROBLEMS = [problem(1, "One"), problem(2, "Two"), problem(3, "Three")]
+TAGS = [{"id": 1, "public_id": "tag_array", "name": "Array"},
+        {"id": 2, "public_id": "tag_graph", "name": "Graph"}]
+PROBLEM_TAGS = [(1, 1), (2, 2), (3, 1), (3, 2)]
+
+
+def rows(document: dict) -> dict[str, list[str]]:
+    """
+    Resolves every row of a document to its public ID and tag names.
+    """
+    problems = document["problems"]
+    return {public_id: [document["tags"][i] for i in tags]
+            for public_id, tags in zip(problems["public_id"], problems["tags"])}
+
+
+def apply(client: dict[str, list[str]], document: dict) -> dict[str, list[str]]:
+    """
+    Merges a document into what a client holds, the way clients apply deltas.
+    """
+    if document["mode"] == "full":
+        return rows(document)
+    merged = {public_id: tags for public_id, tags in client.items() if public_id not in document["removed"]}
+    return {**merged, **rows(document)}
+
+
+def test_full_export_lists_every_problem(publish_catalog):
+    snapshot = publish_catalog(PROBLEMS, TAGS, PROBLEM_TAGS)
+    document = build_export(snapshot)
+
+    assert document["mode"] == "full" and document["tags"] == ["Array", "Graph"]
+    assert rows(document) == {"pro_1": ["Array"], "pro_2": ["Graph"], "pro_3": ["Array", "Graph"]}
+
+
+def test_delta_carries_changed_and_removed_problems_only(publish_catalog):
+    old = publish_catalog(PROBLEMS, TAGS, PROBLEM_TAGS)
+    client = rows(build_export(old))
+    new = publish_catalog([problem(1, "One"), problem(3, "Three", 60.0), problem(4, "Four")],
+                          TAGS, [(1, 1), (3, 1), (3, 2), (4, 2)])
+    document = build_export(new, CatalogStore.open_version(old.version))
+
+    assert document["mode"] == "delta" and document["since"] == old.version
+    assert sorted(document["problems"]["public_id"]) == ["pro_3", "pro_4"]
+    assert document["removed"] == ["pro_2"]
+    assert apply(client, document) == rows(build_export(new))
+
+
+def test_adding_a_tag_sends_a_full_export(publish_catalog):
+    old = publish_catalog(PROBLEMS, TAGS, PROBLEM_TAGS)
+    client = rows(build_export(old))
+    # "Binary Search" sorts before "Graph", so every index past it shifts
+    tags = TAGS + [{"id": 3, "public_id": "tag_bs", "name": "Binary Search"}]
+    new = publish_catalog(PROBLEMS + [problem(4, "Four")], tags, PROBLEM_TAGS + [(4, 3)])
+    document = build_export(new, CatalogStore.open_version(old.version))
+
+    assert document["mode"] == "full"
+    assert apply(client, document) == rows(build_export(new))
+    assert rows(document)["pro_2"] == ["Graph"]
+
+
+def test_exporter_serves_compressed_deltas(publish_catalog, monkeypatch):
+    monkeypatch.setattr(CatalogExporter, "_cache", {})
+    old = publish_catalog(PROBLEMS, TAGS, PROBLEM_TAGS)
+    new = publish_catalog(PROBLEMS[:2], TAGS, PROBLEM_TAGS[:2])
+
+    export = CatalogExporter.export(old.version, "gzip")
+    document = json.loads(gzip.decompress(export.body))
+    assert export.version == new.version
+    assert document["mode"] == "delta" and document["removed"] == ["pro_3"]
@@ -0,0 +1,88 @@
+import json
+import functools
+
+import pytest
+from sqlalchemy import select
+
+from catalog import build_catalog_snapshot
+from db import db_session
+from problems.descriptions import render_description
+from problems.models import Problem
+from utils import leetcode_problems
+
+
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures("database")]
+
+
+def entry(number: int, name: str, slug: str) -> dict:
+    return {"problem": f"{number}. {name}", "difficulty": "Easy", "acceptance_rate": "50.0%",
+            "link": f"https://leetcode.com/problems/{slug}/"}
+
+
+@pytest.fixture
+def data(tmp_path, monkeypatch):
+    """
+    Points the ingest at scratch data files and returns a function writing them.
+    """
+    problems_dir = tmp_path / "leetcode_problems"
+    problems_dir.mkdir()
+    monkeypatch.setattr(leetcode_problems, "PROBLEMS_FILE", tmp_path / "leetcode_problems.json")
+    monkeypatch.setattr(leetcode_problems, "PROBLEMS_DIR", problems_dir)
+    monkeypatch.setattr(leetcode_problems, "build_catalog_snapshot",
+                        functools.partial(build_catalog_snapshot, tmp_path / "catalog"))
+
+    async def render_inline(descriptions):
+        return [render_description(description) for description in descriptions]
+
+    # The process pool is covered by the description tests; spawning one per ingest is slow here
+    monkeypatch.setattr(leetcode_problems, "render_descriptions", render_inline)
+
+    def write(entries: list[dict]):
+        (tmp_path / "leetcode_problems.json").write_text(json.dumps(entries))
+        for e in entries:
+            number = e["problem"].split(".")[0]
+            filename = f"{number}_{e['problem'].replace(' ', '_')}.json"
+            (problems_dir / filename).write_text(json.dumps(
+                {"description": f"<p>{e['problem']}</p>", "tags": [{"name": "Ingest"}]}))
+
+    return write
+
+
+async def stored(names: list[str]) -> dict[str, tuple]:
+    async with db_session() as session:
+        rows = await session.execute(select(Problem.name, Problem.slug, Problem.number)
+                                     .where(Problem.name.in_(names)))
+        return {name: (slug, number) for name, slug, number in rows}
+
+
+async def test_colliding_slugs_and_numbers_do_not_fail_the_ingest(data):
+    data([entry(90001, "Ingest First", "ingest-shared"),
+          entry(90002, "Ingest Same Slug", "ingest-shared"),
+          entry(90001, "Ingest Same Number", "ingest-own"),
+          entry(90003, "Ingest Last", "ingest-last")])
+
+    await leetcode_problems.add_problems_to_db()
+
+    assert await stored(["Ingest First", "Ingest Same Slug", "Ingest Same Number", "Ingest Last"]) == {
+        "Ingest First": ("ingest-shared", 90001),
+        "Ingest Same Slug": (None, 90002),
+        "Ingest Same Number": ("ingest-own", None),
+        "Ingest Last": ("ingest-last", 90003),
+    }
+
+
+async def test_backfilled_slugs_skip_those_already_taken(data):
+    async with db_session() as session:
+        session.add(Problem(name="Ingest Old", difficulty="Easy", acceptance_rate=50.0,
+                            link="https://leetcode.com/problems/ingest-old/"))
+    data([entry(90011, "Ingest New", "ingest-old"),
+          entry(90011, "Ingest Old", "ingest-old"),
+          entry(90012, "Ingest After", "ingest-after")])
+
+    await leetcode_problems.add_problems_to_db()
+
+    assert await stored(["Ingest New", "Ingest Old", "Ingest After"]) == {
+        "Ingest New": ("ingest-old", 90011),
+        "Ingest Old": (None, None),
+        "Ingest After": ("ingest-after", 90012),
+    }
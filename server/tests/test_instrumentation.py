@@ -0,0 +1,54 @@
+import pytest
+from loguru import logger
+from sqlalchemy import create_engine, exc, text
+
+from db import instrumentation
+from db.instrumentation import instrument, start_tracking
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    instrument(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO items (name) VALUES ('a'), ('b'), ('c')"))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def warnings():
+    messages = []
+    handler = logger.add(messages.append, level="WARNING", format="{message}")
+    yield messages
+    logger.remove(handler)
+
+
+def test_statements_are_counted_per_context(engine):
+    stats = start_tracking()
+    with engine.connect() as conn:
+        for _ in range(3):
+            conn.execute(text("SELECT name FROM items WHERE id = :id"), {"id": 1})
+
+    assert stats.count == 3
+    assert stats.n_plus_one(threshold=3) == {"SELECT name FROM items WHERE id = ?": 3}
+
+
+def test_failed_statements_do_not_leave_start_times_behind(engine):
+    with engine.connect() as conn:
+        for _ in range(5):
+            with pytest.raises(exc.OperationalError):
+                conn.execute(text("SELECT * FROM missing"))
+        conn.execute(text("SELECT 1"))
+        assert conn.info["query_start"] == []
+
+
+def test_slow_select_is_logged_with_its_plan(engine, warnings, monkeypatch):
+    monkeypatch.setattr(instrumentation, "SLOW_QUERY_MS", 0)
+    stats = start_tracking()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT name FROM items WHERE name = 'a'")).all()
+
+    assert stats.slow == 1
+    assert "SCAN items" in warnings[0]
@@ -0,0 +1,226 @@
+import json
+import time
+
+import anyio
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+
+from db import db_session
+from jobs.models import Job, JobStatus
+from jobs.queue import JobQueue
+
+
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures("database")]
+
+
+def make_queue(**kwargs) -> JobQueue:
+    kwargs = {"workers": 1, "lease_seconds": 1.0, "poll_interval": 0.01, **kwargs}
+    return JobQueue(**kwargs)
+
+
+async def wait_until_finished(queue: JobQueue, job_id: str, timeout: float = 5.0):
+    with anyio.fail_after(timeout):
+        async for state in queue.events(job_id):
+            pass
+    return await queue.status(job_id)
+
+
+async def insert_expired_lease(kind: str, attempts: int, max_attempts: int) -> str:
+    """
+    Inserts a job as left behind by a worker that died while running it.
+    """
+    public_id = Job.generate_public_id()
+    now = time.time()
+    async with db_session() as session:
+        await session.execute(insert(Job).values(
+            public_id=public_id, kind=kind, status=JobStatus.RUNNING.value,
+            payload=json.dumps({}), attempts=attempts, max_attempts=max_attempts,
+            run_after=now - 10, lease_owner="dead-worker", lease_expires_at=now - 1,
+        ))
+    return public_id
+
+
+async def test_job_runs_once_and_stores_its_result():
+    queue = make_queue()
+
+    @queue.handler("echo")
+    async def echo(payload, report):
+        await report({"step": 1})
+        return {"echo": payload["value"]}
+
+    await queue.start()
+    try:
+        info = await wait_until_finished(queue, await queue.submit("echo", {"value": 42}))
+    finally:
+        await queue.stop()
+
+    assert info.status == JobStatus.SUCCEEDED
+    assert info.result == {"echo": 42}
+    assert info.progress == {"step": 1}
+    assert info.attempts == 1
+
+
+async def test_expired_lease_is_reclaimed_by_another_worker():
+    queue = make_queue()
+    runs = []
+
+    @queue.handler("reclaimed")
+    async def reclaimed(payload, report):
+        runs.append(payload)
+        return "done"
+
+    job_id = await insert_expired_lease("reclaimed", attempts=1, max_attempts=3)
+    await queue.start()
+    try:
+        info = await wait_until_finished(queue, job_id)
+    finally:
+        await queue.stop()
+
+    assert info.status == JobStatus.SUCCEEDED
+    assert info.attempts == 2
+    assert len(runs) == 1
+
+
+async def test_live_lease_is_not_claimed():
+    owner, other = make_queue(lease_seconds=30), make_queue()
+
+    @owner.handler("leased")
+    @other.handler("leased")
+    async def leased(payload, report):
+        return None
+
+    await owner.submit("leased", {})
+    claimed = await owner._claim()
+    assert claimed is not None and claimed.attempts == 1
+    assert await other._claim() is None
+    await owner._run(claimed)
+
+
+async def test_worker_survives_a_failed_job_update():
+    queue = make_queue()
+    runs = []
+
+    @queue.handler("count")
+    async def count(payload, report):
+        runs.append(payload["n"])
+        return payload["n"]
+
+    owned_update = queue._owned_update
+    failures = []
+
+    async def locked_once(job_id: str, **values) -> bool:
+        if not failures:
+            failures.append(job_id)
+            raise OperationalError("UPDATE jobs", {}, Exception("database is locked"))
+        return await owned_update(job_id, **values)
+
+    queue._owned_update = locked_once
+    await queue.start()
+    try:
+        first = await queue.submit("count", {"n": 1})
+        second = await queue.submit("count", {"n": 2})
+        second_info = await wait_until_finished(queue, second)
+        first_info = await wait_until_finished(queue, first)
+    finally:
+        await queue.stop()
+
+    assert failures == [first]
+    assert second_info.status == JobStatus.SUCCEEDED and second_info.result == 2
+    # The job whose result could not be stored is run again once its lease expires
+    assert first_info.status == JobStatus.SUCCEEDED and first_info.attempts == 2
+    assert sorted(runs) == [1, 1, 2]
+
+
+async def test_lease_expiring_after_last_attempt_fails_the_job():
+    queue = make_queue()
+    runs = []
+
+    @queue.handler("exhausted")
+    async def exhausted(payload, report):
+        runs.append(payload)
+
+    job_id = await insert_expired_lease("exhausted", attempts=2, max_attempts=2)
+    await queue.start()
+    try:
+        info = await wait_until_finished(queue, job_id)
+    finally:
+        await queue.stop()
+
+    assert info.status == JobStatus.FAILED
+    assert info.error == "Lease expired after the last attempt"
+    assert runs == []
+
+
+async def test_failed_attempt_is_retried_after_a_backoff():
+    queue = make_queue(backoff_base=0.2, backoff_max=1.0)
+    started = []
+
+    @queue.handler("flaky")
+    async def flaky(payload, report):
+        started.append(time.monotonic())
+        if len(started) == 1:
+            raise RuntimeError("transient")
+        return "recovered"
+
+    await queue.start()
+    try:
+        job_id = await queue.submit("flaky", {}, max_attempts=3)
+        info = await wait_until_finished(queue, job_id)
+    finally:
+        await queue.stop()
+
+    assert info.status == JobStatus.SUCCEEDED
+    assert info.result == "recovered"
+    assert info.attempts == 2
+    # The first retry waits between half and all of backoff_base
+    assert started[1] - started[0] >= 0.1
+
+
+async def test_backoff_doubles_and_is_capped():
+    queue = make_queue(backoff_base=1.0, backoff_max=3.0)
+
+    @queue.handler("always-failing")
+    async def always_failing(payload, report):
+        raise RuntimeError("broken")
+
+    job_id = await queue.submit("always-failing", {}, max_attempts=5)
+    delays = []
+    for _ in range(3):
+        async with db_session() as session:
+            await session.execute(Job.__table__.update()
+                                  .where(Job.public_id == job_id)
+                                  .values(run_after=0))
+        job = await queue._claim()
+        before = time.time()
+        await queue._run(job)
+        async with db_session() as session:
+            run_after = await session.scalar(select(Job.run_after).where(Job.public_id == job_id))
+        delays.append(run_after - before)
+
+    assert 0.5 <= delays[0] <= 1.0 + 0.1
+    assert 1.0 <= delays[1] <= 2.0 + 0.1
+    assert 1.5 <= delays[2] <= 3.0 + 0.1
+    assert (await queue.status(job_id)).status == JobStatus.PENDING
+
+
+async def test_job_fails_after_max_attempts():
+    queue = make_queue(backoff_base=0.01)
+    attempts = []
+
+    @queue.handler("doomed")
+    async def doomed(payload, report):
+        attempts.append(1)
+        raise ValueError(f"attempt {len(attempts)} failed")
+
+    await queue.start()
+    try:
+        job_id = await queue.submit("doomed", {}, max_attempts=3)
+        info = await wait_until_finished(queue, job_id)
+    finally:
+        await queue.stop()
+
+    assert info.status == JobStatus.FAILED
+    assert info.attempts == 3
+    assert info.error == "attempt 3 failed"
+    assert len(attempts) == 3
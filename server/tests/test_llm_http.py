@@ -0,0 +1,23 @@
+from llm import http
+from llm.models import LLM_MAX_RETRIES, LLM_REQUEST_TIMEOUT, Model, get_model
+
+
+def test_models_share_one_client_and_pool():
+    gpt_4o, gpt_4o_mini = get_model(Model.GPT_4O.value), get_model(Model.GPT_4O_MINI.value)
+
+    assert gpt_4o is not gpt_4o_mini
+    for model in (gpt_4o, gpt_4o_mini):
+        assert model.root_async_client._client is http.llm_http_client
+    assert http.llm_http_client._transport is http.llm_transport
+
+
+def test_pool_limits_and_timeouts_are_applied():
+    pool = http.llm_transport.pool
+    assert pool._max_connections == http.LLM_POOL_MAX_CONNECTIONS
+    assert pool._max_keepalive_connections == http.LLM_POOL_MAX_KEEPALIVE
+    assert pool._keepalive_expiry == http.LLM_KEEPALIVE_EXPIRY
+
+    assert http.llm_http_client.timeout.pool == http.LLM_POOL_TIMEOUT
+    assert http.llm_http_client.timeout.connect == http.LLM_CONNECT_TIMEOUT
+    model = get_model(Model.GPT_4O.value)
+    assert model.request_timeout == LLM_REQUEST_TIMEOUT and model.max_retries == LLM_MAX_RETRIES
@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import delete, func, insert, select
+
+from db import db_session
+from db.mixins import CountStrategy, _count_cache, _decode_cursor, _encode_cursor
+from problems.models import Tag
+
+
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures("database")]
+
+SHARED = datetime(2024, 1, 1, tzinfo=timezone.utc)
+LATER = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module")
+async def tags(database):
+    """
+    Inserts tags in two groups that each share one timestamp, so pages have to
+    break ties on the id.
+    """
+    async with db_session() as session:
+        await session.execute(insert(Tag), [
+            {"public_id": Tag.generate_public_id(), "name": f"pagination-{i:02d}",
+             "created_at": SHARED if i < 15 else LATER, "updated_at": SHARED if i < 15 else LATER}
+            for i in range(25)
+        ])
+
+
+async def all_pages(order_type: str, limit: int) -> list[int]:
+    ids, cursor = [], None
+    while True:
+        page = await Tag.get_pagination(order_type=order_type, cursor=cursor, limit=limit,
+                                        count_strategy=CountStrategy.NONE)
+        ids.extend(tag.id for tag in page.items)
+        assert len(page.items) <= limit
+        if not page.has_next:
+            assert page.next_cursor is None
+            return ids
+        cursor = page.next_cursor
+
+
+@pytest.mark.usefixtures("tags")
+@pytest.mark.parametrize("limit", [1, 4, 7, 100])
+async def test_created_asc_pages_cover_every_row_once(limit):
+    async with db_session() as session:
+        expected = list(await session.scalars(select(Tag.id).order_by(Tag.created_at, Tag.id)))
+
+    assert await all_pages("created_asc", limit) == expected
+
+
+@pytest.mark.usefixtures("tags")
+@pytest.mark.parametrize("limit", [1, 6, 100])
+async def test_updated_desc_pages_cover_every_row_once(limit):
+    async with db_session() as session:
+        expected = list(await session.scalars(
+            select(Tag.id).order_by(Tag.updated_at.desc(), Tag.id.desc())))
+
+    assert await all_pages("updated_desc", limit) == expected
+
+
+def test_cursor_round_trips():
+    cursor = _encode_cursor("2024-01-01 00:00:00.000000", 42)
+    assert "=" not in cursor
+    assert _decode_cursor(cursor) == ("2024-01-01 00:00:00.000000", 42)
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", _encode_cursor("x", 1)[:-2], "WzEsMl0"])
+async def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        await Tag.get_pagination(cursor=cursor)
+
+
+async def test_non_positive_limit_is_rejected():
+    with pytest.raises(ValueError):
+        await Tag.get_pagination(limit=0)
+
+
+@pytest.mark.usefixtures("tags")
+async def test_count_strategies():
+    _count_cache.clear()
+    async with db_session() as session:
+        total = await session.scalar(select(func.count()).select_from(Tag))
+
+    exact = await Tag.get_pagination(limit=1, count_strategy=CountStrategy.EXACT)
+    assert exact.total_count == total
+    cached = await Tag.get_pagination(limit=1, count_strategy=CountStrategy.CACHED)
+    assert cached.total_count == total
+    assert (await Tag.get_pagination(limit=1, count_strategy=CountStrategy.NONE)).total_count is None
+
+    async with db_session() as session:
+        await session.execute(delete(Tag).where(Tag.name == "pagination-00"))
+
+    # The cached count is reused until it expires; EXACT sees the delete right away
+    assert (await Tag.get_pagination(limit=1, count_strategy=CountStrategy.CACHED)).total_count == total
+    assert (await Tag.get_pagination(limit=1, count_strategy=CountStrategy.EXACT)).total_count == total - 1
+    # max(rowid) does not notice deletes below the highest row
+    async with db_session() as session:
+        max_id = await session.scalar(select(func.max(Tag.id)))
+    assert (await Tag.get_pagination(limit=1, count_strategy=CountStrategy.ESTIMATED)).total_count == max_id
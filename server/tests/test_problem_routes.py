@@ -0,0 +1,63 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from db import db_session
+from problems.handler import router
+from problems.models import Problem, Tag
+
+
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures("database")]
+
+DESCRIPTION = '<p onclick="steal()">Find the <code>x</code>.</p><script>steal()</script>'
+
+
+@pytest.fixture(scope="module")
+async def problem_id(database) -> str:
+    async with db_session() as session:
+        problem = Problem(name="Routes Problem", difficulty="Medium", acceptance_rate=42.5,
+                          link="https://leetcode.com/problems/routes-problem/",
+                          description=DESCRIPTION, tags=[Tag(name="Routes Tag")])
+        session.add(problem)
+        await session.flush()
+        return problem.public_id
+
+
+@pytest.fixture
+async def client():
+    app = FastAPI()
+    app.include_router(router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def test_detail_serves_the_fields_the_client_renders(client, problem_id):
+    response = await client.get(f"/leetcode/problems/{problem_id}")
+
+    assert response.status_code == 200
+    problem = response.json()
+    # client/src/components/leetcode/questions/ProblemDetail.tsx reads these
+    assert problem["name"] == "Routes Problem"
+    assert problem["difficulty"] == "Medium"
+    assert problem["acceptance_rate"] == 42.5
+    assert [tag["name"] for tag in problem["tags"]] == ["Routes Tag"]
+    assert problem["description"] == "<p>Find the <code>x</code>.</p>"
+    assert problem["rendered"]["html"] == problem["description"]
+
+
+async def test_scraped_description_is_served_when_asked_for(client, problem_id):
+    response = await client.get(f"/leetcode/problems/{problem_id}", params={"include_raw": "true"})
+    assert response.json()["description"] == DESCRIPTION
+
+
+async def test_batch_serves_sanitized_descriptions(client, problem_id):
+    response = await client.post("/leetcode/problems/batch", json={"ids": [problem_id, "pro_missing"]})
+
+    found, missing = response.json()["problems"]
+    assert found["found"] and found["problem"]["description"] == "<p>Find the <code>x</code>.</p>"
+    assert missing == {"public_id": "pro_missing", "found": False, "problem": None}
+
+
+async def test_unknown_problem_is_not_found(client):
+    response = await client.get("/leetcode/problems/pro_missing")
+    assert response.status_code == 404
@@ -0,0 +1,77 @@
+import itertools
+
+import pytest
+from sqlalchemy import insert, select
+
+from db import db_session
+from problems.models import Problem, ProblemTags, Tag
+from utils.check_query_plans import EXPECTED_STEPS, check_query_plans, full_scans, hot_queries, temp_sorts
+
+
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures("database")]
+
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+
+
+@pytest.fixture(scope="module")
+async def catalog(database):
+    """
+    Inserts problems with shared acceptance rates under two tags of their own,
+    so sorted pages have to break ties on the id.
+    """
+    async with db_session() as session:
+        await session.execute(insert(Tag), [{"public_id": Tag.generate_public_id(), "name": f"plans-{t}"}
+                                            for t in "ab"])
+        tag_ids = dict((await session.execute(
+            select(Tag.name, Tag.id).where(Tag.name.in_(["plans-a", "plans-b"])))).tuples().all())
+        await session.execute(insert(Problem), [
+            {"public_id": Problem.generate_public_id(), "name": f"plans-{i}", "difficulty": DIFFICULTIES[i % 3],
+             "acceptance_rate": float(i % 4), "link": f"https://leetcode.com/problems/plans-{i}/"}
+            for i in range(24)
+        ])
+        problems = dict((await session.execute(
+            select(Problem.name, Problem.id).where(Problem.name.like("plans-%")))).tuples().all())
+        await session.execute(insert(ProblemTags), [
+            {"problem_id": problems[f"plans-{i}"], "tag_id": tag_ids[tag]}
+            for i in range(24) for tag in ("plans-a" if i % 2 else "", "plans-b" if i % 5 == 0 else "") if tag
+        ])
+        rows = (await session.execute(select(Problem.id, Problem.public_id, Problem.difficulty, Problem.acceptance_rate)
+                                      .where(Problem.name.like("plans-%")))).all()
+        tagged = {problems[f"plans-{i}"] for i in range(24) if i % 2 or i % 5 == 0}
+    return [row for row in rows if row.id in tagged]
+
+
+def test_plan_steps_are_classified():
+    plan = ["SCAN problems", "SCAN problems USING INDEX ix_problems_name",
+            "SEARCH tags USING COVERING INDEX ix_tags_name (name=?)",
+            "USE TEMP B-TREE FOR ORDER BY"]
+    assert full_scans(plan) == ["SCAN problems"]
+    assert temp_sorts(plan) == ["USE TEMP B-TREE FOR ORDER BY"]
+
+
+def test_every_exemption_names_a_hot_query():
+    assert set(EXPECTED_STEPS) <= set(hot_queries())
+
+
+async def test_hot_queries_are_served_by_indexes():
+    assert await check_query_plans() == {}
+
+
+@pytest.mark.parametrize("difficulty, acceptance_sort", list(itertools.product(
+    [[], ["Medium"], ["Easy", "Hard"]], ["none", "asc", "desc"])))
+async def test_filtered_pages_match_the_filters_in_order(catalog, difficulty, acceptance_sort):
+    expected = [row for row in catalog if not difficulty or row.difficulty in difficulty]
+    if acceptance_sort == "none":
+        expected.sort(key=lambda row: row.id)
+    else:
+        expected.sort(key=lambda row: (row.acceptance_rate, row.id), reverse=acceptance_sort == "desc")
+
+    served = []
+    for page in (1, 2, 3):
+        problems, total = await Problem.get_problems_by_filter(
+            tags=["plans-a", "plans-b"], difficulty=difficulty, acceptance_sort=acceptance_sort,
+            limit=5, page=page)
+        served.extend(problems)
+        assert total == len(expected)
+
+    assert [p.public_id for p in served] == [row.public_id for row in expected]
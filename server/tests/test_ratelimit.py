@@ -0,0 +1,92 @@
+import hashlib
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from serve import ratelimit
+from serve.ratelimit import AdmissionControlMiddleware, RateLimiter, TokenBucket, client_key
+
+
+def scope(headers: dict[str, str] = None, client: str = "10.0.0.1", path: str = "/leetcode/problems"):
+    return {"type": "http", "method": "GET", "path": path, "client": (client, 1234),
+            "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]}
+
+
+@pytest.fixture
+def api_keys(monkeypatch):
+    keys = {"known-key"}
+    monkeypatch.setattr(ratelimit, "API_KEY_HASHES",
+                        frozenset(hashlib.sha256(k.encode()).hexdigest()[:32] for k in keys))
+    return keys
+
+
+def test_bucket_spends_and_refills():
+    bucket = TokenBucket(capacity=3, now=0.0)
+    assert [bucket.take(1, rate=1, capacity=3, now=0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take(1, rate=1, capacity=3, now=0.0) == pytest.approx(1.0)
+    assert bucket.take(1, rate=1, capacity=3, now=0.5) == pytest.approx(0.5)
+    assert bucket.take(1, rate=1, capacity=3, now=1.0) == 0.0
+
+
+def test_bucket_never_exceeds_its_capacity():
+    bucket = TokenBucket(capacity=2, now=0.0)
+    bucket.take(2, rate=1, capacity=2, now=0.0)
+    bucket.take(0, rate=1, capacity=2, now=100.0)
+    assert bucket.tokens == 2
+
+
+def test_limiter_throttles_each_client_separately():
+    limiter = RateLimiter(rate=1, capacity=2)
+    assert limiter.acquire("ip:a", 1) == 0 and limiter.acquire("ip:a", 1) == 0
+    assert limiter.acquire("ip:a", 1) > 0
+    assert limiter.acquire("ip:b", 1) == 0
+    assert len(limiter) == 2
+
+
+def test_keyed_clients_get_a_larger_bucket():
+    limiter = RateLimiter(rate=1, capacity=2, key_multiplier=4)
+    assert all(limiter.acquire("key:x", 1, has_key=True) == 0 for _ in range(8))
+    assert limiter.acquire("key:x", 1, has_key=True) > 0
+
+
+def test_cost_above_the_capacity_is_capped():
+    limiter = RateLimiter(rate=1, capacity=5)
+    assert limiter.acquire("ip:a", 20) == 0
+    assert limiter.acquire("ip:a", 1) > 0
+
+
+def test_known_api_key_identifies_the_client(api_keys):
+    key, has_key = client_key(scope({"X-API-Key": "known-key"}))
+    assert has_key and key.startswith("key:") and "known-key" not in key
+
+
+def test_unknown_api_keys_fall_back_to_the_ip(api_keys):
+    keys = {client_key(scope({"X-API-Key": f"made-up-{i}"})) for i in range(5)}
+    assert keys == {("ip:10.0.0.1", False)}
+
+
+def test_forwarded_for_is_only_trusted_when_enabled(monkeypatch):
+    request = scope({"X-Forwarded-For": "1.2.3.4, 10.0.0.9"})
+    assert client_key(request) == ("ip:10.0.0.1", False)
+    monkeypatch.setattr(ratelimit, "TRUST_FORWARDED_FOR", True)
+    assert client_key(request) == ("ip:1.2.3.4", False)
+
+
+@pytest.mark.anyio
+async def test_made_up_keys_do_not_escape_the_limit(api_keys):
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    app.add_middleware(AdmissionControlMiddleware, limiter=RateLimiter(rate=0.001, capacity=3))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        statuses = [(await client.get("/ping", headers={"X-API-Key": f"made-up-{i}"})).status_code
+                    for i in range(5)]
+        throttled = await client.get("/ping")
+
+    assert statuses == [200, 200, 200, 429, 429]
+    assert int(throttled.headers["retry-after"]) >= 1
@@ -0,0 +1,152 @@
+import random
+from collections import Counter
+from datetime import date
+
+import pytest
+
+from catalog import CatalogStore
+from problems.sampler import AliasTable, ProblemSampler
+from problems.schemas import ProblemListItem
+from problems.service import ProblemService
+
+
+def problem(problem_id: int, difficulty: str, acceptance_rate: float) -> dict:
+    return {"id": problem_id, "public_id": f"pro_{problem_id}", "name": f"Problem {problem_id}",
+            "difficulty": difficulty, "link": f"https://leetcode.com/problems/problem-{problem_id}/",
+            "acceptance_rate": acceptance_rate, "updated_at": None}
+
+
+PROBLEMS = [
+    problem(1, "Easy", 80.0),
+    problem(2, "Easy", 20.0),
+    problem(3, "Medium", 50.0),
+    problem(4, "Hard", 0.0),
+    problem(5, "Hard", 30.0),
+]
+TAGS = [{"id": 1, "public_id": "tag_array", "name": "Array"},
+        {"id": 2, "public_id": "tag_graph", "name": "Graph"}]
+PROBLEM_TAGS = [(1, 1), (2, 1), (3, 2), (4, 2), (5, 1)]
+
+
+@pytest.fixture
+def subscribed_sampler():
+    """
+    Returns a function creating samplers subscribed to the CatalogStore until the test ends.
+    """
+    samplers = []
+
+    def create() -> ProblemSampler:
+        sampler = ProblemSampler()
+        CatalogStore.subscribe(sampler.rebuild)
+        samplers.append(sampler)
+        return sampler
+
+    yield create
+    for sampler in samplers:
+        CatalogStore.unsubscribe(sampler.rebuild)
+
+
+@pytest.fixture
+def sampler(publish_catalog, subscribed_sampler):
+    publish_catalog(PROBLEMS, TAGS, PROBLEM_TAGS)
+    return subscribed_sampler()
+
+
+def test_alias_table_matches_the_weights():
+    weights = [1.0, 2.0, 3.0, 4.0, 0.5]
+    table = AliasTable([10, 11, 12, 13, 14], weights)
+    rng = random.Random(7)
+    draws = 200_000
+    counts = Counter(table.sample(rng) for _ in range(draws))
+
+    total = sum(weights)
+    for row, weight in zip(table.rows, weights):
+        assert counts[row] / draws == pytest.approx(weight / total, abs=0.01)
+
+
+def test_alias_table_with_a_single_row_always_draws_it():
+    table = AliasTable([3], [0.2])
+    rng = random.Random(1)
+    assert {table.sample(rng) for _ in range(100)} == {3}
+
+
+def test_empty_alias_table():
+    assert len(AliasTable([], [])) == 0
+
+
+def test_pick_respects_the_filters(sampler):
+    for seed in range(200):
+        assert sampler.pick(tags=["Graph"], seed=seed).public_id in {"pro_3", "pro_4"}
+        assert sampler.pick(difficulty=["Easy"], seed=seed).difficulty == "Easy"
+        # Tags match any of them, difficulties must match
+        picked = sampler.pick(tags=["Array", "Graph"], difficulty=["Hard"], seed=seed)
+        assert picked.public_id in {"pro_4", "pro_5"}
+
+
+def test_pick_without_a_match_returns_none(sampler):
+    assert sampler.pick(tags=["Graph"], difficulty=["Easy"]) is None
+    assert sampler.pick(tags=["Unknown"]) is None
+
+
+def test_pick_is_weighted_by_acceptance_rate(sampler):
+    counts = Counter(sampler.pick(difficulty=["Easy"], seed=seed).public_id for seed in range(5000))
+    assert counts["pro_1"] / 5000 == pytest.approx(0.8, abs=0.03)
+
+
+def test_zero_acceptance_rate_can_still_be_picked(sampler):
+    picked = {sampler.pick(tags=["Graph"], difficulty=["Hard"], seed=seed).public_id for seed in range(20)}
+    assert picked == {"pro_4"}
+
+
+def test_seeded_pick_is_deterministic(sampler, subscribed_sampler):
+    assert [sampler.pick(seed=seed).public_id for seed in range(50)] == \
+           [subscribed_sampler().pick(seed=seed).public_id for seed in range(50)]
+
+
+def test_daily_is_stable_per_day_and_filter(sampler, subscribed_sampler):
+    day = date(2024, 3, 1)
+    other = subscribed_sampler()
+    assert sampler.daily(["Array", "Graph"], [], day) == other.daily(["Graph", "Array"], [], day)
+    assert sampler.daily(day=day) == sampler.daily(day=day)
+    picks = {sampler.daily(day=date(2024, 3, d)).public_id for d in range(1, 29)}
+    assert len(picks) > 1
+
+
+def test_sampler_follows_a_new_catalog_version(sampler, publish_catalog):
+    assert sampler.pick(seed=1).public_id.startswith("pro_")
+    publish_catalog([problem(9, "Easy", 50.0)], [], [])
+    assert sampler.pick(seed=1).public_id == "pro_9"
+    assert sampler.pick(difficulty=["Hard"]) is None
+
+
+def test_buckets_are_built_when_the_catalog_is_mapped(sampler, publish_catalog, monkeypatch):
+    def no_picks_building(*args):
+        raise AssertionError("built on the request path")
+
+    newer = publish_catalog([problem(9, "Easy", 50.0)], [], [])
+    assert sampler._version == newer.version
+    monkeypatch.setattr(ProblemSampler, "rebuild", no_picks_building)
+    assert sampler.pick(seed=1).public_id == "pro_9"
+
+
+def test_failed_rebuild_never_serves_the_closed_snapshot(sampler, publish_catalog, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("build failed")
+
+    table = ProblemSampler.__dict__["_table"]
+    monkeypatch.setattr(ProblemSampler, "_table", staticmethod(broken))
+    publish_catalog([problem(9, "Easy", 50.0)], [], [])
+    assert sampler.pick(seed=1) is None
+    assert sampler.daily() is None
+
+    monkeypatch.setattr(ProblemSampler, "_table", table)
+    publish_catalog([problem(9, "Easy", 50.0)], [], [])
+    assert sampler.pick(seed=1).public_id == "pro_9"
+
+
+def test_random_problem_is_served_as_a_public_list_item(sampler):
+    picked = ProblemService().get_random_problem(["Graph"], ["Medium"], seed=3)
+    assert isinstance(picked, ProblemListItem)
+    assert picked.public_id == "pro_3"
+    assert [(tag.public_id, tag.name) for tag in picked.tags] == [("tag_graph", "Graph")]
+    assert "id" not in picked.model_dump() and "row" not in picked.model_dump()
@@ -0,0 +1,105 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+
+from serve.stream import ResumableStream, StreamRegistry, format_event, stream_response
+
+
+pytestmark = pytest.mark.anyio
+
+
+def numbers(count: int):
+    async def produce():
+        for i in range(count):
+            yield {"n": i}
+    return produce
+
+
+def parse(body: str) -> list[dict]:
+    events = []
+    for frame in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines() if not line.startswith(":"))
+        if fields:
+            events.append(fields)
+    return events
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+
+    @app.get("/numbers/{name}")
+    async def stream_numbers(name: str, request: Request):
+        return stream_response(numbers(5), request)
+
+    yield app
+    for reaper in StreamRegistry._reapers.values():
+        reaper.cancel()
+    for stream in StreamRegistry._streams.values():
+        stream.cancel()
+    StreamRegistry._reapers.clear()
+    StreamRegistry._streams.clear()
+
+
+async def get(app: FastAPI, path: str, last_event_id: str = None) -> list[dict]:
+    headers = {"Last-Event-ID": last_event_id} if last_event_id else {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get(path, headers=headers)
+    return parse(response.text)
+
+
+def test_format_event_splits_multiline_data():
+    assert format_event("a\nb", "message", "s:1") == "id: s:1\nevent: message\ndata: a\ndata: b\n\n"
+
+
+async def test_subscribe_replays_events_after_the_given_position():
+    stream = ResumableStream(numbers(4))
+    frames = [frame async for frame in stream.subscribe(after=2)]
+
+    events = parse("".join(frames))
+    assert events[0]["event"] == "open"
+    assert [event["id"] for event in events[1:]] == [f"{stream.stream_id}:{seq}" for seq in (3, 4, 5)]
+    assert events[1]["data"] == '{"n": 2}'
+    assert events[-1]["event"] == "done"
+
+
+async def test_producer_waits_for_a_slow_client():
+    stream = ResumableStream(numbers(100), max_pending=3)
+    await asyncio.sleep(0.05)
+    assert stream._last_seq == 3
+    assert not stream.done
+    stream.cancel()
+
+
+async def test_reconnecting_client_resumes_the_same_stream(app):
+    first = await get(app, "/numbers/a")
+    ids = [event["id"] for event in first if "id" in event]
+    assert len(ids) == 6
+
+    resumed = await get(app, "/numbers/a", last_event_id=ids[2])
+    assert [event["id"] for event in resumed if "id" in event] == ids[3:]
+    assert len(StreamRegistry._streams) == 1
+
+
+async def test_event_id_of_another_resource_starts_a_new_stream(app):
+    first = await get(app, "/numbers/a")
+    foreign_id = [event["id"] for event in first if "id" in event][2]
+
+    other = await get(app, "/numbers/b", last_event_id=foreign_id)
+    ids = [event["id"] for event in other if "id" in event]
+    assert len(ids) == 6
+    assert not any(event_id.startswith(foreign_id.split(":")[0]) for event_id in ids)
+    assert len(StreamRegistry._streams) == 2
+
+
+async def test_registry_checks_the_resource():
+    stream = StreamRegistry.create(numbers(1), "GET /jobs/a/events")
+    try:
+        assert StreamRegistry.resume(f"{stream.stream_id}:1", "GET /jobs/b/events") is None
+        assert StreamRegistry.resume(f"{stream.stream_id}:x", "GET /jobs/a/events") is None
+        assert StreamRegistry.resume(f"{stream.stream_id}:1", "GET /jobs/a/events") == (stream, 1)
+    finally:
+        stream.cancel()
+        StreamRegistry._streams.pop(stream.stream_id, None)
@@ -0,0 +1,112 @@
+import pytest
+
+from catalog import CatalogStore
+from problems.typeahead import TYPEAHEAD_MAX_LIMIT, PrefixIndex, Typeahead, normalize_query
+
+
+def problem(problem_id: int, name: str, acceptance_rate: float, number: int = None) -> dict:
+    slug = name.lower().replace(" ", "-")
+    return {"id": problem_id, "public_id": f"pro_{problem_id}", "name": name, "difficulty": "Easy",
+            "link": f"https://leetcode.com/problems/{slug}/", "acceptance_rate": acceptance_rate,
+            "updated_at": None, "slug": slug, "number": number}
+
+
+PROBLEMS = [
+    problem(1, "Two Sum", 50.0, number=1),
+    problem(2, "Three Sum", 30.0, number=15),
+    problem(3, "Sum of Two Integers", 52.0, number=371),
+    problem(4, "Binary Search", 58.0, number=704),
+    problem(5, "Search Insert Position", 45.0, number=35),
+    problem(6, "Summary Ranges", 49.0, number=228),
+]
+TAGS = [{"id": 1, "public_id": "tag_bs", "name": "Binary Search"},
+        {"id": 2, "public_id": "tag_array", "name": "Array"},
+        {"id": 3, "public_id": "tag_bst", "name": "Binary Search Tree"}]
+PROBLEM_TAGS = [(4, 1), (5, 1), (6, 1), (1, 2), (2, 2), (5, 2), (6, 3)]
+
+
+@pytest.fixture
+def typeahead(publish_catalog):
+    typeahead = Typeahead()
+    CatalogStore.subscribe(typeahead.build)
+    yield typeahead
+    CatalogStore.unsubscribe(typeahead.build)
+
+
+def names(entries: list[dict]) -> list[str]:
+    return [entry["name"] for entry in entries]
+
+
+def test_queries_are_normalized():
+    assert normalize_query("  Two-Sum_II ") == "two sum ii"
+
+
+def test_index_is_built_when_the_catalog_is_mapped(typeahead, publish_catalog):
+    snapshot = publish_catalog(PROBLEMS, TAGS, PROBLEM_TAGS)
+    assert typeahead._indexes is not None and typeahead._indexes[0] == snapshot.version
+
+    newer = publish_catalog(PROBLEMS[:1], [], [])
+    assert typeahead._indexes[0] == newer.version
+
+
+def test_unsubscribed_index_is_no_longer_rebuilt(publish_catalog):
+    typeahead = Typeahead()
+    subscribers = len(CatalogStore._subscribers)
+    CatalogStore.subscribe(typeahead.build)
+    first = publish_catalog(PROBLEMS, TAGS, PROBLEM_TAGS)
+    CatalogStore.unsubscribe(typeahead.build)
+
+    publish_catalog(PROBLEMS[:1], [], [])
+    assert typeahead._indexes[0] == first.version
+    assert len(CatalogStore._subscribers) == subscribers
+
+
+def test_problems_are_ranked_by_acceptance_rate(typeahead, publish_catalog):
+    publish_catalog(PROBLEMS, TAGS, PROBLEM_TAGS)
+    # Short prefixes come from the precomputed lists, longer ones from the sorted keys
+    assert names(typeahead.suggest("s")["problems"]) == \
+           ["Binary Search", "Sum of Two Integers", "Two Sum", "Summary Ranges",
+            "Search Insert Position", "Three Sum"]
+    assert names(typeahead.suggest("sear")["problems"]) == ["Binary Search", "Search Insert Position"]
+
+
+def test_exact_key_matches_come_first(typeahead, publish_catalog):
+    publish_catalog(PROBLEMS, TAGS, PROBLEM_TAGS)
+    # "Three Sum" has a key equal to "sum", so it outranks the better accepted "Summary Ranges"
+    assert names(typeahead.suggest("sum")["problems"]) == \
+           ["Two Sum", "Three Sum", "Sum of Two Integers", "Summary Ranges"]
+    assert names(typeahead.suggest("two sum")["problems"]) == ["Two Sum"]
+
+
+def test_problems_match_on_slug_and_number(typeahead, publish_catalog):
+    publish_catalog(PROBLEMS, TAGS, PROBLEM_TAGS)
+    assert names(typeahead.suggest("two-sum")["problems"]) == ["Two Sum"]
+    assert names(typeahead.suggest("37")["problems"]) == ["Sum of Two Integers"]
+    assert names(typeahead.suggest("35")["problems"])[0] == "Search Insert Position"
+
+
+def test_tags_match_from_any_word(typeahead, publish_catalog):
+    publish_catalog(PROBLEMS, TAGS, PROBLEM_TAGS)
+    assert names(typeahead.suggest("search")["tags"]) == ["Binary Search", "Binary Search Tree"]
+    assert names(typeahead.suggest("tree")["tags"]) == ["Binary Search Tree"]
+    # Ranked by how many problems carry them
+    assert names(typeahead.suggest("b")["tags"]) == ["Binary Search", "Binary Search Tree"]
+
+
+def test_limit_is_respected_and_capped(typeahead, publish_catalog):
+    publish_catalog(PROBLEMS, TAGS, PROBLEM_TAGS)
+    assert len(typeahead.suggest("s", limit=2)["problems"]) == 2
+    many = [problem(i, f"Sum {i}", float(i)) for i in range(1, 60)]
+    publish_catalog(many, [], [])
+    assert len(typeahead.suggest("sum", limit=50)["problems"]) == TYPEAHEAD_MAX_LIMIT
+
+
+def test_empty_query_and_missing_catalog_suggest_nothing(typeahead):
+    assert typeahead.suggest("two") == {"problems": [], "tags": []}
+    assert typeahead.suggest("  -- ") == {"problems": [], "tags": []}
+
+
+def test_prefix_index_deduplicates_entries_with_several_matching_keys():
+    index = PrefixIndex(["a", "b"], [["sum two", "sum"], ["summary"]])
+    assert index.search("sum", 10) == ["a", "b"]
+    assert index.search("summ", 10) == ["b"]
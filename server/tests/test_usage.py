@@ -0,0 +1,95 @@
+import time
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from llm.hedging import Deadline, DeadlineExceeded
+from problems import ProblemCodeGenerated
+from problems.schemas import ProblemDetail
+from solution import solve as solve_module
+from usage import UsageLedger
+from usage.models import LLMUsage
+
+
+pytestmark = pytest.mark.anyio
+
+PROBLEM = ProblemDetail(public_id="pro_usage", name="Two Sum", difficulty="Easy", acceptance_rate=50.0,
+                        link="https://leetcode.com/problems/two-sum/", description="<p>Add them.</p>")
+ANSWER = AIMessage(content='{"code": "pass", "time_complexity": "O(n)", "space_complexity": "O(1)"}',
+                   usage_metadata={"input_tokens": 120, "output_tokens": 30, "total_tokens": 150})
+
+
+@pytest.fixture
+def ledger(monkeypatch):
+    monkeypatch.setattr(UsageLedger, "_pending", [])
+    monkeypatch.setattr(UsageLedger, "_model_totals", {})
+    monkeypatch.setattr(UsageLedger, "_client_totals", {})
+    return UsageLedger
+
+
+@pytest.fixture
+def models(monkeypatch):
+    """
+    Replaces the LLMs: "broken" raises, "hanging" never answers, anything else answers.
+    """
+    async def call(model: str, prompt):
+        if model == "broken":
+            raise RuntimeError("upstream error")
+        if model == "hanging":
+            await asyncio.sleep(60)
+        return ANSWER
+
+    def get_model(model: str):
+        async def answer(prompt):
+            return await call(model, prompt)
+        return RunnableLambda(answer)
+
+    monkeypatch.setattr(solve_module, "get_model", get_model)
+
+    async def no_sibling(*args, **kwargs):
+        return None
+
+    async def no_store(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(ProblemCodeGenerated, "get_sibling", no_sibling)
+    monkeypatch.setattr(ProblemCodeGenerated, "store", no_store)
+
+
+def statuses(ledger) -> list[tuple[str, str, int]]:
+    return [(r["model"], r["status"], r["prompt_tokens"] + r["completion_tokens"]) for r in ledger._pending]
+
+
+@pytest.mark.usefixtures("models")
+async def test_failed_primary_and_answering_fallback_are_both_recorded(ledger):
+    generated = await solve_module.solve(PROBLEM, "Python", "broken", deadline=Deadline(5))
+
+    assert generated.model == "gpt-4o-mini"
+    assert statuses(ledger) == [("broken", "error", 0), ("gpt-4o-mini", "ok", 150)]
+    assert ledger._model_totals == {"broken": 0, "gpt-4o-mini": 150}
+
+
+@pytest.mark.usefixtures("models")
+async def test_call_cut_off_by_the_deadline_is_recorded_as_cancelled(ledger):
+    started = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        await solve_module.solve(PROBLEM, "Python", "hanging", deadline=Deadline(0.2))
+    # The cut-off call is cancelled, not awaited; it records itself once the cancellation lands
+    await asyncio.sleep(0.01)
+
+    assert statuses(ledger) == [("hanging", "cancelled", 0)]
+    assert 150 <= ledger._pending[0]["latency_ms"] <= (time.perf_counter() - started) * 1000 + 1
+
+
+@pytest.mark.usefixtures("database")
+async def test_statuses_reach_the_ledger_table(ledger):
+    since = time.time()
+    ledger.record("ip:test", "gpt-4o", "solve", "pro_usage", 100, 20, 0, 900)
+    ledger.record("ip:test", "gpt-4o", "solve", "pro_usage", 0, 0, 0, 300, status="cancelled")
+    await ledger.flush()
+
+    summary = {row["key"]: row for row in await LLMUsage.summarize(since, "status")}
+    assert summary["ok"]["calls"] == 1 and summary["ok"]["total_tokens"] == 120
+    assert summary["cancelled"]["calls"] == 1 and summary["cancelled"]["avg_latency_ms"] == 300